@@ -3,6 +3,8 @@ import os
 from tkinter import *
 from tkinter.ttk import Combobox, Treeview
 from tkinter import filedialog, messagebox
+from hwscenario import Scenario, Schema, UnitValidator
+from hwscenario.validate import describe
 
 
 class BinaryEditor:
@@ -15,97 +17,63 @@ class BinaryEditor:
         fields_path = os.path.join(script_dir, "fields.json")
 
         try:
-            with open(fields_path, "r", encoding="utf-8") as f:
-                raw = json.load(f)
+            self.schema = Schema.load(fields_path)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load fields.json:\n{e}")
             master.destroy()
             return
 
-        self.raw_fields = raw
-        self.shared_options = raw.get("shared_options", {})
-        self.fields = {k: v for k, v in raw.items() if k != "shared_options"}
+        # Files the fingerprints don't know are read with this one, not whatever was opened last
+        self.default_schema = self.schema
+        self.layouts = None
+        self.raw_fields = self.schema.raw_fields
+        self.shared_options = self.schema.shared_options
+        self.fields = self.schema.fields
 
         self.widgets = {}
         self.group_frames = {}
         self.group_buttons = {}
         self.group_members = {}
-        self.data = None
+        self.scenario = None
         self.current_file = None
+        self.opened_data = None
+        self._validator = None
 
-        self.option_list = {}
-        self.label_to_hex = {}
-        self._prepare_enum_mappings()
         self.build_ui()
 
-    def _normalize_hex_key(self, k):
-        hk = str(k).replace(" ", "").upper()
-        if len(hk) % 2 == 1:
-            hk = "0" + hk
-        if len(hk) < 2:
-            hk = hk.zfill(2)
-        return hk
-
-    def _prepare_enum_mappings(self):
-        # Shared options
-        for ref_name, mapping in self.shared_options.items():
-            normalized = {}
-            for k, v in mapping.items():
-                hk = self._normalize_hex_key(k)
-                normalized[hk] = v
-            labels = []
-            l2h = {}
-            seen_labels = {}
-            for hk, label in normalized.items():
-                base_label = label
-                if base_label in seen_labels:
-                    seen_labels[base_label] += 1
-                    ui_label = f"{base_label} ({hk})"
-                else:
-                    seen_labels[base_label] = 1
-                    ui_label = base_label
-                labels.append(ui_label)
-                l2h[ui_label] = hk
-            self.option_list[ref_name] = labels
-            self.label_to_hex[ref_name] = l2h
-
-        # Inline options
-        for field_name, info in self.fields.items():
-            if info.get("type") != "enum":
-                continue
-            options_dict = {}
-            if "options" in info and isinstance(info["options"], dict):
-                options_dict = info["options"]
-            elif "options_ref" in info:
-                ref = info["options_ref"]
-                if ref in self.option_list:
-                    self.option_list[field_name] = list(self.option_list[ref])
-                    self.label_to_hex[field_name] = dict(self.label_to_hex[ref])
-                    continue
-                else:
-                    options_dict = self.shared_options.get(ref, {})
-
-            normalized = {}
-            for k, v in options_dict.items():
-                hk = self._normalize_hex_key(k)
-                normalized[hk] = v
-
-            labels = []
-            l2h = {}
-            seen_labels = {}
-            for hk, label in normalized.items():
-                base_label = label
-                if base_label in seen_labels:
-                    seen_labels[base_label] += 1
-                    ui_label = f"{base_label} ({hk})"
-                else:
-                    seen_labels[base_label] = 1
-                    ui_label = base_label
-                labels.append(ui_label)
-                l2h[ui_label] = hk
-
-            self.option_list[field_name] = labels
-            self.label_to_hex[field_name] = l2h
+    @property
+    def validator(self):
+        if self._validator is None:
+            self._validator = UnitValidator(self.schema)
+        return self._validator
+
+    @property
+    def data(self):
+        """Buffer of the open scenario, or None."""
+        return self.scenario.data if self.scenario else None
+
+    def _get_layouts(self):
+        if self.layouts is None:
+            from hwscenario.layouts import LayoutRegistry
+
+            self.layouts = LayoutRegistry.load()
+        return self.layouts
+
+    def _schema_for(self, path):
+        """
+        Schema for the file's layout (e.g. Switch byte order) when fingerprints.json knows it.
+        Only layouts with the same fields as the window can be swapped in.
+        """
+        layout = self._get_layouts().identify(path)
+        if layout is None:
+            return self.default_schema
+        schema = self.layouts.schema(layout)
+        return schema if schema.raw_fields == self.raw_fields else self.default_schema
+
+    def _set_schema(self, schema):
+        if schema is not self.schema:
+            self.schema = schema
+            self._validator = None
 
     # ---------------- GUI BUILD ----------------
     def build_ui(self):
@@ -159,7 +127,7 @@ class BinaryEditor:
                     Label(sub, text=lname + ":").grid(row=subrow, column=0, pady=4, sticky="w")
                     if mtype == "enum":
                         ref = mem.get("options_ref")
-                        values = self.option_list.get(ref, []) if ref else []
+                        values = self.schema.option_list.get(ref, []) if ref else []
                         cb = Combobox(sub, values=list(values), state="readonly", width=40)
                         cb.grid(row=subrow, column=1, padx=10, pady=4)
                         self.group_members[field_name][lname] = cb
@@ -181,7 +149,7 @@ class BinaryEditor:
             Label(parent_frame, text=field_name + ":").grid(row=row, column=0, sticky="w", padx=10, pady=4)
             ftype = info.get("type")
             if ftype == "enum":
-                values = self.option_list.get(info.get("options_ref", field_name), [])
+                values = self.schema.option_list.get(info.get("options_ref", field_name), [])
                 cb = Combobox(parent_frame, values=list(values), state="readonly", width=40)
                 cb.grid(row=row, column=1, padx=10, pady=4)
                 self.widgets[field_name] = cb
@@ -232,136 +200,60 @@ class BinaryEditor:
             return
 
         try:
-            with open(filename, "rb") as f:
-                self.data = bytearray(f.read())
+            schema = self._schema_for(filename)
+            self.scenario = Scenario.open(filename, schema)
+            self._set_schema(schema)
         except Exception as e:
             messagebox.showerror("Error", f"Could not open file:\n{e}")
             return
 
         self.current_file = filename
+        self.opened_data = bytes(self.data)
         self.populate_fields()
         messagebox.showinfo("Loaded", "File loaded successfully.")
 
-    def _find_label_for_hex(self, mapping_key, hexval):
-        """
-        mapping_key: either a field name or a shared_options ref name.
-        hexval: uppercase hex string (no spaces) with even length.
-        Returns UI label or None.
-        """
-        l2h = self.label_to_hex.get(mapping_key, {})
-        # direct match
-        for label, hk in l2h.items():
-            if hk == hexval:
-                return label
-        # try stripping leading zeros and compare
-        alt = hexval.lstrip("0")
-        for label, hk in l2h.items():
-            if hk.lstrip("0") == alt:
-                return label
-        return None
+    def _widget_for(self, spec):
+        if spec.member is None:
+            return self.widgets.get(spec.field)
+        return self.group_members.get(spec.field, {}).get(spec.member)
 
     def populate_fields(self):
         """Fill UI with values from the binary file."""
         if self.data is None:
             return
 
-        # First, populate flat fields
-        for field_name, info in self.fields.items():
-            if info.get("type") == "group":
+        for field in self.scenario.fields():
+            widget = self._widget_for(field.spec)
+            value = field.value
+            if widget is None or value is None:
                 continue
-
-            offset = info.get("offset", 0)
-            size = info.get("size", 1)
-
-            # Defensive read
-            if offset + size > len(self.data):
-                continue
-
-            raw = self.data[offset:offset + size]
-
-            if info.get("type") == "enum":
-                hexval = raw.hex().upper().zfill(size * 2)
-                # mapping key might be options_ref or the field name
-                mapping_key = info.get("options_ref", field_name)
-                found_label = self._find_label_for_hex(mapping_key, hexval)
-
-                if found_label and field_name in self.widgets:
-                    try:
-                        self.widgets[field_name].set(found_label)
-                    except Exception:
-                        pass
-                else:
-                    unk = f"(Unknown {hexval})"
-                    if field_name in self.widgets:
-                        vals = list(self.widgets[field_name]["values"])
-                        if unk not in vals:
-                            vals = vals + [unk]
-                            self.widgets[field_name]["values"] = vals
-                            # also add to reverse map keyed by mapping_key so future matches find it
-                            self.label_to_hex.setdefault(mapping_key, {})[unk] = hexval
-                        self.widgets[field_name].set(unk)
-
-            elif info.get("type") == "string":
-                encoding = info.get("encoding", "ascii")
-                text = raw.decode(encoding, errors="ignore").rstrip("\x00")
-                widget = self.widgets.get(field_name)
-                if widget:
-                    widget.delete(0, END)
-                    widget.insert(0, text)
-
-            elif isinstance(info.get("type"), str) and info.get("type").startswith("uint"):
-                val = int.from_bytes(raw, byteorder="big")
-                widget = self.widgets.get(field_name)
-                if widget:
-                    widget.delete(0, END)
-                    widget.insert(0, str(val))
-
-        # Then populate groups (relative offsets)
-        for group_name, info in self.fields.items():
-            if info.get("type") != "group":
+            if field.spec.type == "enum":
+                # Values missing from fields.json show up as "(Unknown XXXX)"
+                vals = list(widget["values"])
+                if value not in vals:
+                    widget["values"] = vals + [value]
+                widget.set(value)
+            else:
+                widget.delete(0, END)
+                widget.insert(0, str(value))
+
+    def store_widget_values(self):
+        """Write every widget's value back into self.data."""
+        for field in self.scenario.fields():
+            widget = self._widget_for(field.spec)
+            if widget is None:
                 continue
-            base = info.get("offset", 0)
-            for mem in info.get("members", []):
-                lname = mem.get("name")
-                widget = self.group_members.get(group_name, {}).get(lname)
-                if widget is None:
-                    continue
-                offset_add = mem.get("offset_add", 0)
-                final_offset = base + offset_add
-                size = mem.get("size", 1)
-                if final_offset + size > len(self.data):
-                    continue
-                raw = self.data[final_offset:final_offset + size]
-                mtype = mem.get("type", "enum")
-                if mtype == "enum":
-                    hexval = raw.hex().upper().zfill(size * 2)
-                    mapping_key = mem.get("options_ref")
-                    if not mapping_key:
-                        # fallback to group's name-based map
-                        mapping_key = group_name
-                    found_label = self._find_label_for_hex(mapping_key, hexval)
-                    if found_label:
-                        try:
-                            widget.set(found_label)
-                        except Exception:
-                            pass
-                    else:
-                        unk = f"(Unknown {hexval})"
-                        vals = list(widget["values"])
-                        if unk not in vals:
-                            vals = vals + [unk]
-                            widget["values"] = vals
-                            self.label_to_hex.setdefault(mapping_key, {})[unk] = hexval
-                        widget.set(unk)
-                elif mtype == "string":
-                    encoding = mem.get("encoding", "ascii")
-                    text = raw.decode(encoding, errors="ignore").rstrip("\x00")
-                    widget.delete(0, END)
-                    widget.insert(0, text)
-                elif isinstance(mtype, str) and mtype.startswith("uint"):
-                    val = int.from_bytes(raw, byteorder="big")
-                    widget.delete(0, END)
-                    widget.insert(0, str(val))
+            value = widget.get()
+            if isinstance(field.spec.type, str) and field.spec.type.startswith("uint"):
+                try:
+                    value = int(value)
+                except ValueError:
+                    value = 0
+            try:
+                field.value = value
+            except ValueError:
+                # Nothing to encode the widget's text to (or the field is past the end of the file)
+                pass
 
     def save_file(self):
         if self.data is None:
@@ -372,93 +264,9 @@ class BinaryEditor:
         if not filename:
             return
 
-        # Write values back into the bytearray for flat fields
-        for field_name, info in self.fields.items():
-            if info.get("type") == "group":
-                continue
-
-            offset = info.get("offset", 0)
-            size = info.get("size", 1)
-
-            if info.get("type") == "enum":
-                label = self.widgets[field_name].get()
-                mapping_key = info.get("options_ref", field_name)
-                hexval = self.label_to_hex.get(mapping_key, {}).get(label, None)
-
-                if hexval:
-                    desired_len = size * 2
-                    hv = hexval.replace(" ", "").upper().zfill(desired_len)
-                    try:
-                        self.data[offset:offset + size] = bytes.fromhex(hv)
-                    except Exception:
-                        pass
-                else:
-                    # If the label is an "(Unknown ...)" entry, we may have stored its hex
-                    hv = self.label_to_hex.get(mapping_key, {}).get(label)
-                    if hv:
-                        hv = hv.replace(" ", "").upper().zfill(size * 2)
-                        try:
-                            self.data[offset:offset + size] = bytes.fromhex(hv)
-                        except Exception:
-                            pass
-
-            elif info.get("type") == "string":
-                text = self.widgets[field_name].get()
-                encoding = info.get("encoding", "ascii")
-                b = text.encode(encoding)
-                b = b.ljust(size, b"\x00")
-                self.data[offset:offset + size] = b[:size]
-
-            elif isinstance(info.get("type"), str) and info.get("type").startswith("uint"):
-                try:
-                    val = int(self.widgets[field_name].get())
-                except Exception:
-                    val = 0
-                self.data[offset:offset + size] = val.to_bytes(size, "big", signed=False)
-
-        # Write groups (relative offsets)
-        for group_name, info in self.fields.items():
-            if info.get("type") != "group":
-                continue
-            base = info.get("offset", 0)
-            for mem in info.get("members", []):
-                lname = mem.get("name")
-                widget = self.group_members.get(group_name, {}).get(lname)
-                if widget is None:
-                    continue
-                offset_add = mem.get("offset_add", 0)
-                final_offset = base + offset_add
-                size = mem.get("size", 1)
-                mtype = mem.get("type", "enum")
-
-                if mtype == "enum":
-                    label = widget.get()
-                    mapping_key = mem.get("options_ref")
-                    hexval = None
-                    if mapping_key:
-                        hexval = self.label_to_hex.get(mapping_key, {}).get(label)
-                    else:
-                        # try group-name based mapping fallback
-                        hexval = self.label_to_hex.get(group_name, {}).get(label)
-
-                    if hexval:
-                        hv = hexval.replace(" ", "").upper().zfill(size * 2)
-                        try:
-                            self.data[final_offset:final_offset + size] = bytes.fromhex(hv)
-                        except Exception:
-                            pass
-                elif mtype == "string":
-                    text = widget.get()
-                    encoding = mem.get("encoding", "ascii")
-                    b = text.encode(encoding)
-                    b = b.ljust(size, b"\x00")
-                    self.data[final_offset:final_offset + size] = b[:size]
-                elif isinstance(mtype, str) and mtype.startswith("uint"):
-                    try:
-                        val = int(widget.get())
-                    except Exception:
-                        val = 0
-                    self.data[final_offset:final_offset + size] = val.to_bytes(size, "big", signed=False)
+        self.store_widget_values()
+        if not self.confirm_valid_units():
+            return
 
         try:
             with open(filename, "wb") as f:
@@ -467,7 +275,51 @@ class BinaryEditor:
             messagebox.showerror("Error", f"Failed to save file:\n{e}")
             return
 
-        messagebox.showinfo("Saved", "File saved successfully.")
+        from hwscenario.patch import PatchError
+
+        try:
+            patch_path = self.write_patch(filename)
+        except (OSError, PatchError) as e:
+            messagebox.showwarning("Saved", f"File saved, but the .hwsp patch couldn't be written:\n{e}")
+            return
+        if patch_path:
+            messagebox.showinfo("Saved", f"File saved successfully.\nPatch: {os.path.basename(patch_path)}")
+        else:
+            messagebox.showinfo("Saved", "File saved successfully.")
+
+    def write_patch(self, filename):
+        """
+        Write filename.hwsp with just the changed bytes, against vanilla/<name> when
+        that exists and against the file as it was opened otherwise. Raises OSError or
+        PatchError (e.g. when the size changed) if no patch could be written.
+        """
+        from hwscenario.patch import FieldLabeler, diff, write_patch_file
+
+        name = os.path.basename(self.current_file)
+        vanilla = os.path.join(os.path.dirname(os.path.abspath(__file__)), "vanilla", name)
+        source = self.opened_data
+        if os.path.isfile(vanilla):
+            with open(vanilla, "rb") as f:
+                source = f.read()
+        if source is None or source == self.data:
+            return None
+        patch = diff(name, source, self.data, FieldLabeler(self.schema))
+        write_patch_file(filename + ".hwsp", [patch])
+        return filename + ".hwsp"
+
+    def confirm_valid_units(self):
+        """Warn about unknown or Switch-only unit ids before they end up in a saved file."""
+        issues = self.validator.check(self.data)
+        if not issues:
+            return True
+        lines = [describe(issue) for issue in issues[:15]]
+        if len(issues) > len(lines):
+            lines.append(f"... and {len(issues) - len(lines)} more")
+        return messagebox.askyesno(
+            "Invalid units",
+            "These slots have units that may crash the game:\n\n" + "\n".join(lines) + "\n\nSave anyway?",
+            icon="warning"
+        )
 
     # ---------------- Help / Scenarios ----------------
     def open_help_menu(self):
@@ -545,9 +397,11 @@ class BinaryEditor:
             full = os.path.join(script_dir, fname)
             if os.path.exists(full):
                 try:
-                    with open(full, "rb") as f:
-                        self.data = bytearray(f.read())
+                    schema = self._schema_for(full)
+                    self.scenario = Scenario.open(full, schema)
+                    self._set_schema(schema)
                     self.current_file = full
+                    self.opened_data = bytes(self.data)
                     self.populate_fields()
                     messagebox.showinfo("Loaded", f"Loaded scenario file: {fname}")
                 except Exception as e:
@@ -1,6 +1,10 @@
+import time
+STARTUP_T0 = time.perf_counter()
 import json
 import os
+import sys
 import tkinter as tk
+Canvas = tk.Canvas
 Frame = tk.Frame
 Label = tk.Label
 Button = tk.Button
@@ -10,46 +14,212 @@ Menu = tk.Menu
 Toplevel = tk.Toplevel
 END = tk.END
 Tk = tk.Tk
-from tkinter.ttk import Combobox, Treeview
-from tkinter import filedialog, messagebox
-from PIL import Image, ImageTk
-from tkinter.ttk import Combobox, Treeview
+from tkinter.ttk import Combobox
 from tkinter import filedialog, messagebox
+# PIL, Treeview, the scenario catalog and numpy (via the validator) are imported when first needed
+from hwscenario import Scenario, Schema, UnitValidator
+from hwscenario.validate import describe
+
+MAP_SIZE = 500
+SPAWN_MARKER_RADIUS = 5
+GRID_ROWS = 28
+# Field widgets created per event loop turn while the window fills in
+FIELD_BATCH = 8
+# Scenarios kept decoded by the Scenarios window prefetch
+PREFETCH_ENTRIES = 8
+# How often --watch checks for changes to the open file, in ms
+WATCH_POLL_MS = 200
+SCENARIO_COLUMN_SPECS = (
+    ("name", "Name", 180),
+    ("filename", "Filename", 90),
+    ("description", "Description", 260),
+    ("present", "File", 40),
+    ("allied", "Allied", 50),
+    ("enemy", "Enemy", 50),
+    ("rogue", "Rogue", 50),
+    ("allied_leader", "Allied leader", 130),
+    ("enemy_leader", "Enemy leader", 130),
+    ("modified", "Modified", 60),
+)
+SCENARIO_COLUMNS = tuple(col for col, _, _ in SCENARIO_COLUMN_SPECS)
+
+
+class SpawnGrid:
+    """Uniform grid over canvas coordinates so hit-testing only looks at nearby markers."""
+
+    def __init__(self, cell_size=SPAWN_MARKER_RADIUS * 4):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.points = {}
+
+    def _cell(self, x, y):
+        return (int(x // self.cell_size), int(y // self.cell_size))
+
+    def insert(self, key, x, y):
+        self.points[key] = (x, y)
+        self.cells.setdefault(self._cell(x, y), set()).add(key)
+
+    def remove(self, key):
+        x, y = self.points.pop(key)
+        cell = self._cell(x, y)
+        self.cells[cell].discard(key)
+        if not self.cells[cell]:
+            del self.cells[cell]
+
+    def move(self, key, x, y):
+        old = self._cell(*self.points[key])
+        new = self._cell(x, y)
+        if old != new:
+            self.remove(key)
+            self.insert(key, x, y)
+        else:
+            self.points[key] = (x, y)
+
+    def nearest(self, x, y, radius):
+        """Closest key within radius of (x, y), or None."""
+        cx0, cy0 = self._cell(x - radius, y - radius)
+        cx1, cy1 = self._cell(x + radius, y + radius)
+        best = None
+        best_d = radius * radius
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                for key in self.cells.get((cx, cy), ()):
+                    px, py = self.points[key]
+                    d = (px - x) ** 2 + (py - y) ** 2
+                    if d <= best_d:
+                        best, best_d = key, d
+        return best
+
+
+class StartupTrace:
+    """Wall clock spans of the editor start-up, printed with --startup-trace."""
+
+    def __init__(self, start=STARTUP_T0):
+        self.start = start
+        self.last = start
+        self.spans = []
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self.spans.append((name, now - self.last))
+        self.last = now
+
+    def report(self, out=sys.stdout):
+        for name, seconds in self.spans:
+            print(f"{name:<20} {seconds * 1000:8.1f} ms", file=out)
+        print(f"{'total':<20} {(self.last - self.start) * 1000:8.1f} ms", file=out)
+
+
 class BinaryEditor:
-    def __init__(self, master):
+    def __init__(self, master, property_grid=False, trace=None, on_ready=None, watch=False, layout=None):
         self.master = master
+        self.property_grid = property_grid
+        self.watch = watch
+        self.layout_name = layout
+        self.layouts = None
+        self.trace = trace
+        self.on_ready = on_ready
         master.title("Hyrule Warriors Story Scenario Editor v1.5 - Wii U - WORK IN PROGRESS 6-22-26")
 
         script_dir = os.path.dirname(os.path.abspath(__file__))
         fields_path = os.path.join(script_dir, "fields.json")
 
         try:
-            with open(fields_path, "r", encoding="utf-8") as f:
-                raw = json.load(f)
+            if layout is None:
+                self.schema = Schema.load(fields_path)
+            else:
+                self.schema = self._get_layouts().schema(layout)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load fields.json:\n{e}")
             master.destroy()
             return
 
-        self.raw_fields = raw
-        self.shared_options = raw.get("shared_options", {})
-        self.fields = {k: v for k, v in raw.items() if k != "shared_options"}
+        # Files the fingerprints don't know are read with this one, not whatever was opened last
+        self.default_schema = self.schema
+        self.raw_fields = self.schema.raw_fields
+        self.shared_options = self.schema.shared_options
+        self.fields = self.schema.fields
+        self._validator = None
+        self._mark("fields.json")
 
         self.widgets = {}
         self.group_frames = {}
         self.group_buttons = {}
         self.group_members = {}
-        self.data = None
+        self.scenario = None
         self.current_file = None
-        self.option_list = {}
-        self.label_to_hex = {}
-        self.map_label = None
+        self.opened_data = None
+        self.map_canvas = None
         self.map_image = None
-
-        self._prepare_enum_mappings()
+        self.map_image_item = None
+        self.map_text_item = None
+        self.map_size = (MAP_SIZE, MAP_SIZE)
+        self.map_bounds = None
+        self.spawn_index = SpawnGrid()
+        self.spawn_markers = {}
+        self.spawn_hover_item = None
+        self.drag_marker = None
+        self.catalog = None
+        self.catalog_views = []
+        self.prefetcher = None
+        self.word_index = None
+        self.watcher = None
+        self.disk = None
+        self._watch_events = None
+        self.grid_tree = None
+        self.grid_specs = {}
+        self.grid_editor = None
+        self.grid_editing = None
+        self._pending_fields = None
+        self._first_paint_done = False
+
+        master.bind("<Destroy>", self._on_master_destroy, add="+")
         self.build_ui()
 
-    def load_map_image(self, scenario_file):
+    @property
+    def data(self):
+        """Buffer of the open scenario, or None."""
+        return self.scenario.data if self.scenario else None
+
+    @property
+    def validator(self):
+        if self._validator is None:
+            self._validator = UnitValidator(self.schema)
+        return self._validator
+
+    def _get_layouts(self):
+        if self.layouts is None:
+            from hwscenario.layouts import LayoutRegistry
+
+            self.layouts = LayoutRegistry.load()
+        return self.layouts
+
+    def _schema_for(self, path):
+        """
+        Schema for the file's layout (e.g. Switch byte order) when fingerprints.json knows it.
+        Only layouts with the same fields as the window can be swapped in; --layout turns this off.
+        """
+        if self.layout_name is not None:
+            return self.default_schema
+        layout = self._get_layouts().identify(path)
+        if layout is None:
+            return self.default_schema
+        schema = self.layouts.schema(layout)
+        return schema if schema.raw_fields == self.raw_fields else self.default_schema
+
+    def _set_schema(self, schema):
+        if schema is not self.schema:
+            self.schema = schema
+            self._validator = None
+
+    def _mark(self, name):
+        if self.trace:
+            self.trace.mark(name)
+
+    def _map_thumbnail(self, scenario_file):
+        """The map PNG for a scenario, scaled down. Plain PIL work, safe off the Tk thread."""
+        from PIL import Image
+
         script_dir = os.path.dirname(os.path.abspath(__file__))
 
         base_name = os.path.basename(scenario_file)
@@ -68,96 +238,132 @@ class BinaryEditor:
                 "missing.png"
             )
 
+        img = Image.open(image_path)
+        img.thumbnail((MAP_SIZE, MAP_SIZE))
+        return img
+
+    def load_map_image(self, scenario_file, thumbnail=None):
+        base_name = os.path.basename(scenario_file).split(".bin")[0]
+
         try:
-            print(Image)
-            img = Image.open(image_path)
-            img.thumbnail((500, 500))
+            from PIL import ImageTk
+
+            img = thumbnail or self._map_thumbnail(scenario_file)
 
             self.map_image = ImageTk.PhotoImage(img)
+            self.map_size = img.size
 
-            if self.map_label:
-                self.map_label.config(
-                    image=self.map_image,
-                    text=""
-                )
+            if self.map_canvas:
+                self.map_canvas.config(width=img.size[0], height=img.size[1])
+                self.map_canvas.itemconfig(self.map_image_item, image=self.map_image)
+                self.map_canvas.itemconfig(self.map_text_item, text="")
 
         except Exception as e:
-            if self.map_label:
-                self.map_label.config(
-                    image="",
-                    text=f"Failed to load image:\n{e}"
-                )
+            if self.map_canvas:
+                self.map_canvas.itemconfig(self.map_image_item, image="")
+                self.map_canvas.itemconfig(self.map_text_item, text=f"Failed to load image:\n{e}")
 
-    def _normalize_hex_key(self, k):
-        hk = str(k).replace(" ", "").upper()
-        if len(hk) % 2 == 1:
-            hk = "0" + hk
-        if len(hk) < 2:
-            hk = hk.zfill(2)
-        return hk
-
-    def _prepare_enum_mappings(self):
-        for ref_name, mapping in self.shared_options.items():
-            normalized = {}
-            for k, v in mapping.items():
-                hk = self._normalize_hex_key(k)
-                normalized[hk] = v
-
-            labels = []
-            l2h = {}
-            seen_labels = {}
-
-            for hk, label in normalized.items():
-                base_label = label
-                if base_label in seen_labels:
-                    seen_labels[base_label] += 1
-                    ui_label = f"{base_label} ({hk})"
-                else:
-                    seen_labels[base_label] = 1
-                    ui_label = base_label
+        self.map_bounds = self._load_map_bounds(base_name)
+        self.draw_spawn_points()
 
-                labels.append(ui_label)
-                l2h[ui_label] = hk
+    # ---------------- Spawn points ----------------
+    def _load_map_bounds(self, base_name):
+        """World-space (min_x, min_z, max_x, max_z) for a map, from scenarios.json "bounds"."""
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        scenarios_path = os.path.join(script_dir, "scenarios.json")
+        try:
+            with open(scenarios_path, "r", encoding="utf-8") as f:
+                scenarios = json.load(f)
+        except Exception:
+            return None
+        for info in scenarios.values():
+            if info.get("filename", "").split(".bin")[0] == base_name and "bounds" in info:
+                return tuple(float(v) for v in info["bounds"])
+        return None
 
-            self.option_list[ref_name] = labels
-            self.label_to_hex[ref_name] = l2h
-        # Inline options
-        for field_name, info in self.fields.items():
-            if info.get("type") != "enum":
-                continue
-            options_dict = {}
-            if "options" in info and isinstance(info["options"], dict):
-                options_dict = info["options"]
-            elif "options_ref" in info:
-                ref = info["options_ref"]
-                if ref in self.option_list:
-                    self.option_list[field_name] = list(self.option_list[ref])
-                    self.label_to_hex[field_name] = dict(self.label_to_hex[ref])
-                    continue
-                else:
-                    options_dict = self.shared_options.get(ref, {})
-
-            normalized = {}
-            for k, v in options_dict.items():
-                hk = self._normalize_hex_key(k)
-                normalized[hk] = v
-
-            labels = []
-            l2h = {}
-            seen_labels = {}
-            for hk, label in normalized.items():
-                base_label = label
-                if base_label in seen_labels:
-                    seen_labels[base_label] += 1
-                    ui_label = f"{base_label} ({hk})"
-                else:
-                    seen_labels[base_label] = 1
-                    ui_label = base_label
-                labels.append(ui_label)
-                l2h[ui_label] = hk
+    def _spawn_name(self, spec):
+        return spec.field if spec.member is None else f"{spec.field} {spec.member}"
+
+    def _world_to_canvas(self, x, z):
+        min_x, min_z, max_x, max_z = self.map_bounds
+        w, h = self.map_size
+        return ((x - min_x) / (max_x - min_x) * w, (z - min_z) / (max_z - min_z) * h)
+
+    def _canvas_to_world(self, px, py):
+        min_x, min_z, max_x, max_z = self.map_bounds
+        w, h = self.map_size
+        return (min_x + px / w * (max_x - min_x), min_z + py / h * (max_z - min_z))
+
+    def draw_spawn_points(self):
+        """Place one marker per decoded spawn point. Only called on load."""
+        if not self.map_canvas:
+            return
+        for marker in self.spawn_markers:
+            self.map_canvas.delete(marker)
+        self.spawn_markers = {}
+        self.spawn_index = SpawnGrid()
+        if self.data is None:
+            return
+
+        points = []
+        for field in self.scenario.fields():
+            if field.spec.type == "position":
+                pos = field.value
+                if pos is not None:
+                    points.append((field.spec, pos))
+        if not points:
+            return
+
+        if self.map_bounds is None:
+            # No known bounds for this map, fit the decoded points with some padding
+            xs = [p[1][0] for p in points]
+            zs = [p[1][1] for p in points]
+            pad_x = (max(xs) - min(xs)) * 0.1 or 1.0
+            pad_z = (max(zs) - min(zs)) * 0.1 or 1.0
+            self.map_bounds = (min(xs) - pad_x, min(zs) - pad_z, max(xs) + pad_x, max(zs) + pad_z)
+
+        r = SPAWN_MARKER_RADIUS
+        for spec, (x, z) in points:
+            px, py = self._world_to_canvas(x, z)
+            color = "red" if spec.field.startswith("Enemy") else "blue" if spec.field.startswith(("Slot", "Allied")) else "orange"
+            marker = self.map_canvas.create_oval(px - r, py - r, px + r, py + r, fill=color, outline="white")
+            self.spawn_markers[marker] = spec
+            self.spawn_index.insert(marker, px, py)
+        self.map_canvas.tag_raise(self.spawn_hover_item)
+
+    def on_map_motion(self, event):
+        marker = self.spawn_index.nearest(event.x, event.y, SPAWN_MARKER_RADIUS + 2)
+        if marker is None:
+            self.map_canvas.itemconfig(self.spawn_hover_item, text="")
+            return
+        spec = self.spawn_markers[marker]
+        x, z = self.scenario.get(spec)
+        self.map_canvas.coords(self.spawn_hover_item, event.x + 10, event.y - 10)
+        self.map_canvas.itemconfig(self.spawn_hover_item, text=f"{self._spawn_name(spec)}\n({x:.1f}, {z:.1f})")
 
-            self.option_list[field_name] = labels
-            self.label_to_hex[field_name] = l2h
+    def on_map_press(self, event):
+        self.drag_marker = self.spawn_index.nearest(event.x, event.y, SPAWN_MARKER_RADIUS + 2)
+
+    def on_map_drag(self, event):
+        if self.drag_marker is None:
+            return
+        w, h = self.map_size
+        px = min(max(event.x, 0), w)
+        py = min(max(event.y, 0), h)
+        r = SPAWN_MARKER_RADIUS
+        self.map_canvas.coords(self.drag_marker, px - r, py - r, px + r, py + r)
+        self.spawn_index.move(self.drag_marker, px, py)
+
+        spec = self.spawn_markers[self.drag_marker]
+        x, z = self._canvas_to_world(px, py)
+        self.scenario.set(spec, [x, z])
+        self.map_canvas.coords(self.spawn_hover_item, px + 10, py - 10)
+        self.map_canvas.itemconfig(self.spawn_hover_item, text=f"{self._spawn_name(spec)}\n({x:.1f}, {z:.1f})")
+
+    def on_map_release(self, event):
+        if self.drag_marker is not None and self.property_grid:
+            self.refresh_grid([spec for spec in self.grid_specs.values() if spec.type == "position"])
+        self.drag_marker = None
 
     # ---------------- GUI BUILD ----------------
     def build_ui(self):
@@ -171,11 +377,27 @@ class BinaryEditor:
             columns_frame.columnconfigure(c, weight=1)
             self.col_frames.append(f)
 
-        self.map_label = Label(
-			self.col_frames[3],
-			text="No map loaded"
-		)
-        self.map_label.pack(padx=10, pady=10)
+        self.map_canvas = Canvas(
+            self.col_frames[3],
+            width=MAP_SIZE,
+            height=MAP_SIZE,
+            highlightthickness=0
+        )
+        self.map_canvas.pack(padx=10, pady=10)
+        self.map_image_item = self.map_canvas.create_image(0, 0, anchor="nw")
+        self.map_text_item = self.map_canvas.create_text(MAP_SIZE // 2, MAP_SIZE // 2, text="No map loaded")
+        self.spawn_hover_item = self.map_canvas.create_text(0, 0, anchor="sw", text="", fill="yellow")
+        self.map_canvas.bind("<Motion>", self.on_map_motion)
+        self.map_canvas.bind("<ButtonPress-1>", self.on_map_press)
+        self.map_canvas.bind("<B1-Motion>", self.on_map_drag)
+        self.map_canvas.bind("<ButtonRelease-1>", self.on_map_release)
+
+        if self.property_grid:
+            self.build_property_grid(self.col_frames[0])
+            self._build_buttons()
+            self._pending_fields = iter(())
+            self.master.after(1, self._build_field_batch)
+            return
 
         col_map = {}
         for name in self.fields.keys():
@@ -186,78 +408,121 @@ class BinaryEditor:
             else:
                 col_map[name] = 2
 
-        col_rows = [0, 0, 0]
-
-        for field_name, info in self.fields.items():
-            col = col_map.get(field_name, 2)
-            parent_frame = self.col_frames[col]
-            row = col_rows[col]
-
-            if info.get("type") == "group":
-                frame = Frame(parent_frame)
-                frame.grid(row=row, column=0, columnspan=2, sticky="w", pady=4)
-                btn = Button(frame, text="+", width=2)
-                btn.grid(row=0, column=0)
-                Label(frame, text=field_name + ":").grid(row=0, column=1, sticky="w", padx=6)
-
-                sub = Frame(parent_frame)
-                sub.grid(row=row + 1, column=0, columnspan=2, sticky="w", padx=30)
-                sub.grid_remove()
-
-                self.group_frames[field_name] = sub
-                self.group_buttons[field_name] = btn
-                self.group_members[field_name] = {}
-
-                btn.config(command=lambda n=field_name: self.toggle_group(n))
-
-                subrow = 0
-                for mem in info.get("members", []):
-                    lname = mem.get("name", "member")
-                    mtype = mem.get("type", "enum")
-                    Label(sub, text=lname + ":").grid(row=subrow, column=0, pady=4, sticky="w")
-                    if mtype == "enum":
-                        ref = mem.get("options_ref")
-                        values = self.option_list.get(ref, []) if ref else []
-                        cb = Combobox(sub, values=list(values), state="readonly", width=40)
-                        cb.grid(row=subrow, column=1, padx=10, pady=4)
-                        self.group_members[field_name][lname] = cb
-                    elif mtype == "string":
-                        e = Entry(sub, width=25)
-                        e.grid(row=subrow, column=1, padx=10, pady=4)
-                        self.group_members[field_name][lname] = e
-                    elif isinstance(mtype, str) and mtype.startswith("uint"):
-                        e = Spinbox(sub, from_=0, to=2**32 - 1, width=10)
-                        e.grid(row=subrow, column=1, padx=10, pady=4)
-                        self.group_members[field_name][lname] = e
-                    else:
-                        Label(sub, text=f"(unsupported type {mtype})").grid(row=subrow, column=1, sticky="w")
-                    subrow += 1
+        self._col_map = col_map
+        self._col_rows = [0, 0, 0]
+        self._pending_fields = iter(list(self.fields.items()))
+        self._build_buttons()
+        self._mark("window skeleton")
+        # Let the window paint before the (many) field widgets exist
+        self.master.after(1, self._build_field_batch)
+
+    def _build_field_batch(self):
+        """Create widgets for a few fields, then yield back to Tk until all are built."""
+        if self._pending_fields is None:
+            return
+        if not self._first_paint_done:
+            self.master.update_idletasks()
+            self._mark("first paint")
+            self._first_paint_done = True
+        built = 0
+        for field_name, info in self._pending_fields:
+            self._build_field(field_name, info)
+            built += 1
+            if built == FIELD_BATCH:
+                self.master.after(1, self._build_field_batch)
+                return
+        self._fields_built()
 
-                col_rows[col] += 2
-                continue
+    def finish_building(self):
+        """Build all remaining widgets now, e.g. before filling them from a file."""
+        if self._pending_fields is None:
+            return
+        for field_name, info in self._pending_fields:
+            self._build_field(field_name, info)
+        self._fields_built()
+
+    def _fields_built(self):
+        self._pending_fields = None
+        self._mark("field widgets")
+        if self.on_ready:
+            self.on_ready()
+
+    def _build_field(self, field_name, info):
+        if info.get("type") == "position":
+            # Edited by dragging its marker on the map
+            return
+        col = self._col_map.get(field_name, 2)
+        parent_frame = self.col_frames[col]
+        row = self._col_rows[col]
 
-            Label(parent_frame, text=field_name + ":").grid(row=row, column=0, sticky="w", padx=10, pady=4)
-            ftype = info.get("type")
-            if ftype == "enum":
-                values = self.option_list.get(info.get("options_ref", field_name), [])
-                cb = Combobox(parent_frame, values=list(values), state="readonly", width=40)
-                cb.grid(row=row, column=1, padx=10, pady=4)
-                self.widgets[field_name] = cb
-            elif ftype == "string":
-                e = Entry(parent_frame, width=25)
-                e.grid(row=row, column=1, padx=10, pady=4)
-                self.widgets[field_name] = e
-            elif isinstance(ftype, str) and ftype.startswith("uint"):
-                e = Spinbox(parent_frame, from_=0, to=2**32 - 1, width=10)
-                e.grid(row=row, column=1, padx=10, pady=4)
-                self.widgets[field_name] = e
-            else:
-                e = Entry(parent_frame, width=25)
-                e.grid(row=row, column=1, padx=10, pady=4)
-                self.widgets[field_name] = e
+        if info.get("type") == "group":
+            frame = Frame(parent_frame)
+            frame.grid(row=row, column=0, columnspan=2, sticky="w", pady=4)
+            btn = Button(frame, text="+", width=2)
+            btn.grid(row=0, column=0)
+            Label(frame, text=field_name + ":").grid(row=0, column=1, sticky="w", padx=6)
+
+            sub = Frame(parent_frame)
+            sub.grid(row=row + 1, column=0, columnspan=2, sticky="w", padx=30)
+            sub.grid_remove()
 
-            col_rows[col] += 1
+            self.group_frames[field_name] = sub
+            self.group_buttons[field_name] = btn
+            self.group_members[field_name] = {}
 
+            btn.config(command=lambda n=field_name: self.toggle_group(n))
+
+            subrow = 0
+            for mem in info.get("members", []):
+                lname = mem.get("name", "member")
+                mtype = mem.get("type", "enum")
+                if mtype == "position":
+                    continue
+                Label(sub, text=lname + ":").grid(row=subrow, column=0, pady=4, sticky="w")
+                if mtype == "enum":
+                    ref = mem.get("options_ref")
+                    values = self.schema.option_list.get(ref, []) if ref else []
+                    cb = Combobox(sub, values=list(values), state="readonly", width=40)
+                    cb.grid(row=subrow, column=1, padx=10, pady=4)
+                    self.group_members[field_name][lname] = cb
+                elif mtype == "string":
+                    e = Entry(sub, width=25)
+                    e.grid(row=subrow, column=1, padx=10, pady=4)
+                    self.group_members[field_name][lname] = e
+                elif isinstance(mtype, str) and mtype.startswith("uint"):
+                    e = Spinbox(sub, from_=0, to=2**32 - 1, width=10)
+                    e.grid(row=subrow, column=1, padx=10, pady=4)
+                    self.group_members[field_name][lname] = e
+                else:
+                    Label(sub, text=f"(unsupported type {mtype})").grid(row=subrow, column=1, sticky="w")
+                subrow += 1
+
+            self._col_rows[col] += 2
+            return
+
+        Label(parent_frame, text=field_name + ":").grid(row=row, column=0, sticky="w", padx=10, pady=4)
+        ftype = info.get("type")
+        if ftype == "enum":
+            values = self.schema.option_list.get(info.get("options_ref", field_name), [])
+            cb = Combobox(parent_frame, values=list(values), state="readonly", width=40)
+            cb.grid(row=row, column=1, padx=10, pady=4)
+            self.widgets[field_name] = cb
+        elif ftype == "string":
+            e = Entry(parent_frame, width=25)
+            e.grid(row=row, column=1, padx=10, pady=4)
+            self.widgets[field_name] = e
+        elif isinstance(ftype, str) and ftype.startswith("uint"):
+            e = Spinbox(parent_frame, from_=0, to=2**32 - 1, width=10)
+            e.grid(row=row, column=1, padx=10, pady=4)
+            self.widgets[field_name] = e
+        else:
+            e = Entry(parent_frame, width=25)
+            e.grid(row=row, column=1, padx=10, pady=4)
+            self.widgets[field_name] = e
+
+        self._col_rows[col] += 1
+
+    def _build_buttons(self):
         btn_frame = Frame(self.master)
         btn_frame.grid(row=1, column=0, sticky="ew", padx=6, pady=(0, 8))
         btn_frame.columnconfigure(0, weight=1)
@@ -268,6 +533,135 @@ class BinaryEditor:
         help_button = Button(self.master, text="Help", command=self.open_help_menu)
         help_button.grid(row=0, column=1, sticky="ne", padx=6, pady=6)
 
+    # ---------------- Property grid ----------------
+    def build_property_grid(self, parent):
+        """
+        All fields as rows of one Treeview (groups expand to their members).
+        A single editor widget is placed over the cell being edited.
+        """
+        from tkinter.ttk import Treeview
+
+        frame = Frame(parent)
+        frame.pack(fill="both", expand=True)
+        tree = Treeview(frame, columns=("value",), height=GRID_ROWS)
+        tree.heading("#0", text="Field")
+        tree.heading("value", text="Value")
+        tree.column("#0", width=260, anchor="w")
+        tree.column("value", width=320, anchor="w")
+        scroll = tk.Scrollbar(frame, orient="vertical", command=tree.yview)
+        tree.configure(yscrollcommand=scroll.set)
+        tree.pack(side="left", fill="both", expand=True)
+        scroll.pack(side="right", fill="y")
+        self.grid_tree = tree
+
+        schema = self.schema
+        group_rows = {}
+        for spec in schema.specs:
+            parent_iid = ""
+            text = spec.field
+            if spec.member is not None:
+                if spec.field not in group_rows:
+                    group_rows[spec.field] = tree.insert("", "end", text=spec.field)
+                parent_iid = group_rows[spec.field]
+                text = spec.member
+            iid = tree.insert(parent_iid, "end", text=text, values=("",))
+            self.grid_specs[iid] = spec
+
+        tree.bind("<Double-1>", self.on_grid_edit)
+        tree.bind("<Return>", self.on_grid_edit)
+        # The editor is placed in window coordinates, so scrolling ends the edit
+        tree.bind("<MouseWheel>", lambda e: self.finish_grid_edit())
+        tree.bind("<Button-4>", lambda e: self.finish_grid_edit())
+        tree.bind("<Button-5>", lambda e: self.finish_grid_edit())
+        scroll.bind("<ButtonPress-1>", lambda e: self.finish_grid_edit())
+
+    def _grid_text(self, value):
+        if value is None:
+            return ""
+        if isinstance(value, list):
+            return ", ".join(f"{v:g}" if isinstance(v, float) else str(v) for v in value)
+        return str(value)
+
+    def _grid_value(self, spec, text):
+        if spec.type == "position":
+            return [float(v) for v in text.replace(",", " ").split()]
+        return text
+
+    def refresh_grid(self, specs=None):
+        if self.grid_tree is None or self.data is None:
+            return
+        for iid, spec in self.grid_specs.items():
+            if specs is None or spec in specs:
+                self.grid_tree.set(iid, "value", self._grid_text(self.scenario.get(spec)))
+
+    def on_grid_edit(self, event):
+        tree = self.grid_tree
+        if event.type == tk.EventType.KeyPress:
+            iid = tree.focus()
+        else:
+            iid = tree.identify_row(event.y)
+        spec = self.grid_specs.get(iid)
+        if spec is None or self.data is None:
+            return
+        bbox = tree.bbox(iid, "value")
+        if not bbox:
+            return
+        self.finish_grid_edit()
+
+        if self.grid_editor is None:
+            self.grid_editor = Combobox(tree)
+            self.grid_editor.bind("<Return>", lambda e: self.finish_grid_edit())
+            self.grid_editor.bind("<<ComboboxSelected>>", lambda e: self.finish_grid_edit())
+            self.grid_editor.bind("<Escape>", lambda e: self.finish_grid_edit(cancel=True))
+            self.grid_editor.bind("<FocusOut>", lambda e: self.after_grid_focus_out())
+
+        editor = self.grid_editor
+        current = tree.set(iid, "value")
+        if spec.type == "enum":
+            values = list(self.schema.option_list.get(spec.mapping_key, []))
+            if current not in values:
+                values.append(current)
+            editor.config(values=values, state="readonly")
+        else:
+            editor.config(values=(), state="normal")
+        editor.set(current)
+        x, y, w, h = bbox
+        editor.place(x=x, y=y, width=w, height=h)
+        editor.focus_set()
+        self.grid_editing = iid
+
+    def after_grid_focus_out(self):
+        # The readonly dropdown list takes focus while open, only commit once focus really left
+        def check():
+            focus = self.master.focus_get()
+            if focus is None or not str(focus).startswith(str(self.grid_editor)):
+                self.finish_grid_edit()
+        self.master.after(100, check)
+
+    def finish_grid_edit(self, cancel=False):
+        iid = self.grid_editing
+        if iid is None:
+            return
+        self.grid_editing = None
+        text = self.grid_editor.get()
+        self.grid_editor.place_forget()
+        self.grid_tree.focus_set()
+        if cancel:
+            return
+        spec = self.grid_specs[iid]
+        try:
+            value = self._grid_value(spec, text)
+            ok = self.schema.encode_value(spec, value) is not None
+        except (TypeError, ValueError):
+            ok = False
+        if not ok:
+            messagebox.showwarning("Invalid value", f"Can't store {text!r} in {self.grid_tree.item(iid, 'text')}.")
+            return
+        self.scenario.set(spec, value)
+        self.refresh_grid([spec])
+        if spec.type == "position":
+            self.draw_spawn_points()
+
     # ---------------- Group toggle ----------------
     def toggle_group(self, name):
         frame = self.group_frames.get(name)
@@ -290,137 +684,73 @@ class BinaryEditor:
             return
 
         try:
-            with open(filename, "rb") as f:
-                self.data = bytearray(f.read())
+            schema = self._schema_for(filename)
+            self.scenario = Scenario.open(filename, schema)
         except Exception as e:
             messagebox.showerror("Error", f"Could not open file:\n{e}")
             return
+        self._set_schema(schema)
 
         self.current_file = filename
+        self.opened_data = bytes(self.data)
         self.populate_fields()
         self.load_map_image(filename)
+        self.start_watching()
         messagebox.showinfo("Loaded", "File loaded successfully.")
 
-    def _find_label_for_hex(self, mapping_key, hexval):
-        """
-        mapping_key: either a field name or a shared_options ref name.
-        hexval: uppercase hex string (no spaces) with even length.
-        Returns UI label or None.
-        """
-        l2h = self.label_to_hex.get(mapping_key, {})
-        # direct match
-        for label, hk in l2h.items():
-            if hk == hexval:
-                return label
-        # try stripping leading zeros and compare
-        alt = hexval.lstrip("0")
-        for label, hk in l2h.items():
-            if hk.lstrip("0") == alt:
-                return label
-        return None
+    def _widget_for(self, spec):
+        if spec.member is None:
+            return self.widgets.get(spec.field)
+        return self.group_members.get(spec.field, {}).get(spec.member)
 
-    def populate_fields(self):
-        """Fill UI with values from the binary file."""
+    def populate_fields(self, values=None):
+        """Fill UI with values from the binary file (or already decoded {spec: value})."""
         if self.data is None:
             return
+        if self.property_grid:
+            self.refresh_grid()
+            return
+        self.finish_building()
 
-        # First, populate flat fields
-        for field_name, info in self.fields.items():
-            if info.get("type") == "group":
-                continue
-
-            offset = info.get("offset", 0)
-            size = info.get("size", 1)
+        for field in self.scenario.fields():
+            self._show_value(field.spec, values[field.spec] if values is not None else field.value)
 
-            # Defensive read
-            if offset + size > len(self.data):
+    def _show_value(self, spec, value):
+        widget = self._widget_for(spec)
+        if widget is None or value is None:
+            return
+        if spec.type == "enum":
+            # Values missing from fields.json show up as "(Unknown XXXX)"
+            vals = list(widget["values"])
+            if value not in vals:
+                widget["values"] = vals + [value]
+            widget.set(value)
+        else:
+            widget.delete(0, END)
+            widget.insert(0, str(value))
+
+    def store_widget_values(self):
+        """Write the widgets the user changed back into self.data."""
+        for field in self.scenario.fields():
+            widget = self._widget_for(field.spec)
+            if widget is None:
                 continue
-
-            raw = self.data[offset:offset + size]
-
-            if info.get("type") == "enum":
-                hexval = raw.hex().upper().zfill(size * 2)
-                # mapping key might be options_ref or the field name
-                mapping_key = info.get("options_ref", field_name)
-                found_label = self._find_label_for_hex(mapping_key, hexval)
-
-                if found_label and field_name in self.widgets:
-                    try:
-                        self.widgets[field_name].set(found_label)
-                    except Exception:
-                        pass
-                else:
-                    unk = f"(Unknown {hexval})"
-                    if field_name in self.widgets:
-                        vals = list(self.widgets[field_name]["values"])
-                        if unk not in vals:
-                            vals = vals + [unk]
-                            self.widgets[field_name]["values"] = vals
-                            # also add to reverse map keyed by mapping_key so future matches find it
-                            self.label_to_hex.setdefault(mapping_key, {})[unk] = hexval
-                        self.widgets[field_name].set(unk)
-
-            elif info.get("type") == "string":
-                encoding = info.get("encoding", "ascii")
-                text = raw.decode(encoding, errors="ignore").rstrip("\x00")
-                widget = self.widgets.get(field_name)
-                if widget:
-                    widget.delete(0, END)
-                    widget.insert(0, text)
-
-            elif isinstance(info.get("type"), str) and info.get("type").startswith("uint"):
-                val = int.from_bytes(raw, byteorder="big")
-                widget = self.widgets.get(field_name)
-                if widget:
-                    widget.delete(0, END)
-                    widget.insert(0, str(val))
-
-        # Then populate groups (relative offsets)
-        for group_name, info in self.fields.items():
-            if info.get("type") != "group":
+            value = widget.get()
+            # Re-encoding an untouched widget could overwrite bytes it doesn't show
+            # exactly (or that changed on disk since it was filled)
+            current = field.value
+            if current is None or value == str(current):
                 continue
-            base = info.get("offset", 0)
-            for mem in info.get("members", []):
-                lname = mem.get("name")
-                widget = self.group_members.get(group_name, {}).get(lname)
-                if widget is None:
-                    continue
-                offset_add = mem.get("offset_add", 0)
-                final_offset = base + offset_add
-                size = mem.get("size", 1)
-                if final_offset + size > len(self.data):
-                    continue
-                raw = self.data[final_offset:final_offset + size]
-                mtype = mem.get("type", "enum")
-                if mtype == "enum":
-                    hexval = raw.hex().upper().zfill(size * 2)
-                    mapping_key = mem.get("options_ref")
-                    if not mapping_key:
-                        # fallback to group's name-based map
-                        mapping_key = group_name
-                    found_label = self._find_label_for_hex(mapping_key, hexval)
-                    if found_label:
-                        try:
-                            widget.set(found_label)
-                        except Exception:
-                            pass
-                    else:
-                        unk = f"(Unknown {hexval})"
-                        vals = list(widget["values"])
-                        if unk not in vals:
-                            vals = vals + [unk]
-                            widget["values"] = vals
-                            self.label_to_hex.setdefault(mapping_key, {})[unk] = hexval
-                        widget.set(unk)
-                elif mtype == "string":
-                    encoding = mem.get("encoding", "ascii")
-                    text = raw.decode(encoding, errors="ignore").rstrip("\x00")
-                    widget.delete(0, END)
-                    widget.insert(0, text)
-                elif isinstance(mtype, str) and mtype.startswith("uint"):
-                    val = int.from_bytes(raw, byteorder="big")
-                    widget.delete(0, END)
-                    widget.insert(0, str(val))
+            if isinstance(field.spec.type, str) and field.spec.type.startswith("uint"):
+                try:
+                    value = int(value)
+                except ValueError:
+                    value = 0
+            try:
+                field.value = value
+            except ValueError:
+                # Nothing to encode the widget's text to (or the field is past the end of the file)
+                pass
 
     def save_file(self):
         if self.data is None:
@@ -431,93 +761,11 @@ class BinaryEditor:
         if not filename:
             return
 
-        # Write values back into the bytearray for flat fields
-        for field_name, info in self.fields.items():
-            if info.get("type") == "group":
-                continue
-
-            offset = info.get("offset", 0)
-            size = info.get("size", 1)
-
-            if info.get("type") == "enum":
-                label = self.widgets[field_name].get()
-                mapping_key = info.get("options_ref", field_name)
-                hexval = self.label_to_hex.get(mapping_key, {}).get(label, None)
-
-                if hexval:
-                    desired_len = size * 2
-                    hv = hexval.replace(" ", "").upper().zfill(desired_len)
-                    try:
-                        self.data[offset:offset + size] = bytes.fromhex(hv)
-                    except Exception:
-                        pass
-                else:
-                    # If the label is an "(Unknown ...)" entry, we may have stored its hex
-                    hv = self.label_to_hex.get(mapping_key, {}).get(label)
-                    if hv:
-                        hv = hv.replace(" ", "").upper().zfill(size * 2)
-                        try:
-                            self.data[offset:offset + size] = bytes.fromhex(hv)
-                        except Exception:
-                            pass
-
-            elif info.get("type") == "string":
-                text = self.widgets[field_name].get()
-                encoding = info.get("encoding", "ascii")
-                b = text.encode(encoding)
-                b = b.ljust(size, b"\x00")
-                self.data[offset:offset + size] = b[:size]
-
-            elif isinstance(info.get("type"), str) and info.get("type").startswith("uint"):
-                try:
-                    val = int(self.widgets[field_name].get())
-                except Exception:
-                    val = 0
-                self.data[offset:offset + size] = val.to_bytes(size, "big", signed=False)
-
-        # Write groups (relative offsets)
-        for group_name, info in self.fields.items():
-            if info.get("type") != "group":
-                continue
-            base = info.get("offset", 0)
-            for mem in info.get("members", []):
-                lname = mem.get("name")
-                widget = self.group_members.get(group_name, {}).get(lname)
-                if widget is None:
-                    continue
-                offset_add = mem.get("offset_add", 0)
-                final_offset = base + offset_add
-                size = mem.get("size", 1)
-                mtype = mem.get("type", "enum")
+        if not self.property_grid:
+            self.store_widget_values()
 
-                if mtype == "enum":
-                    label = widget.get()
-                    mapping_key = mem.get("options_ref")
-                    hexval = None
-                    if mapping_key:
-                        hexval = self.label_to_hex.get(mapping_key, {}).get(label)
-                    else:
-                        # try group-name based mapping fallback
-                        hexval = self.label_to_hex.get(group_name, {}).get(label)
-
-                    if hexval:
-                        hv = hexval.replace(" ", "").upper().zfill(size * 2)
-                        try:
-                            self.data[final_offset:final_offset + size] = bytes.fromhex(hv)
-                        except Exception:
-                            pass
-                elif mtype == "string":
-                    text = widget.get()
-                    encoding = mem.get("encoding", "ascii")
-                    b = text.encode(encoding)
-                    b = b.ljust(size, b"\x00")
-                    self.data[final_offset:final_offset + size] = b[:size]
-                elif isinstance(mtype, str) and mtype.startswith("uint"):
-                    try:
-                        val = int(widget.get())
-                    except Exception:
-                        val = 0
-                    self.data[final_offset:final_offset + size] = val.to_bytes(size, "big", signed=False)
+        if not self.confirm_valid_units():
+            return
 
         try:
             with open(filename, "wb") as f:
@@ -526,13 +774,146 @@ class BinaryEditor:
             messagebox.showerror("Error", f"Failed to save file:\n{e}")
             return
 
-        messagebox.showinfo("Saved", "File saved successfully.")
+        # Our own write shouldn't come back as an external change
+        if self.disk is not None and os.path.abspath(filename) == os.path.abspath(self.current_file):
+            self.disk.reset(self.data)
+
+        from hwscenario.patch import PatchError
+
+        try:
+            patch_path = self.write_patch(filename)
+        except (OSError, PatchError) as e:
+            messagebox.showwarning("Saved", f"File saved, but the .hwsp patch couldn't be written:\n{e}")
+            return
+        if patch_path:
+            messagebox.showinfo("Saved", f"File saved successfully.\nPatch: {os.path.basename(patch_path)}")
+        else:
+            messagebox.showinfo("Saved", "File saved successfully.")
+
+    def write_patch(self, filename):
+        """
+        Write filename.hwsp with just the changed bytes, against vanilla/<name> when
+        that exists and against the file as it was opened otherwise. Raises OSError or
+        PatchError (e.g. when the size changed) if no patch could be written.
+        """
+        from hwscenario.patch import FieldLabeler, diff, write_patch_file
+
+        name = os.path.basename(self.current_file)
+        vanilla = os.path.join(os.path.dirname(os.path.abspath(__file__)), "vanilla", name)
+        source = self.opened_data
+        if os.path.isfile(vanilla):
+            with open(vanilla, "rb") as f:
+                source = f.read()
+        if source is None or source == self.data:
+            return None
+        patch = diff(name, source, self.data, FieldLabeler(self.schema))
+        write_patch_file(filename + ".hwsp", [patch])
+        return filename + ".hwsp"
+
+    def confirm_valid_units(self):
+        """Warn about unknown or Switch-only unit ids before they end up in a saved file."""
+        issues = self.validator.check(self.data)
+        if not issues:
+            return True
+        lines = [describe(issue) for issue in issues[:15]]
+        if len(issues) > len(lines):
+            lines.append(f"... and {len(issues) - len(lines)} more")
+        return messagebox.askyesno(
+            "Invalid units",
+            "These slots have units that may crash the game:\n\n" + "\n".join(lines) + "\n\nSave anyway?",
+            icon="warning"
+        )
+
+    # ---------------- Watching the open file ----------------
+    def start_watching(self):
+        """With --watch, follow changes other programs make to the open file."""
+        if not self.watch or self.current_file is None:
+            return
+        from hwscenario.watch import DiskSnapshot, FileWatcher
+
+        if self.watcher is not None:
+            self.watcher.stop()
+        else:
+            import queue
+
+            self._watch_events = queue.Queue()
+            self.master.after(WATCH_POLL_MS, self._drain_watch_events)
+        self.disk = DiskSnapshot(self.schema, self.data)
+        self.watcher = FileWatcher(self.current_file, self._watch_events.put).start()
+
+    def _drain_watch_events(self):
+        import queue
+
+        changed = False
+        while True:
+            try:
+                path = self._watch_events.get_nowait()
+            except queue.Empty:
+                break
+            changed = changed or (self.current_file is not None
+                                  and path == os.path.abspath(self.current_file))
+        if changed:
+            self.reload_external_changes()
+        self.master.after(WATCH_POLL_MS, self._drain_watch_events)
+
+    def reload_external_changes(self):
+        """Take what another program changed in the open file, keeping unsaved edits."""
+        try:
+            with open(self.current_file, "rb") as f:
+                new = f.read()
+        except OSError:
+            return
+        if not self.property_grid:
+            self.store_widget_values()
+
+        merge = self.disk.merge(self.data, new)
+        if merge is None:
+            if self.data != self.disk.base:
+                messagebox.showwarning(
+                    "File changed",
+                    f"{os.path.basename(self.current_file)} changed size on disk. "
+                    "Keeping your unsaved version; saving will overwrite the file."
+                )
+                return
+            self.scenario = Scenario(bytearray(new), self.scenario.schema, self.current_file)
+            self.disk.reset(new)
+            self.populate_fields()
+            self.draw_spawn_points()
+            return
+
+        self.scenario.data[:] = merge.data
+        changed = list(merge.changed)
+        if merge.conflicts:
+            names = [self._spawn_name(spec) for spec in merge.conflicts]
+            use_theirs = messagebox.askyesno(
+                "Conflicting changes",
+                f"{os.path.basename(self.current_file)} was changed on disk in fields you have also edited:\n\n"
+                + "\n".join(names[:15]) + ("\n..." if len(names) > 15 else "")
+                + "\n\nUse the values from the file? (No keeps yours)"
+            )
+            if use_theirs:
+                for spec in merge.conflicts:
+                    self.scenario.data[spec.offset:spec.offset + spec.size] = new[spec.offset:spec.offset + spec.size]
+                changed += merge.conflicts
+        self._refresh_specs(changed)
+
+    def _refresh_specs(self, specs):
+        if not specs:
+            return
+        if self.property_grid:
+            self.refresh_grid(set(specs))
+        else:
+            for spec in specs:
+                self._show_value(spec, self.scenario.get(spec))
+        if any(spec.type == "position" for spec in specs):
+            self.draw_spawn_points()
 
     # ---------------- Help / Scenarios ----------------
     def open_help_menu(self):
         """Small popup menu for help options."""
         menu = Menu(self.master, tearoff=0)
         menu.add_command(label="Scenarios", command=self.open_scenarios_window)
+        menu.add_command(label="Find value", command=self.open_find_window)
 
         # Position at mouse cursor
         try:
@@ -540,75 +921,197 @@ class BinaryEditor:
         finally:
             menu.grab_release()
 
+    def _get_catalog(self):
+        """
+        scenarios.json is parsed once and kept, along with the summary cache. Open
+        Scenarios windows are re-populated when it changed since they were filled.
+        """
+        if self.catalog is None:
+            from hwscenario.catalog import ScenarioCatalog
+
+            script_dir = os.path.dirname(os.path.abspath(__file__))
+            vanilla_dir = os.path.join(script_dir, "vanilla")
+            self.catalog = ScenarioCatalog(
+                os.path.join(script_dir, "scenarios.json"),
+                script_dir,
+                cache_path=os.path.join(script_dir, "scenarios_cache.json"),
+                vanilla_dir=vanilla_dir if os.path.isdir(vanilla_dir) else None
+            )
+        entries = self.catalog.entries
+        self.catalog.load()
+        if self.catalog.entries is not entries:
+            for populate in list(self.catalog_views):
+                populate()
+        return self.catalog
+
+    def _load_scenario_bundle(self, key):
+        """Prefetch loader: file bytes, every decoded field and the map thumbnail."""
+        path, _mtime = key
+        schema = self._schema_for(path)
+        with open(path, "rb") as f:
+            scenario = Scenario(bytearray(f.read()), schema, path)
+        values = {field.spec: field.value for field in scenario.fields()}
+        try:
+            thumbnail = self._map_thumbnail(path)
+        except Exception:
+            thumbnail = None
+        return bytes(scenario.data), values, thumbnail, schema
+
+    def _bundle_key(self, path):
+        # The mtime makes edits on disk (including our own saves) miss the cache
+        return (path, os.stat(path).st_mtime_ns)
+
+    def prefetch_scenarios(self, paths):
+        if self.prefetcher is None:
+            from hwscenario.prefetch import Prefetcher
+
+            self.prefetcher = Prefetcher(self._load_scenario_bundle, max_entries=PREFETCH_ENTRIES)
+        keys = []
+        for path in paths:
+            if os.path.isfile(path):
+                keys.append(self._bundle_key(path))
+        self.prefetcher.prefetch(keys)
+
+    def stop_prefetching(self):
+        """Drop queued prefetches; the next Scenarios window starts a new prefetcher."""
+        if self.prefetcher is not None:
+            self.prefetcher.shutdown()
+            self.prefetcher = None
+
+    def _on_master_destroy(self, event):
+        # <Destroy> on the root also fires for every child widget
+        if event.widget is self.master:
+            self.stop_prefetching()
+
+    def open_scenario(self, path):
+        """Open a scenario, using the prefetched copy when there is one."""
+        if self.prefetcher is None:
+            schema = self._schema_for(path)
+            self.scenario = Scenario.open(path, schema)
+            values = thumbnail = None
+        else:
+            data, values, thumbnail, schema = self.prefetcher.get(self._bundle_key(path))
+            self.scenario = Scenario(bytearray(data), schema, path)
+        self._set_schema(schema)
+        self.current_file = path
+        self.opened_data = bytes(self.data)
+        self.populate_fields(values)
+        self.load_map_image(path, thumbnail)
+        self.start_watching()
+
     def open_scenarios_window(self):
         """Open a window showing all scenarios from scenarios.json."""
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        scenarios_path = os.path.join(script_dir, "scenarios.json")
-
-        # If scenarios.json missing, create a sample so the user can test immediately
-        if not os.path.exists(scenarios_path):
-            sample = {
-                "The First Battle": {
-                    "filename": "scn_001.bin",
-                    "description": "Link's first encounter on the battlefield."
-                },
-                "Shining Beacon": {
-                    "filename": "scn_002.bin",
-                    "description": "Zelda's signal resonates across Hyrule."
-                }
-            }
-            try:
-                with open(scenarios_path, "w", encoding="utf-8") as f:
-                    json.dump(sample, f, indent=4, ensure_ascii=False)
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to create sample scenarios.json:\n{e}")
-                return
+        import queue
+        from concurrent.futures import ThreadPoolExecutor
+        from tkinter.ttk import Treeview
+        from hwscenario.catalog import CatalogSearch
 
         try:
-            with open(scenarios_path, "r", encoding="utf-8") as f:
-                scenarios = json.load(f)
+            catalog = self._get_catalog()
+        except FileNotFoundError:
+            messagebox.showerror("Error", "scenarios.json not found next to the editor.")
+            return
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load scenarios.json:\n{e}")
             return
 
         win = Toplevel(self.master)
         win.title("Scenarios")
-        win.geometry("650x420")
+        win.geometry("1100x460")
 
         Label(win, text="Scenario List", font=("Arial", 14, "bold")).pack(anchor="n", pady=(8, 4))
 
-        tree = Treeview(win, columns=("name", "filename", "description"), show="headings")
-        tree.heading("name", text="Name")
-        tree.heading("filename", text="Filename")
-        tree.heading("description", text="Description")
-        tree.column("name", width=180, anchor="w")
-        tree.column("filename", width=150, anchor="w")
-        tree.column("description", width=300, anchor="w")
+        search_var = tk.StringVar()
+        search_frame = Frame(win)
+        search_frame.pack(fill="x", padx=8)
+        Label(search_frame, text="Search:").pack(side="left")
+        search_entry = Entry(search_frame, textvariable=search_var)
+        search_entry.pack(side="left", fill="x", expand=True, padx=6)
+        search_entry.focus_set()
+
+        tree = Treeview(win, columns=SCENARIO_COLUMNS, show="headings")
+        for col, text, width in SCENARIO_COLUMN_SPECS:
+            tree.heading(col, text=text)
+            tree.column(col, width=width, anchor="w", stretch=col == "description")
         tree.pack(fill="both", expand=True, padx=8, pady=6)
 
-        # Insert scenarios
-        for name, info in scenarios.items():
-            filename = info.get("filename", "")
-            desc = info.get("description", "")
-            tree.insert("", "end", values=(name, filename, desc))
+        results = queue.Queue()
+        entries, search, generation, pending = [], None, 0, 0
+
+        def populate():
+            """Rows go in right away, the summary columns are filled in as workers finish."""
+            nonlocal entries, search, generation, pending
+            entries = catalog.entries
+            search = CatalogSearch(entries)
+            # Summaries still on their way for the old rows are dropped
+            generation += 1
+            tree.delete(*tree.get_children())
+            for i, entry in enumerate(entries):
+                tree.insert("", "end", iid=str(i), values=(entry["name"], entry["filename"], entry["description"]) + ("...",) * 7)
+
+            if not pending:
+                win.after(50, drain_results)
+            pending = len(entries)
+            pool = ThreadPoolExecutor(max_workers=4)
+            schema = self.schema
+            for i, entry in enumerate(entries):
+                future = pool.submit(catalog.summary, schema, entry)
+                future.add_done_callback(lambda fut, i=i, gen=generation: results.put((gen, i, fut)))
+            pool.shutdown(wait=False)
+            if search_var.get():
+                on_search()
+
+        def drain_results():
+            nonlocal pending
+            if not win.winfo_exists():
+                return
+            try:
+                while True:
+                    gen, i, fut = results.get_nowait()
+                    if gen != generation:
+                        continue
+                    if fut.exception() is None:
+                        summary = fut.result()
+                    else:
+                        summary = {"present": False}
+                    tree.item(str(i), values=tree.item(str(i), "values")[:3] + _summary_columns(summary))
+                    pending -= 1
+            except queue.Empty:
+                pass
+            if not pending:
+                catalog.save_cache()
+                return
+            win.after(50, drain_results)
+
+        def on_search(*_):
+            visible = search.search(search_var.get())
+            tree.detach(*tree.get_children())
+            for pos, i in enumerate(visible):
+                tree.reattach(str(i), "", pos)
+
+        populate()
+        search_var.trace_add("write", on_search)
+        self.catalog_views.append(populate)
+
+        def on_destroy(event):
+            if event.widget is win and populate in self.catalog_views:
+                self.catalog_views.remove(populate)
+                if not self.catalog_views:
+                    self.stop_prefetching()
+
+        win.bind("<Destroy>", on_destroy, add="+")
 
         # Optional: double-click to open (load) the scenario file if present
         def on_double_click(event):
             item = tree.selection()
             if not item:
                 return
-            values = tree.item(item[0], "values")
-            # values = (name, filename, description)
-            fname = values[1]
-            # Try to open the file from script dir
-            full = os.path.join(script_dir, fname)
+            entry = entries[int(item[0])]
+            fname = entry["filename"]
+            full = catalog.path_for(entry)
             if os.path.exists(full):
                 try:
-                    with open(full, "rb") as f:
-                        self.data = bytearray(f.read())
-                    self.current_file = full
-                    self.populate_fields()
-                    self.load_map_image(full)
+                    self.open_scenario(full)
                     messagebox.showinfo("Loaded", f"Loaded scenario file: {fname}")
                 except Exception as e:
                     messagebox.showerror("Error", f"Failed to load scenario file:\n{e}")
@@ -617,8 +1120,204 @@ class BinaryEditor:
 
         tree.bind("<Double-1>", on_double_click)
 
+        # Story maps are usually opened in order, so warm up the rows around the selection
+        def on_select(event):
+            item = tree.selection()
+            if not item:
+                return
+            rows = [item[0], tree.prev(item[0]), tree.next(item[0])]
+            self.prefetch_scenarios(catalog.path_for(entries[int(iid)]) for iid in rows if iid)
+
+        tree.bind("<<TreeviewSelect>>", on_select)
+
+
+    def open_find_window(self):
+        """Search every scenario in the open file's folder for a 2-byte value or unit name."""
+        import queue
+        import threading
+        from tkinter.ttk import Treeview
+        from hwscenario.jsonl import iter_scenario_files
+        from hwscenario.patch import FieldLabeler
+        from hwscenario.wordindex import WordIndex, parse_value
+
+        folder = os.path.dirname(os.path.abspath(self.current_file)) if self.current_file else \
+            os.path.dirname(os.path.abspath(__file__))
+        win = Toplevel(self.master)
+        win.title(f"Find value in {folder}")
+        win.geometry("760x420")
+
+        value_var = tk.StringVar()
+        aligned_var = tk.BooleanVar(value=False)
+        uncovered_var = tk.BooleanVar(value=False)
+        bar = Frame(win)
+        bar.pack(fill="x", padx=8, pady=6)
+        Label(bar, text="Value or unit:").pack(side="left")
+        entry = Entry(bar, textvariable=value_var, width=24)
+        entry.pack(side="left", padx=6)
+        entry.focus_set()
+        tk.Checkbutton(bar, text="Aligned only", variable=aligned_var).pack(side="left")
+        tk.Checkbutton(bar, text="Not in fields.json only", variable=uncovered_var).pack(side="left")
+        find_button = Button(bar, text="Find")
+        find_button.pack(side="left", padx=6)
+        status = Label(win, text="", anchor="w")
+        status.pack(fill="x", padx=8)
+
+        tree = Treeview(win, columns=("file", "offset", "field"), show="headings")
+        for col, text, width in (("file", "File", 200), ("offset", "Offset", 80), ("field", "Field", 420)):
+            tree.heading(col, text=text)
+            tree.column(col, width=width, anchor="w", stretch=col == "field")
+        tree.pack(fill="both", expand=True, padx=8, pady=6)
+
+        schema = self.schema
+        labeler = FieldLabeler(schema)
+        results = queue.Queue()
+        paths = {}
+
+        def search(value, aligned):
+            # Runs off the Tk thread: the first search in a folder builds the index
+            try:
+                if self.word_index is None:
+                    self.word_index = WordIndex.load()
+                start = time.perf_counter()
+                files = list(iter_scenario_files([folder]))
+                indexed, _ = self.word_index.update(files, [folder])
+                hits = self.word_index.query(value, schema.byteorder, aligned, files)
+                results.put((hits, indexed, time.perf_counter() - start))
+            except Exception as e:
+                results.put(e)
+
+        def show_results():
+            if not win.winfo_exists():
+                return
+            try:
+                result = results.get_nowait()
+            except queue.Empty:
+                win.after(50, show_results)
+                return
+            find_button.config(state="normal")
+            if isinstance(result, Exception):
+                status.config(text=f"Search failed: {result}")
+                return
+            hits, indexed, elapsed = result
+            tree.delete(*tree.get_children())
+            paths.clear()
+            shown = 0
+            for path, offset in hits:
+                label = labeler.label(offset, offset + 2)
+                if uncovered_var.get() and label is not None:
+                    continue
+                iid = tree.insert("", "end", values=(os.path.basename(path), f"0x{offset:X}", label or "(not in fields.json)"))
+                paths[iid] = path
+                shown += 1
+            note = f", indexed {indexed} file(s)" if indexed else ""
+            status.config(text=f"{shown} hit(s) in {len(set(paths.values()))} file(s) ({elapsed:.2f}s{note})")
+
+        def on_find(*_):
+            try:
+                value = parse_value(value_var.get(), schema)
+            except ValueError as e:
+                status.config(text=str(e))
+                return
+            find_button.config(state="disabled")
+            status.config(text=f"Searching for {value:04X}...")
+            threading.Thread(target=search, args=(value, aligned_var.get()), daemon=True).start()
+            win.after(50, show_results)
+
+        find_button.config(command=on_find)
+        entry.bind("<Return>", on_find)
+
+        def on_double_click(event):
+            item = tree.selection()
+            if not item:
+                return
+            try:
+                self.open_scenario(paths[item[0]])
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to load scenario file:\n{e}")
+
+        tree.bind("<Double-1>", on_double_click)
+
+
+def _summary_columns(summary):
+    if not summary.get("present"):
+        return ("no",) + ("",) * 6
+    captains = summary["captains"]
+    leaders = summary["leaders"]
+    modified = {True: "yes", False: "no", None: "?"}[summary.get("modified")]
+    return (
+        "yes",
+        captains.get("Allied", 0),
+        captains.get("Enemy", 0),
+        captains.get("Rogue", 0),
+        leaders.get("Allied", ""),
+        leaders.get("Enemy", ""),
+        modified,
+    )
+
+
+def run_startup_trace(argv):
+    """
+    Start the editor again under "python -X importtime", let it quit once every
+    widget is built, then print its start-up spans and the slowest imports.
+    """
+    import subprocess
+
+    cmd = [sys.executable, "-X", "importtime", os.path.abspath(__file__), "--startup-trace-child"] + argv
+    proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    imports = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            print(line, file=sys.stderr)
+            continue
+        parts = line[len("import time:"):].split("|")
+        try:
+            cumulative = int(parts[1])
+        except (IndexError, ValueError):
+            continue
+        name = parts[2].rstrip()
+        # Top level imports have a single space of indent
+        if len(name) - len(name.lstrip()) == 1:
+            imports.append((cumulative, name.strip()))
+
+    print("Start-up phases:")
+    print(proc.stdout, end="")
+    print("\nSlowest top level imports:")
+    for cumulative, name in sorted(imports, reverse=True)[:12]:
+        print(f"{name:<28} {cumulative / 1000:8.1f} ms")
+    return proc.returncode
+
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Hyrule Warriors scenario editor")
+    parser.add_argument("--property-grid", action="store_true",
+                        help="show fields in a single scrolling list instead of one widget per field")
+    parser.add_argument("--startup-trace", action="store_true",
+                        help="measure start-up (imports, first paint, all widgets) and exit")
+    parser.add_argument("--layout", help="always use this layout from layouts.json (default: pick per file)")
+    parser.add_argument("--watch", action="store_true",
+                        help="reload fields other programs change in the open file")
+    parser.add_argument("--startup-trace-child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.startup_trace:
+        child_args = ["--property-grid"] if args.property_grid else []
+        sys.exit(run_startup_trace(child_args))
+
+    trace = on_ready = None
+    if args.startup_trace_child:
+        trace = StartupTrace()
+        trace.mark("imports")
+
     root = tk.Tk()
-    app = BinaryEditor(root)
+    if trace:
+        trace.mark("Tk()")
+
+        def on_ready():
+            trace.report()
+            root.after(1, root.destroy)
+
+    app = BinaryEditor(root, property_grid=args.property_grid, trace=trace, on_ready=on_ready, watch=args.watch,
+                       layout=args.layout)
     root.mainloop()
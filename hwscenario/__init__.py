@@ -0,0 +1,5 @@
+"""Headless scenario file tools shared by the editors and hwtool.py."""
+from .schema import Schema, FieldSpec, normalize_hex_key
+from .jsonl import export_records, import_records, read_jsonl, write_jsonl
+from .validate import UnitValidator
+from .model import Army, Field, Scenario, Slot, SquadMember
@@ -0,0 +1,210 @@
+"""
+Incremental release builds. A folder of edited, decompressed scenarios is compressed
+back to HWGZ with Auracomp and laid out the way Cemu (graphic pack) and the console
+(SDCafiine) load mods:
+
+    <out>/cemu/<name>/rules.txt
+    <out>/cemu/<name>/content/<files>
+    <out>/sdcafiine/<title id>/<name>/content/<files>
+
+<out>/build-manifest.json maps the hash of every decompressed input to its compressed
+artifact in <out>/.objects, so only files whose content changed are compressed again,
+and a rebuild with no changes doesn't compress or copy anything.
+"""
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+MANIFEST_NAME = "build-manifest.json"
+OBJECTS_DIR = ".objects"
+LAYOUTS = ("cemu", "console")
+DEFAULT_AURACOMP = os.environ.get("AURACOMP", "auracomp.exe")
+
+
+def auracomp_command(auracomp, src, dst, level="optimal"):
+    """Same arguments compress.bat uses."""
+    return [auracomp, "-compress", "-in", src, "-out", dst, "-algo", "HWGZ", "-level", level, "-endian", "Big"]
+
+
+def iter_inputs(src_dir, pattern=".bin"):
+    """Relative paths (with / separators) of every scenario file under src_dir."""
+    for root, dirs, names in os.walk(src_dir):
+        dirs.sort()
+        for name in sorted(names):
+            if name.endswith(pattern):
+                rel = os.path.relpath(os.path.join(root, name), src_dir)
+                yield rel.replace(os.sep, "/")
+
+
+def _sha1_file(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _same_file(path, size):
+    try:
+        return os.stat(path).st_size == size
+    except OSError:
+        return False
+
+
+def _copy(src, dst):
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    tmp = dst + ".tmp"
+    shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
+
+
+def rules_txt(name, title_ids, description=""):
+    return (
+        "[Definition]\n"
+        f"titleIds = {','.join(title_ids)}\n"
+        f"name = {name}\n"
+        f"path = \"Hyrule Warriors/Mods/{name}\"\n"
+        f"description = {description or 'Edited scenarios'}\n"
+        "version = 7\n"
+    )
+
+
+class ReleaseBuilder:
+    def __init__(self, src_dir, out_dir, name, title_ids, layouts=LAYOUTS, content_dir="",
+                 auracomp=DEFAULT_AURACOMP, level="optimal", pattern=".bin", workers=None):
+        if "console" in layouts and not title_ids:
+            raise ValueError("the console layout needs a title id")
+        self.src_dir = src_dir
+        self.out_dir = out_dir
+        self.name = name
+        self.title_ids = list(title_ids)
+        self.layouts = tuple(layouts)
+        self.content_dir = content_dir.strip("/")
+        self.auracomp = auracomp
+        self.level = level
+        self.pattern = pattern
+        self.workers = workers
+        self.manifest_path = os.path.join(out_dir, MANIFEST_NAME)
+        self.objects_dir = os.path.join(out_dir, OBJECTS_DIR)
+
+    @property
+    def compressor(self):
+        """Changing the compressor settings invalidates every artifact."""
+        return f"HWGZ/{self.level}/Big"
+
+    def content_roots(self):
+        roots = []
+        if "cemu" in self.layouts:
+            roots.append(os.path.join(self.out_dir, "cemu", self.name, "content"))
+        if "console" in self.layouts:
+            for title_id in self.title_ids:
+                roots.append(os.path.join(self.out_dir, "sdcafiine", title_id, self.name, "content"))
+        return roots
+
+    def load_manifest(self):
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = {}
+        if manifest.get("compressor") != self.compressor:
+            manifest = {"compressor": self.compressor, "objects": {}, "files": {}}
+        return manifest
+
+    def save_manifest(self, manifest):
+        tmp = self.manifest_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.manifest_path)
+
+    def _hash_inputs(self, old_files):
+        """{rel: file entry}, reusing the old hash when size and mtime didn't change."""
+        files = {}
+        for rel in iter_inputs(self.src_dir, self.pattern):
+            st = os.stat(os.path.join(self.src_dir, rel))
+            old = old_files.get(rel)
+            if old and old["size"] == st.st_size and old["mtime"] == st.st_mtime_ns:
+                files[rel] = old
+            else:
+                files[rel] = {"sha1": _sha1_file(os.path.join(self.src_dir, rel)),
+                              "size": st.st_size, "mtime": st.st_mtime_ns}
+        return files
+
+    def _compress(self, rel, digest):
+        dst = os.path.join(self.objects_dir, digest + ".hwgz")
+        tmp = dst + ".tmp"
+        cmd = auracomp_command(self.auracomp, os.path.join(self.src_dir, rel), tmp, self.level)
+        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+        if result.returncode != 0 or not os.path.isfile(tmp):
+            raise RuntimeError(f"auracomp failed on {rel}: {result.stdout.strip()}")
+        os.replace(tmp, dst)
+        return digest, {"artifact": f"{OBJECTS_DIR}/{digest}.hwgz", "size": os.path.getsize(dst),
+                        "sha1": _sha1_file(dst)}
+
+    def build(self, log=None):
+        """Bring the output tree up to date. Returns counts of what had to be done."""
+        log = log or (lambda message: None)
+        os.makedirs(self.objects_dir, exist_ok=True)
+        manifest = self.load_manifest()
+        old_files = manifest["files"]
+        objects = manifest["objects"]
+        files = self._hash_inputs(old_files)
+        stats = {"files": len(files), "compressed": 0, "copied": 0, "removed": 0}
+
+        # One compression per distinct content, skipping what is already built
+        todo = {}
+        for rel, entry in files.items():
+            obj = objects.get(entry["sha1"])
+            if obj is None or not _same_file(os.path.join(self.out_dir, obj["artifact"]), obj["size"]):
+                todo.setdefault(entry["sha1"], rel)
+        if todo:
+            with ThreadPoolExecutor(max_workers=self.workers or os.cpu_count()) as pool:
+                for digest, obj in pool.map(lambda item: self._compress(item[1], item[0]), todo.items()):
+                    objects[digest] = obj
+                    stats["compressed"] += 1
+                    log(f"compressed {todo[digest]}")
+
+        for root in self.content_roots():
+            for rel, entry in files.items():
+                obj = objects[entry["sha1"]]
+                dest = os.path.join(root, self.content_dir, *rel.split("/"))
+                old = old_files.get(rel)
+                if old and old["sha1"] == entry["sha1"] and entry["sha1"] not in todo and _same_file(dest, obj["size"]):
+                    continue
+                _copy(os.path.join(self.out_dir, obj["artifact"]), dest)
+                stats["copied"] += 1
+            for rel in old_files.keys() - files.keys():
+                dest = os.path.join(root, self.content_dir, *rel.split("/"))
+                if os.path.exists(dest):
+                    os.remove(dest)
+                    stats["removed"] += 1
+                    log(f"removed {rel}")
+
+        if "cemu" in self.layouts and self.title_ids:
+            path = os.path.join(self.out_dir, "cemu", self.name, "rules.txt")
+            text = rules_txt(self.name, self.title_ids)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    current = f.read()
+            except OSError:
+                current = None
+            if current != text:
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(text)
+
+        # Drop artifacts nothing refers to any more
+        used = {entry["sha1"] for entry in files.values()}
+        for digest in list(objects):
+            if digest not in used:
+                try:
+                    os.remove(os.path.join(self.out_dir, objects.pop(digest)["artifact"]))
+                except OSError:
+                    pass
+
+        manifest["files"] = files
+        if stats["compressed"] or stats["copied"] or stats["removed"] or old_files != files:
+            self.save_manifest(manifest)
+        return stats
@@ -0,0 +1,148 @@
+import hashlib
+import json
+import os
+import threading
+
+from .schema import ARMY_PREFIXES, EMPTY_UNIT, army_of
+
+
+def file_hash(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+def summarize(schema, data):
+    """Captain count and leader per army for one scenario buffer."""
+    captains = {army: 0 for _, army in ARMY_PREFIXES}
+    leaders = {}
+    for spec in schema.specs:
+        if spec.member is not None or spec.type != "enum":
+            continue
+        army = army_of(spec.field)
+        if army is None or spec.offset + spec.size > len(data):
+            continue
+        raw = bytes(data[spec.offset:spec.offset + spec.size])
+        if raw.hex().upper() == EMPTY_UNIT:
+            continue
+        captains[army] += 1
+        leaders.setdefault(army, schema.decode_raw(spec, raw))
+    return {"captains": captains, "leaders": leaders}
+
+
+class ScenarioCatalog:
+    """
+    scenarios.json loaded once, with incremental search and per-file summaries
+    cached by content hash (in memory and in a small json file next to it).
+    """
+
+    def __init__(self, scenarios_path, scenario_dir, cache_path=None, vanilla_dir=None):
+        self.scenarios_path = scenarios_path
+        self.scenario_dir = scenario_dir
+        self.cache_path = cache_path
+        self.vanilla_dir = vanilla_dir
+        self.entries = []
+        self._mtime = None
+        self._summaries = {}
+        self._vanilla_hashes = {}
+        self._lock = threading.Lock()
+        self._load_cache()
+
+    def load(self):
+        """(Re)read scenarios.json only if it changed since the last call."""
+        mtime = os.stat(self.scenarios_path).st_mtime_ns
+        if mtime == self._mtime:
+            return self.entries
+        with open(self.scenarios_path, "r", encoding="utf-8") as f:
+            scenarios = json.load(f)
+        self.entries = []
+        for name, info in scenarios.items():
+            filename = info.get("filename", "")
+            desc = info.get("description", "")
+            self.entries.append({
+                "name": name,
+                "filename": filename,
+                "description": desc,
+                "search": f"{name}\n{filename}\n{desc}".lower(),
+            })
+        self._mtime = mtime
+        return self.entries
+
+    def path_for(self, entry):
+        return os.path.join(self.scenario_dir, entry["filename"])
+
+    def summary(self, schema, entry):
+        """Summary columns for one entry. Safe to call from worker threads."""
+        path = self.path_for(entry)
+        if not entry["filename"] or not os.path.isfile(path):
+            return {"present": False}
+        with open(path, "rb") as f:
+            data = f.read()
+        digest = file_hash(data)
+        # Summaries depend on fields.json too
+        key = f"{schema.digest[:12]}:{digest}"
+        with self._lock:
+            cached = self._summaries.get(key)
+        if cached is None:
+            cached = summarize(schema, data)
+            with self._lock:
+                self._summaries[key] = cached
+        result = dict(cached, present=True, modified=self._is_modified(entry["filename"], digest))
+        return result
+
+    def _is_modified(self, filename, digest):
+        """True/False against the vanilla copy, None when there is nothing to compare to."""
+        if not self.vanilla_dir:
+            return None
+        with self._lock:
+            vanilla = self._vanilla_hashes.get(filename)
+        if vanilla is None:
+            path = os.path.join(self.vanilla_dir, filename)
+            if not os.path.isfile(path):
+                return None
+            with open(path, "rb") as f:
+                vanilla = file_hash(f.read())
+            with self._lock:
+                self._vanilla_hashes[filename] = vanilla
+        return digest != vanilla
+
+    def _load_cache(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                self._summaries = json.load(f)
+        except (OSError, ValueError):
+            self._summaries = {}
+
+    def save_cache(self):
+        if not self.cache_path:
+            return
+        with self._lock:
+            summaries = dict(self._summaries)
+        try:
+            with open(self.cache_path, "w", encoding="utf-8") as f:
+                json.dump(summaries, f)
+        except OSError:
+            pass
+
+
+class CatalogSearch:
+    """
+    Incremental search over one list of catalog entries. Each window keeps its own, so
+    typing in one doesn't reset the other's narrowing.
+    """
+
+    def __init__(self, entries):
+        self.entries = entries
+        self._text = ""
+        self._result = list(range(len(entries)))
+
+    def search(self, text):
+        """Indexes of entries matching text. Narrowing a query only re-checks the previous hits."""
+        text = text.strip().lower()
+        if text.startswith(self._text):
+            candidates = self._result
+        else:
+            candidates = range(len(self.entries))
+        self._result = [i for i in candidates if text in self.entries[i]["search"]]
+        self._text = text
+        return self._result
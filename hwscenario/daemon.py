@@ -0,0 +1,236 @@
+"""
+Long running helper that keeps fields.json compiled and recently used scenario
+buffers in memory, so scripts can decode/patch files without paying Python and
+schema start-up for every call. Speaks line delimited JSON-RPC 2.0 over a Unix socket.
+"""
+import errno
+import json
+import os
+import socket
+import socketserver
+import tempfile
+import threading
+from collections import OrderedDict
+
+from .jsonl import iter_records, record_bytes
+from .schema import Schema
+from .validate import UnitValidator, describe
+
+DEFAULT_SOCKET = os.path.join(tempfile.gettempdir(), "hwscenario.sock")
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+SERVER_ERROR = -32000
+
+
+class RpcError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class BufferCache:
+    """Small LRU of scenario file contents, invalidated when the file's mtime or size changes."""
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, path):
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        key = (st.st_mtime_ns, st.st_size)
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry and entry[0] == key:
+                self.entries.move_to_end(path)
+                return entry[1]
+        with open(path, "rb") as f:
+            data = f.read()
+        self.put(path, data, key)
+        return data
+
+    def put(self, path, data, key=None):
+        path = os.path.abspath(path)
+        if key is None:
+            st = os.stat(path)
+            key = (st.st_mtime_ns, st.st_size)
+        with self.lock:
+            self.entries[path] = (key, bytes(data))
+            self.entries.move_to_end(path)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+class ScenarioService:
+    """The RPC methods. Every public method takes keyword params and returns JSON-able data."""
+
+    def __init__(self, fields_path=None, cache_size=64):
+        self.schema = Schema.load(fields_path)
+        self.validator = UnitValidator(self.schema)
+        self.specs = {(spec.field, spec.member): spec for spec in self.schema.specs}
+        self.cache = BufferCache(cache_size)
+        self._path_locks = {}
+        self._locks_lock = threading.Lock()
+
+    def _spec(self, field, member=None):
+        spec = self.specs.get((field, member))
+        if spec is None:
+            raise RpcError(INVALID_PARAMS, f"unknown field {field!r} {member or ''}".rstrip())
+        return spec
+
+    def _path_lock(self, path):
+        with self._locks_lock:
+            return self._path_locks.setdefault(os.path.abspath(path), threading.Lock())
+
+    def ping(self):
+        return "pong"
+
+    def decode(self, path):
+        data = self.cache.get(path)
+        return list(iter_records(self.schema, os.path.basename(path), data))
+
+    def query(self, paths, field, member=None):
+        spec = self._spec(field, member)
+        out = []
+        for path in paths:
+            data = self.cache.get(path)
+            raw = bytes(data[spec.offset:spec.offset + spec.size])
+            out.append({"file": os.path.basename(path), "hex": raw.hex().upper(),
+                        "value": self.schema.decode_raw(spec, raw) if len(raw) == spec.size else None})
+        return out
+
+    def encode(self, field, value, member=None):
+        b = self.schema.encode_value(self._spec(field, member), value)
+        if b is None:
+            raise RpcError(INVALID_PARAMS, f"can't encode {value!r} for {field!r}")
+        return b.hex().upper()
+
+    def patch(self, path, changes, out=None):
+        """changes: list of {"field", "member"?, "value"? , "hex"?}. Writes to out (default: path)."""
+        target = out or path
+        # Requests run on their own threads: keep two patches of one file from losing each other's edits
+        locks = [self._path_lock(p) for p in sorted({os.path.abspath(path), os.path.abspath(target)})]
+        for lock in locks:
+            lock.acquire()
+        try:
+            data = bytearray(self.cache.get(path))
+            changed = 0
+            for change in changes:
+                spec = self._spec(change["field"], change.get("member"))
+                b = record_bytes(self.schema, spec, change)
+                if b is None or len(b) != spec.size:
+                    raise RpcError(INVALID_PARAMS, f"can't encode {change!r}")
+                if spec.offset + spec.size > len(data):
+                    raise RpcError(INVALID_PARAMS, f"{change['field']!r} is past the end of "
+                                                   f"{os.path.basename(path)} ({len(data)} bytes)")
+                if data[spec.offset:spec.offset + spec.size] != b:
+                    data[spec.offset:spec.offset + spec.size] = b
+                    changed += 1
+            if changed or target != path:
+                with open(target, "wb") as f:
+                    f.write(data)
+                self.cache.put(target, data)
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+        return {"file": os.path.basename(target), "changed": changed}
+
+    def lint(self, path):
+        return [describe(issue) for issue in self.validator.check(self.cache.get(path), os.path.basename(path))]
+
+    def dispatch(self, request):
+        if not isinstance(request, dict) or request.get("jsonrpc") != "2.0" or "method" not in request:
+            raise RpcError(INVALID_REQUEST, "invalid request")
+        name = request["method"]
+        method = getattr(self, name, None)
+        if name.startswith("_") or name == "dispatch" or not callable(method):
+            raise RpcError(METHOD_NOT_FOUND, f"unknown method {name!r}")
+        params = request.get("params") or {}
+        try:
+            return method(*params) if isinstance(params, list) else method(**params)
+        except TypeError as e:
+            raise RpcError(INVALID_PARAMS, str(e))
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            request_id = None
+            try:
+                request = json.loads(line)
+                request_id = request.get("id") if isinstance(request, dict) else None
+                response = {"jsonrpc": "2.0", "id": request_id, "result": self.server.service.dispatch(request)}
+            except json.JSONDecodeError as e:
+                response = {"jsonrpc": "2.0", "id": None, "error": {"code": PARSE_ERROR, "message": str(e)}}
+            except RpcError as e:
+                response = {"jsonrpc": "2.0", "id": request_id, "error": {"code": e.code, "message": e.message}}
+            except Exception as e:
+                response = {"jsonrpc": "2.0", "id": request_id, "error": {"code": SERVER_ERROR, "message": str(e)}}
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+def _remove_stale_socket(socket_path):
+    """Unlink a socket left behind by a daemon that died, but never one that is still running."""
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+    except ConnectionRefusedError:
+        os.unlink(socket_path)
+        return
+    except FileNotFoundError:
+        return
+    finally:
+        probe.close()
+    raise OSError(errno.EADDRINUSE, f"a server is already running on {socket_path}")
+
+
+class ScenarioServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path=DEFAULT_SOCKET, service=None):
+        if os.path.exists(socket_path):
+            _remove_stale_socket(socket_path)
+        self.service = service or ScenarioService()
+        super().__init__(socket_path, _Handler)
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+
+class ScenarioClient:
+    """Thin client: ScenarioClient().call("query", paths=[...], field="Slot 1")."""
+
+    def __init__(self, socket_path=DEFAULT_SOCKET):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(socket_path)
+        self.rfile = self.sock.makefile("rb")
+        self.next_id = 0
+
+    def call(self, method, *args, **kwargs):
+        self.next_id += 1
+        request = {"jsonrpc": "2.0", "id": self.next_id, "method": method, "params": list(args) or kwargs}
+        self.sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        response = json.loads(self.rfile.readline())
+        if "error" in response:
+            raise RpcError(response["error"]["code"], response["error"]["message"])
+        return response["result"]
+
+    def close(self):
+        self.rfile.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
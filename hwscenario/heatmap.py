@@ -0,0 +1,129 @@
+"""
+Per-offset statistics over a stack of scenario files, to spot structured regions
+that fields.json doesn't cover yet.
+"""
+import numpy as np
+
+from .scanner import mapped_offsets
+
+# Offsets correlated against the unit fields at a time
+CORR_BLOCK = 4096
+
+
+def stack_files(paths):
+    """Files as rows of an int16 matrix aligned by offset, shorter files padded with -1."""
+    buffers = []
+    for path in paths:
+        with open(path, "rb") as f:
+            buffers.append(np.frombuffer(f.read(), dtype=np.uint8))
+    width = max((len(b) for b in buffers), default=0)
+    matrix = np.full((len(buffers), width), -1, dtype=np.int16)
+    for row, b in enumerate(buffers):
+        matrix[row, :len(b)] = b
+    return matrix
+
+
+def _uses_ref(schema, spec, ref):
+    # Same test as UnitValidator: the field's own table, or one that points at `ref`
+    return spec.mapping_key == ref or schema.fields.get(spec.mapping_key, {}).get("options_ref") == ref
+
+
+def known_columns(schema, matrix, ref="units"):
+    """16-bit values of every known unit field, one column per field spec, plus the specs."""
+    specs = [s for s in schema.specs if s.type == "enum" and s.size == 2 and s.offset + 1 < matrix.shape[1]
+             and _uses_ref(schema, s, ref)]
+    offsets = np.array([s.offset for s in specs], dtype=np.intp)
+    hi = matrix[:, offsets].astype(np.int32)
+    lo = matrix[:, offsets + 1].astype(np.int32)
+    return (hi << 8) | lo, specs
+
+
+def _standardize(a):
+    a = a.astype(np.float64)
+    a -= a.mean(axis=0)
+    std = a.std(axis=0)
+    std[std == 0] = np.inf
+    return a / std
+
+
+def offset_stats(schema, matrix):
+    """
+    Per offset: distinct byte values, whether it's constant, and the strongest
+    correlation (and which field) with any known unit field across the files.
+    """
+    ordered = np.sort(matrix, axis=0)
+    distinct = 1 + (np.diff(ordered, axis=0) != 0).sum(axis=0)
+    if matrix.shape[0] == 0:
+        distinct = np.zeros(matrix.shape[1], dtype=np.intp)
+    constant = distinct == 1
+
+    known, specs = known_columns(schema, matrix)
+    n = max(matrix.shape[0], 1)
+    best = np.zeros(matrix.shape[1], dtype=np.intp)
+    correlation = np.zeros(matrix.shape[1])
+    if len(specs):
+        # Offsets x fields is hundreds of MB for full size files, so only keep the best per offset
+        known = _standardize(known)
+        for start in range(0, matrix.shape[1], CORR_BLOCK):
+            corr = np.abs(_standardize(matrix[:, start:start + CORR_BLOCK]).T @ known)
+            block = corr.argmax(axis=1)
+            best[start:start + len(block)] = block
+            correlation[start:start + len(block)] = corr[np.arange(len(block)), block] / n
+
+    covered = np.zeros(matrix.shape[1], dtype=bool)
+    for offset in mapped_offsets(schema):
+        if offset < len(covered):
+            covered[offset] = True
+
+    return {
+        "distinct": distinct,
+        "constant": constant,
+        "correlation": correlation,
+        "best_field": best,
+        "specs": specs,
+        "covered": covered,
+    }
+
+
+def render_heatmap(stats, path, width=512, cell=2):
+    """
+    Write a PNG with one block per `width` offsets. Each block has three bands:
+    distinct value count (dark = constant, bright = varies a lot), correlation
+    with known unit fields (red) and fields.json coverage (green).
+    """
+    from PIL import Image
+
+    distinct = stats["distinct"].astype(np.float64)
+    total = len(distinct)
+    lines = max(1, -(-total // width))
+
+    def wrap(values, fill=0.0):
+        out = np.full(lines * width, fill)
+        out[:total] = values
+        return out.reshape(lines, width)
+
+    scale = np.log1p(distinct.max()) if total and distinct.max() > 0 else 1.0
+    variance = wrap(np.log1p(distinct) / scale)
+    correlation = wrap(stats["correlation"])
+    covered = wrap(stats["covered"].astype(np.float64))
+
+    band = np.zeros((lines, 3, width, 3), dtype=np.uint8)
+    band[:, 0] = (variance[..., None] * 255).astype(np.uint8)
+    band[:, 1, :, 0] = (correlation * 255).astype(np.uint8)
+    band[:, 2, :, 1] = (covered * 200).astype(np.uint8)
+    # One blank row between blocks
+    rows = np.concatenate([band, np.zeros((lines, 1, width, 3), dtype=np.uint8)], axis=1)
+    rgb = rows.reshape(lines * 4, width, 3).repeat(cell, axis=0).repeat(cell, axis=1)
+    Image.fromarray(rgb, "RGB").save(path)
+
+
+def write_stats_csv(stats, fp, only_uncovered=False):
+    specs = stats["specs"]
+    fp.write("offset,distinct,constant,correlation,best_field,covered\n")
+    for offset in range(len(stats["distinct"])):
+        if only_uncovered and stats["covered"][offset]:
+            continue
+        best = specs[stats["best_field"][offset]] if specs else None
+        name = "" if best is None else (best.field if best.member is None else f"{best.field} / {best.member}")
+        fp.write(f"{offset},{stats['distinct'][offset]},{int(stats['constant'][offset])},"
+                 f"{stats['correlation'][offset]:.3f},\"{name}\",{int(stats['covered'][offset])}\n")
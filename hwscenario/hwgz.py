@@ -0,0 +1,203 @@
+"""
+Random access into HWGZ compressed scenarios (the format Auracomp writes with
+-algo HWGZ) without decompressing the whole file.
+
+Layout, as Auracomp reads it:
+    u32 chunk size, u32 chunk count, u32 decompressed size
+    u32 compressed size of each chunk
+    padding to 128 bytes
+    per chunk: u32 size, zlib stream, padding to 128 bytes
+Wii U files are big endian, Switch files little endian.
+
+Reading an offset only inflates the chunk(s) it falls in; the chunk boundaries
+are indexed once per file and can be kept in a json file between runs.
+"""
+import json
+import os
+import struct
+import threading
+import zlib
+from collections import OrderedDict, namedtuple
+
+ALIGN = 128
+
+ChunkIndex = namedtuple("ChunkIndex", "byteorder chunk_size size chunks")
+
+
+def _align(n):
+    return (n + ALIGN - 1) & ~(ALIGN - 1)
+
+
+def _read_header(head, byteorder):
+    fmt = ">" if byteorder == "big" else "<"
+    chunk_size, count, size = struct.unpack_from(fmt + "III", head)
+    # No magic number, so only accept headers that add up
+    if not 0x100 <= chunk_size <= 0x1000000 or chunk_size & (chunk_size - 1):
+        return None
+    if count != -(-size // chunk_size) or count == 0:
+        return None
+    return chunk_size, count, size
+
+
+def read_index(fp):
+    """ChunkIndex of an open HWGZ file, or ValueError if it isn't one."""
+    fp.seek(0, os.SEEK_END)
+    file_size = fp.tell()
+    fp.seek(0)
+    head = fp.read(12)
+    if len(head) < 12:
+        raise ValueError("not a HWGZ file")
+    for byteorder in ("big", "little"):
+        header = _read_header(head, byteorder)
+        if header is not None:
+            break
+    else:
+        raise ValueError("not a HWGZ file")
+    chunk_size, count, size = header
+    fmt = ">" if byteorder == "big" else "<"
+    table = fp.read(4 * count)
+    if len(table) < 4 * count:
+        raise ValueError("truncated HWGZ chunk table")
+    sizes = struct.unpack(f"{fmt}{count}I", table)
+
+    chunks = []
+    pos = _align(12 + 4 * count)
+    for i, listed in enumerate(sizes):
+        fp.seek(pos)
+        prefix = fp.read(4)
+        if len(prefix) < 4:
+            raise ValueError(f"HWGZ chunk {i} is past the end of the file")
+        (length,) = struct.unpack(fmt + "I", prefix)
+        # The table may or may not count the size prefix
+        if length not in (listed, listed - 4) or pos + 4 + length > file_size:
+            raise ValueError(f"HWGZ chunk {i} doesn't match the chunk table")
+        chunks.append((pos + 4, length))
+        pos = _align(pos + 4 + length)
+    return ChunkIndex(byteorder, chunk_size, size, chunks)
+
+
+def is_hwgz(path):
+    with open(path, "rb") as f:
+        head = f.read(12)
+    return len(head) == 12 and any(_read_header(head, b) for b in ("big", "little"))
+
+
+class IndexCache:
+    """Chunk indexes by path, checked against size and mtime, optionally kept in a json file."""
+
+    def __init__(self, cache_path=None):
+        self.cache_path = cache_path
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.dirty = False
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with open(cache_path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def get(self, path, fp):
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        key = [st.st_size, st.st_mtime_ns]
+        with self.lock:
+            entry = self.entries.get(path)
+        if entry and entry["key"] == key:
+            return ChunkIndex(entry["byteorder"], entry["chunk_size"], entry["size"],
+                              [tuple(c) for c in entry["chunks"]])
+        index = read_index(fp)
+        with self.lock:
+            self.entries[path] = dict(index._asdict(), key=key)
+            self.dirty = True
+        return index
+
+    def save(self):
+        if not self.cache_path or not self.dirty:
+            return
+        with self.lock:
+            entries = dict(self.entries)
+            self.dirty = False
+        try:
+            with open(self.cache_path, "w", encoding="utf-8") as f:
+                json.dump(entries, f)
+        except OSError:
+            pass
+
+
+class HWGZFile:
+    """
+    Read-only, bytes-like view of a compressed scenario. Supports len() and slicing,
+    so Schema.decode and iter_records work on it directly.
+    """
+
+    def __init__(self, path, index_cache=None, max_chunks=4):
+        self.path = path
+        self.fp = open(path, "rb")
+        try:
+            self.index = index_cache.get(path, self.fp) if index_cache else read_index(self.fp)
+        except Exception:
+            self.fp.close()
+            raise
+        self.max_chunks = max_chunks
+        self._chunks = OrderedDict()
+        self.inflated = 0
+
+    def __len__(self):
+        return self.index.size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.fp.close()
+
+    def chunk(self, i):
+        data = self._chunks.get(i)
+        if data is not None:
+            self._chunks.move_to_end(i)
+            return data
+        pos, length = self.index.chunks[i]
+        self.fp.seek(pos)
+        data = zlib.decompressobj().decompress(self.fp.read(length))
+        self.inflated += len(data)
+        self._chunks[i] = data
+        while len(self._chunks) > self.max_chunks:
+            self._chunks.popitem(last=False)
+        return data
+
+    def read(self, offset, length):
+        end = min(offset + length, self.index.size)
+        if offset >= end:
+            return b""
+        step = self.index.chunk_size
+        out = []
+        for i in range(offset // step, (end - 1) // step + 1):
+            base = i * step
+            out.append(self.chunk(i)[max(offset - base, 0):end - base])
+        return b"".join(out)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, stride = key.indices(self.index.size)
+            data = self.read(start, max(stop - start, 0))
+            return data if stride == 1 else data[::stride]
+        if key < 0:
+            key += self.index.size
+        if not 0 <= key < self.index.size:
+            raise IndexError("HWGZ offset out of range")
+        return self.read(key, 1)[0]
+
+    def tobytes(self):
+        return self.read(0, self.index.size)
+
+
+def open_scenario_data(path, index_cache=None):
+    """File contents for a decompressed scenario, or a lazy HWGZFile for a compressed one."""
+    if is_hwgz(path):
+        return HWGZFile(path, index_cache)
+    with open(path, "rb") as f:
+        return f.read()
@@ -0,0 +1,139 @@
+"""
+Scenario fields as JSON lines, one record per flat field or group member, so whole
+folders can be edited with other tools. Records carry the display value and the raw
+hex; importing patches only the bytes that differ back into the binaries.
+"""
+import json
+import os
+from itertools import groupby
+
+from .hwgz import HWGZFile, open_scenario_data
+
+
+def iter_scenario_files(paths, pattern=".bin"):
+    """Yield scenario file paths from a mix of files and directories, in name order."""
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                full = os.path.join(path, name)
+                if os.path.isfile(full) and name.endswith(pattern):
+                    yield full
+        else:
+            yield path
+
+
+def iter_records(schema, filename, data, specs=None):
+    """One record per flat field or group member of a single scenario buffer."""
+    for spec in schema.specs if specs is None else specs:
+        if spec.offset + spec.size > len(data):
+            continue
+        raw = bytes(data[spec.offset:spec.offset + spec.size])
+        record = {"file": filename, "field": spec.field}
+        if spec.member is not None:
+            record["member"] = spec.member
+        record["offset"] = spec.offset
+        record["hex"] = raw.hex().upper()
+        record["value"] = schema.decode_raw(spec, raw)
+        yield record
+
+
+def export_records(schema, paths, fields=None, index_cache=None):
+    """
+    Stream records for every scenario file. Only one file is held in memory at a time.
+    HWGZ compressed files are read in place, inflating only the chunks the fields are in.
+    `fields` limits the output to those field names.
+    """
+    specs = None if fields is None else [spec for spec in schema.specs if spec.field in fields]
+    for path in iter_scenario_files(paths):
+        data = open_scenario_data(path, index_cache)
+        try:
+            yield from iter_records(schema, os.path.basename(path), data, specs)
+        finally:
+            if isinstance(data, HWGZFile):
+                data.close()
+
+
+def write_jsonl(records, out):
+    count = 0
+    for record in records:
+        out.write(json.dumps(record, ensure_ascii=False))
+        out.write("\n")
+        count += 1
+    return count
+
+
+def read_jsonl(fp):
+    for line in fp:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def _spec_index(schema):
+    return {(spec.field, spec.member): spec for spec in schema.specs}
+
+
+def record_bytes(schema, spec, record):
+    """
+    Bytes a record asks for. The human readable "value" wins when it was edited,
+    otherwise the exact "hex" is used so unknown ids and odd strings survive.
+    """
+    raw = bytes.fromhex(record["hex"]) if "hex" in record else None
+    if "value" not in record:
+        return raw
+    if raw is not None and len(raw) == spec.size and schema.decode_raw(spec, raw) == record["value"]:
+        return raw
+    return schema.encode_value(spec, record["value"])
+
+
+def apply_records(schema, data, records, filename="", specs=None):
+    """Patch the fields records ask for into data (a bytearray). Returns how many changed."""
+    specs = specs or _spec_index(schema)
+    changed = 0
+    for record in records:
+        spec = specs.get((record["field"], record.get("member")))
+        if spec is None:
+            raise ValueError(f"{filename}: unknown field {record['field']!r} {record.get('member') or ''}".rstrip())
+        b = record_bytes(schema, spec, record)
+        if b is None:
+            raise ValueError(f"{filename}: can't encode {record['value']!r} for {record['field']!r}")
+        if spec.offset + spec.size > len(data):
+            continue
+        if data[spec.offset:spec.offset + spec.size] != b:
+            data[spec.offset:spec.offset + spec.size] = b
+            changed += 1
+    return changed
+
+
+def import_records(schema, records, base_dir, out_dir=None, layouts=None):
+    """
+    Apply a stream of records on top of the binaries in base_dir, writing to out_dir
+    (or back into base_dir). Only bytes that differ are patched and files with no
+    changes are not rewritten. Yields (filename, changed_field_count).
+    Records exported with --auto-layout carry a "layout"; pass a LayoutRegistry as
+    `layouts` to encode those with their layout's schema.
+    """
+    out_dir = out_dir or base_dir
+    specs = _spec_index(schema)
+    written = set()
+    for filename, file_records in groupby(records, key=lambda r: r["file"]):
+        out_path = os.path.join(out_dir, filename)
+        # A file that shows up twice in the stream continues from what we already wrote
+        src_path = out_path if filename in written else os.path.join(base_dir, filename)
+        with open(src_path, "rb") as f:
+            data = bytearray(f.read())
+
+        file_records = list(file_records)
+        layout = file_records[0].get("layout") if layouts is not None else None
+        if layout:
+            file_schema = layouts.schema(layout)
+            changed = apply_records(file_schema, data, file_records, filename)
+        else:
+            changed = apply_records(schema, data, file_records, filename, specs)
+
+        if changed or out_path != src_path:
+            os.makedirs(out_dir, exist_ok=True)
+            with open(out_path, "wb") as f:
+                f.write(data)
+            written.add(filename)
+        yield filename, changed
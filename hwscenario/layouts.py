@@ -0,0 +1,166 @@
+"""
+Picks the schema (fields file + byte order) for a scenario file without decoding it.
+
+layouts.json lists the known layouts. A fingerprint index, built once from reference
+files of each layout (e.g. a vanilla Wii U dump and a vanilla DE dump), records a few
+small "sentinel" windows near the start and end of the file that are the same in every
+file of a layout and not part of any field. Identifying a file then only reads those
+windows and hashes them (and the file size, as a fallback), then looks the hash up.
+
+    registry = LayoutRegistry.load()
+    layout = registry.identify("sn001.bin")
+    schema = registry.schema(layout)
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import namedtuple
+
+from .schema import DEFAULT_FIELDS_PATH, Schema
+
+ROOT_DIR = os.path.dirname(DEFAULT_FIELDS_PATH)
+DEFAULT_LAYOUTS_PATH = os.path.join(ROOT_DIR, "layouts.json")
+DEFAULT_INDEX_PATH = os.path.join(ROOT_DIR, "fingerprints.json")
+# Candidate windows: WINDOW bytes at a time within SCAN bytes of either end of the file
+WINDOW = 16
+SCAN = 1024
+MAX_WINDOWS = 4
+
+Layout = namedtuple("Layout", "name fields_path byteorder")
+
+
+def read_windows(path, windows):
+    """File size and the bytes of each (offset, length) window; negative offsets count from the end."""
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        chunks = []
+        for offset, length in windows:
+            start = offset if offset >= 0 else size + offset
+            if start < 0 or start + length > size:
+                chunks.append(b"")
+                continue
+            f.seek(start)
+            chunks.append(f.read(length))
+    return size, chunks
+
+
+def window_key(chunks):
+    h = hashlib.blake2b(digest_size=8)
+    for chunk in chunks:
+        h.update(len(chunk).to_bytes(2, "big"))
+        h.update(chunk)
+    return h.hexdigest()
+
+
+class LayoutRegistry:
+    def __init__(self, layouts, index=None, index_path=DEFAULT_INDEX_PATH):
+        self.layouts = {layout.name: layout for layout in layouts}
+        self.default = layouts[0]
+        self.index_path = index_path
+        self.index = index or {"windows": [], "keys": {}, "sizes": {}}
+        self._schemas = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path=DEFAULT_LAYOUTS_PATH, index_path=DEFAULT_INDEX_PATH):
+        """layouts.json (or just fields.json as big endian) plus the fingerprint index if there is one."""
+        layouts = []
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for entry in json.load(f)["layouts"]:
+                    fields_path = os.path.join(os.path.dirname(os.path.abspath(path)), entry.get("fields", "fields.json"))
+                    layouts.append(Layout(entry["name"], fields_path, entry.get("byteorder", "big")))
+        if not layouts:
+            layouts.append(Layout("Wii U", DEFAULT_FIELDS_PATH, "big"))
+        index = None
+        if index_path and os.path.exists(index_path):
+            with open(index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        return cls(layouts, index, index_path)
+
+    def schema(self, layout):
+        """Schema for a layout, loaded once and shared."""
+        layout = self.layouts[layout] if isinstance(layout, str) else layout
+        with self._lock:
+            schema = self._schemas.get(layout.name)
+            if schema is None:
+                schema = Schema.load(layout.fields_path, byteorder=layout.byteorder)
+                self._schemas[layout.name] = schema
+        return schema
+
+    def identify(self, path):
+        """Layout of a file, or None if the index doesn't know it."""
+        windows = [tuple(w) for w in self.index["windows"]]
+        size, chunks = read_windows(path, windows)
+        name = None
+        if windows:
+            name = self.index["keys"].get(window_key(chunks))
+        if name is None:
+            name = self.index["sizes"].get(str(size))
+        return self.layouts.get(name) if name else None
+
+    def schema_for_file(self, path):
+        """(layout, schema) for a file, falling back to the first layout."""
+        layout = self.identify(path) or self.default
+        return layout, self.schema(layout)
+
+    def build_index(self, samples):
+        """
+        Build the index from reference files: samples is {layout name: [paths]}.
+        Returns the chosen windows (empty if no window tells the layouts apart).
+        """
+        unknown = set(samples) - set(self.layouts)
+        if unknown:
+            raise ValueError(f"unknown layout(s): {', '.join(sorted(unknown))}")
+        covered = set()
+        for name in samples:
+            for spec in self.schema(name).specs:
+                covered.update(range(spec.offset, spec.offset + spec.size))
+
+        candidates = [(offset, WINDOW) for offset in range(0, SCAN, WINDOW)
+                      if not covered.intersection(range(offset, offset + WINDOW))]
+        candidates += [(-offset, WINDOW) for offset in range(SCAN, 0, -WINDOW)]
+        # Per layout, the candidate windows every reference file agrees on
+        constant = {}
+        for name, paths in samples.items():
+            values = None
+            for path in paths:
+                size, chunks = read_windows(path, candidates)
+                # Windows counted from the end can still land on a field in a short file
+                chunks = [None if offset < 0 and covered.intersection(range(size + offset, size + offset + length))
+                          else chunk for (offset, length), chunk in zip(candidates, chunks)]
+                if values is None:
+                    values = list(chunks)
+                else:
+                    values = [v if v == c else None for v, c in zip(values, chunks)]
+            constant[name] = values or [None] * len(candidates)
+        windows = []
+        for i, window in enumerate(candidates):
+            per_layout = [constant[name][i] for name in samples]
+            if any(v is None or not v for v in per_layout):
+                continue
+            # Only worth reading if it tells at least two layouts apart (or there's just one)
+            if len(set(per_layout)) > 1 or len(samples) == 1:
+                windows.append(window)
+            if len(windows) == MAX_WINDOWS:
+                break
+
+        keys, sizes = {}, {}
+        for name, paths in samples.items():
+            for path in paths:
+                size, chunks = read_windows(path, windows)
+                if windows:
+                    keys[window_key(chunks)] = name
+                # Sizes shared by two layouts can't decide anything
+                sizes[str(size)] = name if sizes.get(str(size), name) == name else None
+        self.index = {
+            "windows": [list(w) for w in windows],
+            "keys": keys,
+            "sizes": {size: name for size, name in sizes.items() if name},
+        }
+        return windows
+
+    def save_index(self, path=None):
+        with open(path or self.index_path, "w", encoding="utf-8") as f:
+            json.dump(self.index, f, indent=1)
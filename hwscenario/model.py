@@ -0,0 +1,180 @@
+"""
+Object view of a scenario file. Objects only hold a reference to the scenario and
+a field spec; values are decoded from the shared buffer when read and encoded
+straight back into it when assigned, so nothing is copied or decoded up front.
+
+    scn = Scenario.open("sn001.bin")
+    for slot in scn.enemy.slots:
+        print(slot.name, slot.unit, [m.unit for m in slot.squad])
+    scn.allied.slots[0].unit = "Dark Link"
+    scn.save("sn001_mod.bin")
+"""
+from .schema import ARMIES, EMPTY_UNIT, Schema
+
+_default_schema = None
+
+
+def default_schema():
+    """fields.json next to the editor, loaded on first use and shared."""
+    global _default_schema
+    if _default_schema is None:
+        _default_schema = Schema.load()
+    return _default_schema
+
+
+class Field:
+    """One field (or group member) of a scenario."""
+
+    __slots__ = ("scenario", "spec")
+
+    def __init__(self, scenario, spec):
+        self.scenario = scenario
+        self.spec = spec
+
+    @property
+    def name(self):
+        return self.spec.field if self.spec.member is None else self.spec.member
+
+    @property
+    def raw(self):
+        spec = self.spec
+        return bytes(self.scenario.data[spec.offset:spec.offset + spec.size])
+
+    @raw.setter
+    def raw(self, value):
+        spec = self.spec
+        if len(value) != spec.size:
+            raise ValueError(f"{self.name} is {spec.size} bytes, got {len(value)}")
+        if spec.offset + spec.size > len(self.scenario.data):
+            raise ValueError(f"{self.name} is past the end of the file")
+        self.scenario.data[spec.offset:spec.offset + spec.size] = value
+
+    @property
+    def value(self):
+        return self.scenario.schema.decode(self.scenario.data, self.spec)
+
+    @value.setter
+    def value(self, value):
+        b = self.scenario.schema.encode_value(self.spec, value)
+        if b is None:
+            raise ValueError(f"can't store {value!r} in {self.name}")
+        self.raw = b
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.name}={self.value!r}>"
+
+
+class SquadMember(Field):
+    __slots__ = ()
+
+    @property
+    def unit(self):
+        return self.value
+
+    @unit.setter
+    def unit(self, label):
+        self.value = label
+
+    @property
+    def unit_id(self):
+        return int.from_bytes(self.raw, self.scenario.schema.byteorder)
+
+    @unit_id.setter
+    def unit_id(self, value):
+        self.raw = value.to_bytes(self.spec.size, self.scenario.schema.byteorder)
+
+    @property
+    def empty(self):
+        return self.raw.hex().upper() == EMPTY_UNIT
+
+
+class Slot(SquadMember):
+    """A captain slot and its squad."""
+
+    __slots__ = ("squad_specs",)
+
+    def __init__(self, scenario, spec, squad_specs):
+        super().__init__(scenario, spec)
+        self.squad_specs = squad_specs
+
+    @property
+    def squad(self):
+        return [SquadMember(self.scenario, spec) for spec in self.squad_specs]
+
+
+class Army:
+    __slots__ = ("scenario", "name")
+
+    def __init__(self, scenario, name):
+        self.scenario = scenario
+        self.name = name
+
+    @property
+    def slots(self):
+        return [Slot(self.scenario, spec, squad) for spec, squad in self.scenario.schema.slot_layout()[self.name]]
+
+    @property
+    def captains(self):
+        """Slots that hold a unit."""
+        return [slot for slot in self.slots if not slot.empty]
+
+    def __repr__(self):
+        return f"<Army {self.name}: {len(self.captains)} captains>"
+
+
+class Scenario:
+    """A decompressed scenario buffer plus the schema to read it with."""
+
+    __slots__ = ("data", "schema", "path")
+
+    def __init__(self, data, schema=None, path=None):
+        self.data = data if isinstance(data, bytearray) else bytearray(data)
+        self.schema = schema or default_schema()
+        self.path = path
+
+    @classmethod
+    def open(cls, path, schema=None):
+        with open(path, "rb") as f:
+            return cls(bytearray(f.read()), schema, path)
+
+    def save(self, path=None):
+        path = path or self.path
+        with open(path, "wb") as f:
+            f.write(self.data)
+        self.path = path
+
+    def field(self, field, member=None):
+        """Field by name, e.g. field("Slot 1 squad", "Slot 2"). Also takes a FieldSpec."""
+        spec = field if member is None and not isinstance(field, str) else self.schema.spec(field, member)
+        if spec is None:
+            raise KeyError(field if member is None else f"{field} / {member}")
+        return Field(self, spec)
+
+    def get(self, field, member=None):
+        return self.field(field, member).value
+
+    def set(self, field, value, member=None):
+        self.field(field, member).value = value
+
+    def fields(self):
+        for spec in self.schema.specs:
+            yield Field(self, spec)
+
+    @property
+    def armies(self):
+        return {name: Army(self, name) for name in ARMIES}
+
+    @property
+    def allied(self):
+        return Army(self, "Allied")
+
+    @property
+    def enemy(self):
+        return Army(self, "Enemy")
+
+    @property
+    def rogue(self):
+        return Army(self, "Rogue")
+
+    def __repr__(self):
+        return f"<Scenario {self.path or len(self.data)}>"
@@ -0,0 +1,220 @@
+"""
+Compact patches against vanilla scenario files (.hwsp).
+
+A patch set holds one entry per scenario file: its name, the size and sha1 of the
+vanilla file it applies to, the sha1 of the result, and the changed byte ranges,
+each labelled with the fields it touches. Layout (big endian):
+
+    b"HWSP", u8 version, zlib(
+        u16 entry count, per entry:
+            u16 name length, name (utf-8)
+            u32 source size, 20 byte source sha1, 20 byte target sha1
+            u16 label count, per label: u16 length, utf-8 text
+            u32 record count, per record: u32 offset, u16 length, u16 label index, bytes
+    )
+
+Label index 0xFFFF means the bytes aren't part of any known field.
+"""
+import bisect
+import hashlib
+import os
+import struct
+import zlib
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+MAGIC = b"HWSP"
+VERSION = 1
+NO_LABEL = 0xFFFF
+# Unchanged bytes allowed inside one record before it is split in two
+MERGE_GAP = 4
+MAX_RECORD = 0xFFFF
+
+Record = namedtuple("Record", "offset data label")
+FilePatch = namedtuple("FilePatch", "filename source_size source_sha1 target_sha1 records")
+
+
+class PatchError(ValueError):
+    pass
+
+
+def sha1(data):
+    return hashlib.sha1(data).digest()
+
+
+class FieldLabeler:
+    """Names of the fields overlapping a byte range, e.g. "Slot 1 squad / Slot 2"."""
+
+    def __init__(self, schema):
+        self.specs = sorted(schema.specs, key=lambda s: s.offset)
+        self.starts = [s.offset for s in self.specs]
+        self.longest = max((s.size for s in self.specs), default=0)
+
+    def label(self, start, end):
+        names = []
+        i = bisect.bisect_left(self.starts, start - self.longest + 1)
+        while i < len(self.specs) and self.specs[i].offset < end:
+            spec = self.specs[i]
+            if spec.offset + spec.size > start:
+                name = spec.field if spec.member is None else f"{spec.field} / {spec.member}"
+                if name not in names:
+                    names.append(name)
+            i += 1
+        return ", ".join(names) or None
+
+
+def changed_ranges(source, target, merge_gap=MERGE_GAP, block=4096):
+    """(start, end) of every run of differing bytes, joining runs closer than merge_gap."""
+    ranges = []
+    for base in range(0, min(len(source), len(target)), block):
+        # Most of a modded file is untouched, so skip equal blocks with one compare
+        if source[base:base + block] == target[base:base + block]:
+            continue
+        for offset in range(base, min(base + block, len(source), len(target))):
+            if source[offset] == target[offset]:
+                continue
+            if ranges and offset - ranges[-1][1] <= merge_gap and offset + 1 - ranges[-1][0] <= MAX_RECORD:
+                ranges[-1][1] = offset + 1
+            else:
+                ranges.append([offset, offset + 1])
+    return ranges
+
+
+def diff(filename, source, target, labeler=None):
+    """FilePatch turning source into target. Both must be the same size."""
+    if len(source) != len(target):
+        raise PatchError(f"{filename}: size changed ({len(source)} -> {len(target)} bytes), can't patch")
+    records = []
+    for start, end in changed_ranges(source, target):
+        label = labeler.label(start, end) if labeler else None
+        records.append(Record(start, bytes(target[start:end]), label))
+    return FilePatch(filename, len(source), sha1(source), sha1(target), records)
+
+
+def apply(patch, source):
+    """Patched copy of source, after checking it is the file the patch was made for."""
+    if len(source) != patch.source_size or sha1(source) != patch.source_sha1:
+        raise PatchError(f"{patch.filename}: not the vanilla file this patch was made for")
+    data = bytearray(source)
+    for record in patch.records:
+        data[record.offset:record.offset + len(record.data)] = record.data
+    if sha1(data) != patch.target_sha1:
+        raise PatchError(f"{patch.filename}: patched file doesn't match the patch's checksum")
+    return data
+
+
+def _pack_str(text):
+    b = text.encode("utf-8")
+    return struct.pack(">H", len(b)) + b
+
+
+def dumps(patches):
+    out = [struct.pack(">H", len(patches))]
+    for patch in patches:
+        labels = []
+        index = {}
+        for record in patch.records:
+            if record.label is not None and record.label not in index:
+                index[record.label] = len(labels)
+                labels.append(record.label)
+        out.append(_pack_str(patch.filename))
+        out.append(struct.pack(">I20s20s", patch.source_size, patch.source_sha1, patch.target_sha1))
+        out.append(struct.pack(">H", len(labels)))
+        out.extend(_pack_str(label) for label in labels)
+        out.append(struct.pack(">I", len(patch.records)))
+        for record in patch.records:
+            label = NO_LABEL if record.label is None else index[record.label]
+            out.append(struct.pack(">IHH", record.offset, len(record.data), label))
+            out.append(record.data)
+    return MAGIC + bytes([VERSION]) + zlib.compress(b"".join(out), 9)
+
+
+def loads(blob):
+    if blob[:4] != MAGIC:
+        raise PatchError("not a .hwsp patch")
+    if blob[4] != VERSION:
+        raise PatchError(f"unsupported .hwsp version {blob[4]}")
+    body = zlib.decompress(blob[5:])
+    pos = 0
+
+    def take(fmt):
+        nonlocal pos
+        values = struct.unpack_from(fmt, body, pos)
+        pos += struct.calcsize(fmt)
+        return values
+
+    def take_str():
+        nonlocal pos
+        (length,) = take(">H")
+        pos += length
+        return body[pos - length:pos].decode("utf-8")
+
+    patches = []
+    (count,) = take(">H")
+    for _ in range(count):
+        filename = take_str()
+        source_size, source_sha1, target_sha1 = take(">I20s20s")
+        labels = [take_str() for _ in range(take(">H")[0])]
+        records = []
+        for _ in range(take(">I")[0]):
+            offset, length, label = take(">IHH")
+            records.append(Record(offset, body[pos:pos + length], None if label == NO_LABEL else labels[label]))
+            pos += length
+        patches.append(FilePatch(filename, source_size, source_sha1, target_sha1, records))
+    return patches
+
+
+def write_patch_file(path, patches):
+    with open(path, "wb") as f:
+        f.write(dumps(patches))
+
+
+def read_patch_file(path):
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+def diff_dirs(schema, vanilla_dir, modded_paths):
+    """FilePatch for every modded file that differs from its namesake in vanilla_dir."""
+    labeler = FieldLabeler(schema)
+    for path in modded_paths:
+        filename = os.path.basename(path)
+        with open(os.path.join(vanilla_dir, filename), "rb") as f:
+            source = f.read()
+        with open(path, "rb") as f:
+            target = f.read()
+        if source != target:
+            yield diff(filename, source, target, labeler)
+
+
+def _apply_one(patch, vanilla_dir, out_dir):
+    """(filename, status, message) for one file; status is applied, skipped or failed."""
+    src = os.path.join(vanilla_dir, patch.filename)
+    try:
+        with open(src, "rb") as f:
+            source = f.read()
+    except OSError as e:
+        return patch.filename, "failed", str(e)
+    if sha1(source) == patch.target_sha1 and out_dir == vanilla_dir:
+        return patch.filename, "skipped", "already patched"
+    try:
+        data = apply(patch, source)
+    except PatchError as e:
+        return patch.filename, "failed", str(e)
+    tmp = os.path.join(out_dir, patch.filename + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, os.path.join(out_dir, patch.filename))
+    return patch.filename, "applied", f"{len(patch.records)} range(s)"
+
+
+def apply_patch_set(patches, vanilla_dir, out_dir=None, workers=None):
+    """
+    Apply patches to the files in vanilla_dir on a thread pool, writing to out_dir
+    (default: in place). Every file is checked against the patch's source checksum
+    first and its target checksum after. Yields (filename, status, message).
+    """
+    out_dir = out_dir or vanilla_dir
+    os.makedirs(out_dir, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(lambda p: _apply_one(p, vanilla_dir, out_dir), patches)
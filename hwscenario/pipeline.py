@@ -0,0 +1,208 @@
+"""
+Multi-file jobs as one pass instead of Auracomp, the editor and compress.bat by hand:
+
+    read / decompress -> apply edits -> validate units -> compress and write
+
+Stages are connected by bounded asyncio queues, so reading one file overlaps with
+compressing another and at most a few files per stage are in memory at once, however
+large the corpus. Decompression, edits and validation run in a process pool; Auracomp
+runs as a subprocess per file.
+"""
+import asyncio
+import os
+import shutil
+import tempfile
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from .build import DEFAULT_AURACOMP, auracomp_command
+from .hwgz import HWGZFile, is_hwgz
+from .jsonl import apply_records
+from .schema import Schema
+from .validate import UnitValidator, describe
+
+DEFAULT_DEPTH = 4
+_DONE = object()
+
+_worker = None
+
+
+class Item:
+    __slots__ = ("path", "filename", "data", "changed", "issues", "output", "error")
+
+    def __init__(self, path):
+        self.path = path
+        self.filename = os.path.basename(path)
+        self.data = None
+        self.changed = 0
+        self.issues = []
+        self.output = None
+        self.error = None
+
+
+def _init_worker(fields_path):
+    global _worker
+    schema = Schema.load(fields_path)
+    _worker = (schema, UnitValidator(schema))
+
+
+def _read(path):
+    if is_hwgz(path):
+        with HWGZFile(path) as f:
+            return f.tobytes()
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _edit(filename, data, records):
+    data = bytearray(data)
+    changed = apply_records(_worker[0], data, records, filename)
+    return bytes(data), changed
+
+
+def _validate(filename, data):
+    return [describe(issue) for issue in _worker[1].check(data, filename)]
+
+
+class Pipeline:
+    def __init__(self, out_dir, edits=None, fields_path=None, compress=True, auracomp=DEFAULT_AURACOMP,
+                 level="optimal", strict=False, depth=DEFAULT_DEPTH, workers=None, log=None):
+        """
+        edits: records in the export format; each applies to the file named in "file".
+        strict: don't write files that fail validation.
+        """
+        self.out_dir = out_dir
+        self.edits = defaultdict(list)
+        for record in edits or ():
+            self.edits[record["file"]].append(record)
+        self.fields_path = fields_path
+        self.compress = compress
+        self.auracomp = auracomp
+        self.level = level
+        self.strict = strict
+        self.depth = depth
+        self.workers = workers or os.cpu_count() or 1
+        self.log = log or (lambda message: None)
+        self.pool = None
+        self.tmp_dir = None
+
+    async def _offload(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.pool, func, *args)
+
+    async def read(self, item):
+        item.data = await self._offload(_read, item.path)
+        return item
+
+    async def edit(self, item):
+        records = self.edits.get(item.filename)
+        if records:
+            item.data, item.changed = await self._offload(_edit, item.filename, item.data, records)
+        return item
+
+    async def validate(self, item):
+        item.issues = await self._offload(_validate, item.filename, item.data)
+        if item.issues and self.strict:
+            item.error = f"{len(item.issues)} invalid unit(s), not written"
+        return item
+
+    async def write(self, item):
+        if item.error:
+            return item
+        target = os.path.join(self.out_dir, item.filename)
+        if not self.compress:
+            await asyncio.to_thread(_write_file, target, item.data)
+        else:
+            source = os.path.join(self.tmp_dir, item.filename)
+            await asyncio.to_thread(_write_file, source, item.data)
+            proc = await asyncio.create_subprocess_exec(
+                *auracomp_command(self.auracomp, source, target + ".tmp", self.level),
+                stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT)
+            output, _ = await proc.communicate()
+            os.remove(source)
+            if proc.returncode != 0 or not os.path.isfile(target + ".tmp"):
+                item.error = f"auracomp failed: {output.decode(errors='replace').strip()}"
+                return item
+            os.replace(target + ".tmp", target)
+        item.output = target
+        item.data = None
+        return item
+
+    async def _stage(self, func, inbox, outbox, concurrency):
+        async def worker():
+            while True:
+                item = await inbox.get()
+                if item is _DONE:
+                    # Leave it for this stage's other workers
+                    await inbox.put(_DONE)
+                    return
+                if item.error is None:
+                    try:
+                        item = await func(item)
+                    except Exception as e:
+                        item.error = str(e)
+                if item.error is not None:
+                    item.data = None
+                await outbox.put(item)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        await outbox.put(_DONE)
+
+    async def _feed(self, paths, outbox):
+        for path in paths:
+            await outbox.put(Item(path))
+        await outbox.put(_DONE)
+
+    async def run_async(self, paths):
+        """Run every file through all stages. Returns the finished Items in completion order."""
+        os.makedirs(self.out_dir, exist_ok=True)
+        queues = [asyncio.Queue(maxsize=self.depth) for _ in range(5)]
+        stages = [
+            (self.read, self.workers),
+            (self.edit, self.workers),
+            (self.validate, self.workers),
+            (self.write, self.workers if self.compress else 2),
+        ]
+        results = []
+
+        async def collect():
+            while True:
+                item = await queues[-1].get()
+                if item is _DONE:
+                    return
+                results.append(item)
+                self.log(_describe_item(item))
+
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                        initargs=(self.fields_path,))
+        self.tmp_dir = tempfile.mkdtemp(prefix="hwpipeline")
+        try:
+            await asyncio.gather(
+                self._feed(paths, queues[0]),
+                *(self._stage(func, queues[i], queues[i + 1], n) for i, (func, n) in enumerate(stages)),
+                collect(),
+            )
+        finally:
+            self.pool.shutdown()
+            shutil.rmtree(self.tmp_dir, ignore_errors=True)
+        return results
+
+    def run(self, paths):
+        return asyncio.run(self.run_async(list(paths)))
+
+
+def _write_file(path, data):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _describe_item(item):
+    if item.error:
+        return f"{item.filename}: failed, {item.error}"
+    note = f", {len(item.issues)} unit warning(s)" if item.issues else ""
+    return f"{item.filename}: {item.changed} field(s) changed{note}"
+
+
+def auracomp_available(auracomp):
+    return os.path.isfile(auracomp) or shutil.which(auracomp) is not None
@@ -0,0 +1,43 @@
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class Prefetcher:
+    """
+    Bounded LRU of values loaded on a background thread. prefetch() queues keys
+    that aren't cached yet, get() returns the value, waiting for it if it's
+    still loading or loading it on the spot if it was never requested.
+    Meant to be driven from a single (GUI) thread.
+    """
+
+    def __init__(self, load, max_entries=8, workers=1):
+        self.load = load
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch")
+
+    def prefetch(self, keys):
+        for key in keys:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+            else:
+                self.entries[key] = self.pool.submit(self.load, key)
+        while len(self.entries) > self.max_entries:
+            _, future = self.entries.popitem(last=False)
+            future.cancel()
+
+    def get(self, key):
+        future = self.entries.get(key)
+        if future is None or future.cancelled() or (future.done() and future.exception() is not None):
+            # Not prefetched (or it failed), load now so errors reach the caller
+            value = self.load(key)
+            future = Future()
+            future.set_result(value)
+            self.entries[key] = future
+            self.entries.move_to_end(key)
+            return value
+        self.entries.move_to_end(key)
+        return future.result()
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
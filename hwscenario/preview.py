@@ -0,0 +1,255 @@
+"""
+Headless map previews for release notes: each scenario's map image with its captains
+and squads drawn on, rendered on a process pool and cached, plus a contact sheet.
+
+A preview is the map image, a marker for every decoded spawn point and a roster panel
+(captain and squad of every filled slot, per army). Outputs are cached by (scenario
+hash, map image hash, schema digest), so re-rendering a release only redraws what changed.
+Unit icons are read from img/units/<id>.png when present, otherwise a coloured badge
+with the unit's initial is drawn.
+"""
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .schema import ARMIES, EMPTY_UNIT, Schema
+
+PREVIEW_VERSION = 1
+MAP_SIZE = 640
+PANEL_WIDTH = 440
+LINE_HEIGHT = 13
+ICON_SIZE = 12
+MARKER_RADIUS = 6
+ARMY_COLORS = {"Allied": (60, 110, 230), "Enemy": (220, 50, 50), "Rogue": (240, 150, 30), None: (200, 200, 200)}
+CACHE_NAME = "preview-cache.json"
+SHEET_COLUMNS = 4
+
+_worker = None
+
+
+def load_bounds(scenarios_path):
+    """{map base name: (min_x, min_z, max_x, max_z)} from scenarios.json "bounds"."""
+    try:
+        with open(scenarios_path, "r", encoding="utf-8") as f:
+            scenarios = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return {info.get("filename", "").split(".bin")[0]: tuple(float(v) for v in info["bounds"])
+            for info in scenarios.values() if "bounds" in info}
+
+
+def map_image_path(img_dir, base_name):
+    path = os.path.join(img_dir, f"{base_name}.png")
+    return path if os.path.exists(path) else os.path.join(img_dir, "missing.png")
+
+
+def _filled(data, spec):
+    raw = bytes(data[spec.offset:spec.offset + spec.size])
+    return len(raw) == spec.size and raw.hex().upper() != EMPTY_UNIT
+
+
+def placements(schema, data):
+    """
+    Roster per army, {army: [{"slot", "unit", "unit_id", "squad": [(label, id)]}]} for
+    every filled slot, and [(name, army, unit, (x, z))] for every decoded spawn point.
+    """
+    roster = {army: [] for army in ARMIES}
+    owners = {}
+    for army, slots in schema.slot_layout().items():
+        for spec, squad in slots:
+            if not _filled(data, spec):
+                continue
+            unit_id = int.from_bytes(data[spec.offset:spec.offset + spec.size], schema.byteorder)
+            members = [(schema.decode(data, m), int.from_bytes(data[m.offset:m.offset + m.size], schema.byteorder))
+                       for m in squad if _filled(data, m)]
+            entry = {"slot": spec.field, "unit": schema.decode(data, spec), "unit_id": unit_id, "squad": members}
+            roster[army].append(entry)
+            owners[spec.field] = (army, entry["unit"])
+
+    points = []
+    for spec in schema.specs:
+        if spec.type != "position":
+            continue
+        pos = schema.decode(data, spec)
+        if pos is None:
+            continue
+        # "Enemy Slot 3 position" belongs to "Enemy Slot 3": the longest slot name the field starts with
+        owner = max((name for name in owners if spec.field.startswith(name)), key=len, default=None)
+        army, unit = owners.get(owner, (None, None))
+        name = spec.field if spec.member is None else f"{spec.field} {spec.member}"
+        points.append((name, army, unit, tuple(pos)))
+    return roster, points
+
+
+def _fit_bounds(points):
+    """Same fallback as the editor: fit the decoded points with some padding."""
+    xs = [p[3][0] for p in points]
+    zs = [p[3][1] for p in points]
+    pad_x = (max(xs) - min(xs)) * 0.1 or 1.0
+    pad_z = (max(zs) - min(zs)) * 0.1 or 1.0
+    return min(xs) - pad_x, min(zs) - pad_z, max(xs) + pad_x, max(zs) + pad_z
+
+
+class Renderer:
+    def __init__(self, img_dir, bounds=None):
+        from PIL import ImageFont
+
+        self.img_dir = img_dir
+        self.bounds = bounds or {}
+        self.font = ImageFont.load_default()
+        self._icons = {}
+
+    def icon(self, unit_id, label, army):
+        """img/units/<id>.png scaled to ICON_SIZE, or a badge with the label's first letter."""
+        from PIL import Image, ImageDraw
+
+        key = (unit_id, army)
+        icon = self._icons.get(key)
+        if icon is None:
+            path = os.path.join(self.img_dir, "units", f"{unit_id:04X}.png")
+            if os.path.exists(path):
+                icon = Image.open(path).convert("RGBA")
+                icon.thumbnail((ICON_SIZE, ICON_SIZE))
+            else:
+                icon = Image.new("RGBA", (ICON_SIZE, ICON_SIZE), (0, 0, 0, 0))
+                draw = ImageDraw.Draw(icon)
+                draw.ellipse((0, 0, ICON_SIZE - 1, ICON_SIZE - 1), fill=ARMY_COLORS[army] + (255,))
+                # "[Switch] Big Blin" -> "B"
+                letter = (label or "?").rsplit("] ", 1)[-1].lstrip("(")[:1].upper() or "?"
+                draw.text((3, 0), letter, fill=(255, 255, 255, 255), font=self.font)
+            self._icons[key] = icon
+        return icon
+
+    def render(self, schema, data, base_name, title=None):
+        from PIL import Image, ImageDraw
+
+        roster, points = placements(schema, data)
+        map_img = Image.open(map_image_path(self.img_dir, base_name)).convert("RGBA")
+        map_img.thumbnail((MAP_SIZE, MAP_SIZE))
+        rows = sum(1 + len(entry["squad"]) for entries in roster.values() for entry in entries) + 4 * len(ARMIES)
+        height = max(map_img.size[1], (rows + 2) * LINE_HEIGHT)
+        canvas = Image.new("RGBA", (map_img.size[0] + PANEL_WIDTH, height), (24, 24, 28, 255))
+        canvas.paste(map_img, (0, 0))
+        draw = ImageDraw.Draw(canvas)
+
+        if points:
+            min_x, min_z, max_x, max_z = self.bounds.get(base_name) or _fit_bounds(points)
+            w, h = map_img.size
+            for name, army, unit, (x, z) in points:
+                px = (x - min_x) / (max_x - min_x) * w
+                py = (z - min_z) / (max_z - min_z) * h
+                r = MARKER_RADIUS
+                draw.ellipse((px - r, py - r, px + r, py + r), fill=ARMY_COLORS[army], outline=(255, 255, 255))
+                draw.text((px + r + 2, py - r), unit or name, fill=(255, 255, 255), font=self.font,
+                          stroke_width=1, stroke_fill=(0, 0, 0))
+
+        x0 = map_img.size[0] + 10
+        y = 6
+        draw.text((x0, y), title or base_name, fill=(255, 255, 255), font=self.font)
+        y += LINE_HEIGHT * 2
+        for army in ARMIES:
+            entries = roster[army]
+            if not entries:
+                continue
+            draw.text((x0, y), f"{army} ({len(entries)} captains)", fill=ARMY_COLORS[army], font=self.font)
+            y += LINE_HEIGHT + 2
+            for entry in entries:
+                canvas.alpha_composite(self.icon(entry["unit_id"], entry["unit"], army), (x0, y))
+                draw.text((x0 + ICON_SIZE + 4, y), f"{entry['slot']}: {entry['unit']}", fill=(235, 235, 235), font=self.font)
+                y += LINE_HEIGHT
+                for label, unit_id in entry["squad"]:
+                    canvas.alpha_composite(self.icon(unit_id, label, army), (x0 + 16, y))
+                    draw.text((x0 + 20 + ICON_SIZE, y), label, fill=(170, 170, 170), font=self.font)
+                    y += LINE_HEIGHT
+            y += LINE_HEIGHT
+        return canvas.convert("RGB")
+
+
+def _sha1_file(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def _init_worker(fields_path, img_dir, scenarios_path):
+    global _worker
+    _worker = (Schema.load(fields_path), Renderer(img_dir, load_bounds(scenarios_path)))
+
+
+def _render_job(job):
+    path, out_path, title = job
+    schema, renderer = _worker
+    with open(path, "rb") as f:
+        data = f.read()
+    base_name = os.path.basename(path).split(".bin")[0]
+    renderer.render(schema, data, base_name, title).save(out_path)
+    return path
+
+
+def cache_key(schema, path, img_dir):
+    base_name = os.path.basename(path).split(".bin")[0]
+    return f"{PREVIEW_VERSION}:{schema.digest[:12]}:{_sha1_file(path)}:{_sha1_file(map_image_path(img_dir, base_name))}"
+
+
+def render_all(paths, out_dir, img_dir, scenarios_path=None, fields_path=None, workers=None, force=False):
+    """
+    Render a preview PNG per scenario into out_dir, skipping ones whose scenario, map
+    image and schema are unchanged since the last run. Yields (path, png path, rendered)
+    as files finish.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    schema = Schema.load(fields_path)
+    titles = {}
+    if scenarios_path and os.path.exists(scenarios_path):
+        with open(scenarios_path, "r", encoding="utf-8") as f:
+            titles = {info.get("filename", ""): name for name, info in json.load(f).items()}
+    cache_path = os.path.join(out_dir, CACHE_NAME)
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+
+    jobs, keys = [], {}
+    for path in paths:
+        name = os.path.basename(path)
+        out_path = os.path.join(out_dir, name.split(".bin")[0] + ".png")
+        key = cache_key(schema, path, img_dir)
+        if not force and cache.get(name) == key and os.path.exists(out_path):
+            yield path, out_path, False
+            continue
+        keys[path] = (name, key, out_path)
+        jobs.append((path, out_path, titles.get(name)))
+
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(fields_path, img_dir, scenarios_path)) as pool:
+            for path in pool.map(_render_job, jobs):
+                name, key, out_path = keys[path]
+                cache[name] = key
+                yield path, out_path, True
+        with open(cache_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f, indent=1, sort_keys=True)
+
+
+def contact_sheet(image_paths, out_path, columns=SHEET_COLUMNS, width=480):
+    """All previews scaled to `width` and tiled into one image."""
+    from PIL import Image
+
+    tiles = []
+    for path in image_paths:
+        img = Image.open(path).convert("RGB")
+        img.thumbnail((width, width * 4))
+        tiles.append(img)
+    if not tiles:
+        return None
+    rows = -(-len(tiles) // columns)
+    row_heights = [max(t.size[1] for t in tiles[r * columns:(r + 1) * columns]) for r in range(rows)]
+    sheet = Image.new("RGB", (columns * width, sum(row_heights)), (16, 16, 16))
+    y = 0
+    for r in range(rows):
+        for c, tile in enumerate(tiles[r * columns:(r + 1) * columns]):
+            sheet.paste(tile, (c * width, y))
+        y += row_heights[r]
+    sheet.save(out_path)
+    return out_path
@@ -0,0 +1,167 @@
+"""
+Seeded bulk randomizer. Every variant is a full set of scenario files where captain
+and squad unit ids are drawn from per army / per slot pools.
+
+Rules (all keys optional):
+    {
+        "pools": {"Allied": [...], "Enemy": [...], "Rogue": [...]},
+        "slot_pools": {"Slot 1": [...], "Enemy Slot 0 squad": [...]},
+        "ban": ["Player Cucco"],
+        "ban_tags": ["[Switch]"],
+        "keep": ["Slot 1", "Enemy Slot 0 squad"],
+        "keep_units": ["Link", "Cia"],
+        "randomize_squads": true,
+        "fill_empty": false
+    }
+Units can be given by label or by hex id. Without a pool every known, non-banned unit is used.
+"""
+import json
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .schema import EMPTY_UNIT, Schema, army_of
+
+DEFAULT_RULES = {
+    "ban_tags": ["[Switch]"],
+    "randomize_squads": True,
+    "fill_empty": False,
+}
+
+_worker = None
+
+
+class Randomizer:
+    def __init__(self, schema, rules, ref="units"):
+        self.schema = schema
+        self.rules = dict(DEFAULT_RULES, **rules)
+        self.l2h = schema.label_to_hex.get(ref, {})
+        self.labels = {int(hk, 16): label for label, hk in self.l2h.items()}
+
+        banned = {self._unit_id(u) for u in self.rules.get("ban", [])}
+        for value, label in self.labels.items():
+            if any(tag in label for tag in self.rules["ban_tags"]):
+                banned.add(value)
+        banned.add(int(EMPTY_UNIT, 16))
+        self.banned = banned
+        self.default_pool = self._pool(sorted(self.labels))
+
+        keep_units = {self._unit_id(u) for u in self.rules.get("keep_units", [])}
+        self.keep_units = np.array(sorted(keep_units), dtype=np.uint16)
+        keep = set(self.rules.get("keep", []))
+
+        # Group the randomizable specs by the pool they draw from, so each pool is one vectorized draw
+        specs = [s for s in schema.specs if s.type == "enum" and s.size == 2 and army_of(s.field)]
+        if not self.rules["randomize_squads"]:
+            specs = [s for s in specs if s.member is None]
+        self.specs = [s for s in specs if s.field not in keep]
+        self.groups = {}
+        for spec in self.specs:
+            key, pool = self._pool_for(spec)
+            offsets, _ = self.groups.setdefault(key, ([], pool))
+            offsets.append(spec.offset)
+        self.groups = {k: (np.array(o, dtype=np.intp), p) for k, (o, p) in self.groups.items()}
+        self.captain_offsets = np.array([s.offset for s in self.specs if s.member is None], dtype=np.intp)
+        # A kept captain keeps its escort too
+        self.squad_offsets = {slot.offset: [m.offset for m in squad]
+                              for slots in schema.slot_layout().values() for slot, squad in slots}
+
+    def _unit_id(self, unit):
+        hk = self.l2h.get(unit)
+        if hk is None:
+            hk = unit
+        try:
+            return int(hk, 16)
+        except (TypeError, ValueError):
+            raise ValueError(f"unknown unit {unit!r}")
+
+    def _pool(self, ids):
+        pool = np.array([i for i in ids if i not in self.banned], dtype=np.uint16)
+        if not len(pool):
+            raise ValueError("unit pool is empty after applying the ban list")
+        return pool
+
+    def _pool_for(self, spec):
+        slot_pools = self.rules.get("slot_pools", {})
+        pools = self.rules.get("pools", {})
+        if spec.field in slot_pools:
+            return ("slot", spec.field), self._pool(self._unit_id(u) for u in slot_pools[spec.field])
+        army = army_of(spec.field)
+        if army in pools:
+            return ("army", army), self._pool(self._unit_id(u) for u in pools[army])
+        return ("default",), self.default_pool
+
+    def randomize(self, data, rng):
+        """Randomized copy of one scenario buffer."""
+        a = np.frombuffer(bytes(data), dtype=np.uint8).copy()
+        size = len(a)
+        captain_offsets = self.captain_offsets[self.captain_offsets + 1 < size]
+        current_captains = self._words(a, captain_offsets)
+        kept = set()
+        for offset in captain_offsets[np.isin(current_captains, self.keep_units)].tolist():
+            kept.add(offset)
+            kept.update(self.squad_offsets.get(offset, ()))
+        for offsets, pool in self.groups.values():
+            offsets = offsets[offsets + 1 < size]
+            picks = pool[rng.integers(0, len(pool), size=len(offsets))]
+            mask = ~np.isin(offsets, list(kept)) if kept else np.ones(len(offsets), dtype=bool)
+            if not self.rules["fill_empty"]:
+                mask &= self._words(a, offsets) != int(EMPTY_UNIT, 16)
+            a[offsets[mask]] = picks[mask] >> 8
+            a[offsets[mask] + 1] = picks[mask] & 0xFF
+        return a.tobytes()
+
+    @staticmethod
+    def _words(a, offsets):
+        offsets = offsets[offsets + 1 < len(a)]
+        return (a[offsets].astype(np.uint16) << 8) | a[offsets + 1]
+
+
+def _init_worker(fields_path, rules, sources, out_dir, compress):
+    global _worker
+    schema = Schema.load(fields_path)
+    buffers = []
+    for path in sources:
+        with open(path, "rb") as f:
+            buffers.append((os.path.basename(path), f.read()))
+    _worker = (Randomizer(schema, rules), buffers, out_dir, compress)
+
+
+def _generate(job):
+    seed, index = job
+    randomizer, buffers, out_dir, compress = _worker
+    rng = np.random.default_rng([seed, index])
+    name = f"variant_{index:04d}"
+    files = [(filename, randomizer.randomize(data, rng)) for filename, data in buffers]
+    if compress:
+        path = os.path.join(out_dir, name + ".zip")
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+            for filename, data in files:
+                zf.writestr(filename, data)
+    else:
+        path = os.path.join(out_dir, name)
+        os.makedirs(path, exist_ok=True)
+        for filename, data in files:
+            with open(os.path.join(path, filename), "wb") as f:
+                f.write(data)
+    return path
+
+
+def generate(sources, out_dir, seed, count, rules=None, fields_path=None, compress=False, workers=None):
+    """
+    Write `count` randomized copies of the scenario files in `sources`. Variant i
+    only depends on (seed, i), so any single variant can be regenerated later.
+    Yields output paths as variants finish.
+    """
+    rules = rules or {}
+    # Fail on bad rules here instead of in every worker
+    Randomizer(Schema.load(fields_path), rules)
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, "randomizer.json"), "w", encoding="utf-8") as f:
+        json.dump({"seed": seed, "count": count, "rules": rules}, f, indent=2)
+    jobs = [(seed, i) for i in range(count)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(fields_path, rules, list(sources), out_dir, compress)) as pool:
+        yield from pool.map(_generate, jobs)
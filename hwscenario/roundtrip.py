@@ -0,0 +1,94 @@
+"""
+Checks that decoding every field and encoding it straight back (what opening a
+file in the editor and saving it without edits does) leaves every byte alone.
+"""
+import os
+import random
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from .model import Scenario
+from .schema import Schema
+
+Mismatch = namedtuple("Mismatch", "offset before after spec value")
+
+_worker_schema = None
+
+
+def roundtrip(schema, data):
+    """
+    Re-encode data the way the editors do, through the Scenario model's fields: read
+    everything, then assign flat fields, then groups.
+    """
+    scenario = Scenario(bytearray(data), schema)
+    values = [(field, field.value) for field in scenario.fields()]
+    for group_pass in (False, True):
+        for field, value in values:
+            if (field.spec.member is not None) != group_pass or value is None:
+                continue
+            try:
+                field.value = value
+            except ValueError:
+                # The editors leave bytes alone when a label has no hex to go back to
+                pass
+    return scenario.data, {field.spec: value for field, value in values}
+
+
+def verify_buffer(schema, data):
+    """List of Mismatch for every byte that changes on a no-edit round trip."""
+    out, values = roundtrip(schema, data)
+    if out == data:
+        return []
+    mismatches = []
+    for spec in schema.specs:
+        for offset in range(spec.offset, min(spec.offset + spec.size, len(data))):
+            if out[offset] != data[offset]:
+                mismatches.append(Mismatch(offset, data[offset], out[offset], spec, values.get(spec)))
+    return mismatches
+
+
+def fuzz_buffer(schema, seed, index):
+    """
+    Random buffer that covers every field, with enum fields mostly holding known ids,
+    sometimes unknown ones, and strings sometimes holding bytes that don't decode.
+    """
+    rng = random.Random(f"{seed}:{index}")
+    size = max(spec.offset + spec.size for spec in schema.specs) + 64
+    data = bytearray(rng.randbytes(size))
+    for spec in schema.specs:
+        if spec.type == "enum" and rng.random() < 0.8:
+            hexes = list(schema.label_to_hex.get(spec.mapping_key, {}).values())
+            if hexes:
+                data[spec.offset:spec.offset + spec.size] = bytes.fromhex(rng.choice(hexes).zfill(spec.size * 2))[-spec.size:]
+        elif spec.type == "string" and rng.random() < 0.5:
+            text = bytes(rng.randrange(0x20, 0x7F) for _ in range(rng.randrange(spec.size + 1)))
+            data[spec.offset:spec.offset + spec.size] = text.ljust(spec.size, b"\x00")[:spec.size]
+    return data
+
+
+def _init_worker(fields_path):
+    global _worker_schema
+    _worker_schema = Schema.load(fields_path)
+
+
+def _verify_job(job):
+    if job[0] == "file":
+        path = job[1]
+        with open(path, "rb") as f:
+            data = f.read()
+        name = os.path.basename(path)
+    else:
+        _, seed, index = job
+        data = fuzz_buffer(_worker_schema, seed, index)
+        name = f"fuzz-{seed}-{index}"
+    return name, verify_buffer(_worker_schema, data)
+
+
+def verify_corpus(paths, fields_path=None, fuzz=0, seed=0, workers=None):
+    """
+    Verify scenario files plus `fuzz` generated buffers in a process pool.
+    Yields (name, mismatches) as results come in.
+    """
+    jobs = [("file", p) for p in paths] + [("fuzz", seed, i) for i in range(fuzz)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(fields_path,)) as pool:
+        yield from pool.map(_verify_job, jobs, chunksize=max(1, len(jobs) // 64))
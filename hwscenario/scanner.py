@@ -0,0 +1,129 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Values that show up all over the files as padding/terminators, not as unit ids
+DEFAULT_IGNORE = (0x0000, 0xFFFF)
+
+
+def known_unit_ids(schema, ref="units", ignore=DEFAULT_IGNORE):
+    ids = {int(hk, 16) for hk in schema.label_to_hex.get(ref, {}).values()}
+    return np.array(sorted(ids - set(ignore)), dtype=np.uint16)
+
+
+def mapped_offsets(schema):
+    """Every byte offset already covered by a fields.json entry."""
+    covered = set()
+    for spec in schema.specs:
+        covered.update(range(spec.offset, spec.offset + spec.size))
+    return covered
+
+
+def word_hits(data, known_ids, aligned=True):
+    """Boolean mask over byte offsets: True where a big endian 16-bit word is a known id."""
+    a = np.frombuffer(data, dtype=np.uint8)
+    if len(a) < 2:
+        return np.zeros(0, dtype=bool)
+    words = (a[:-1].astype(np.uint16) << 8) | a[1:]
+    hits = np.isin(words, known_ids)
+    if aligned:
+        hits[1::2] = False
+    return hits
+
+
+def find_runs(hits, min_stride=2, max_stride=512, min_run=4, aligned=True):
+    """
+    Find (start, stride, count) runs where hits repeat at a fixed stride at least
+    min_run times. Only run heads are reported, so every run shows up once per stride.
+    """
+    n = len(hits)
+    runs = []
+    step = 2 if aligned else 1
+    first = min_stride + (min_stride % 2 if aligned else 0)
+    for stride in range(first, max_stride + 1, step):
+        span = (min_run - 1) * stride
+        if span >= n:
+            break
+        m = hits[:n - span].copy()
+        for k in range(1, min_run):
+            m &= hits[k * stride:n - span + k * stride]
+        starts = np.flatnonzero(m)
+        if not len(starts):
+            continue
+        # Drop positions that continue a run started earlier
+        heads = starts[(starts < stride) | ~hits[np.maximum(starts - stride, 0)]]
+        for start in heads.tolist():
+            count = min_run
+            pos = start + min_run * stride
+            while pos < n and hits[pos]:
+                count += 1
+                pos += stride
+            runs.append((start, stride, count))
+    return _drop_covered(runs)
+
+
+def _drop_covered(runs):
+    """Remove runs whose offsets are all part of one run with a smaller stride."""
+    kept = []
+    owners = {}
+    for start, stride, count in sorted(runs, key=lambda r: (r[1], r[0])):
+        offsets = range(start, start + stride * count, stride)
+        common = None
+        for o in offsets:
+            common = owners.get(o, set()) if common is None else common & owners.get(o, set())
+            if not common:
+                break
+        if common:
+            continue
+        for o in offsets:
+            owners.setdefault(o, set()).add(len(kept))
+        kept.append((start, stride, count))
+    return kept
+
+
+def scan_file(path, known_ids, min_stride=2, max_stride=512, min_run=4, aligned=True):
+    with open(path, "rb") as f:
+        data = f.read()
+    hits = word_hits(data, known_ids, aligned)
+    return os.path.basename(path), find_runs(hits, min_stride, max_stride, min_run, aligned)
+
+
+def _scan_file_args(args):
+    return scan_file(*args)
+
+
+def scan_corpus(paths, known_ids, min_stride=2, max_stride=512, min_run=4, aligned=True, workers=None):
+    """Scan every file in a process pool. Yields (filename, runs) as files finish."""
+    jobs = [(p, known_ids, min_stride, max_stride, min_run, aligned) for p in paths]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(_scan_file_args, jobs)
+
+
+def merge_candidates(results, covered_offsets=()):
+    """
+    Combine per-file runs into candidate record arrays keyed by (start, stride).
+    Runs fully inside fields.json coverage are skipped. Sorted by how many files agree.
+    """
+    covered_offsets = set(covered_offsets)
+    candidates = {}
+    for filename, runs in results:
+        for start, stride, count in runs:
+            offsets = range(start, start + stride * count, stride)
+            if all(o in covered_offsets for o in offsets):
+                continue
+            c = candidates.setdefault((start, stride), {"start": start, "stride": stride, "count": 0, "files": []})
+            c["count"] = max(c["count"], count)
+            c["files"].append(filename)
+    return sorted(candidates.values(), key=lambda c: (-len(c["files"]), -c["count"], c["start"]))
+
+
+def suggest_fields(candidates, ref="units"):
+    """fields.json style entries for each slot of each candidate array."""
+    suggestions = {}
+    for c in candidates:
+        for i in range(c["count"]):
+            offset = c["start"] + i * c["stride"]
+            name = f"Unmapped {c['start']}+{c['stride']} #{i}"
+            suggestions[name] = {"type": "enum", "offset": offset, "size": 2, "options_ref": ref}
+    return suggestions
@@ -0,0 +1,334 @@
+import hashlib
+import json
+import os
+import re
+import struct
+from collections import namedtuple
+
+DEFAULT_FIELDS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fields.json")
+# Unit ids from a HW:DE Cheat Engine table, used to name ids fields.json doesn't list
+DEFAULT_VALUES_PATH = os.path.join(os.path.dirname(DEFAULT_FIELDS_PATH), "Values")
+UNIT_REF = "units"
+
+# Spawn points are stored as two consecutive values (x, z), in the file's byte order
+POSITION_FORMATS = {
+    "float32": ">ff",
+    "int32": ">ii",
+    "int16": ">hh",
+}
+
+# Which army a top level slot field belongs to, by name prefix
+ARMY_PREFIXES = (
+    ("Enemy Slot", "Enemy"),
+    ("Rogue Slot", "Rogue"),
+    ("Slot", "Allied"),
+)
+ARMIES = ("Allied", "Enemy", "Rogue")
+EMPTY_UNIT = "FFFF"
+
+# One decodable location in a scenario file. Flat fields have member=None,
+# group members carry their group name in "field" and an absolute offset.
+FieldSpec = namedtuple("FieldSpec", "field member type offset size mapping_key encoding format")
+
+
+def normalize_hex_key(k):
+    hk = str(k).replace(" ", "").upper()
+    if len(hk) % 2 == 1:
+        hk = "0" + hk
+    if len(hk) < 2:
+        hk = hk.zfill(2)
+    return hk
+
+
+_VALUES_LINE = re.compile(r'^"([0-9A-Fa-f]{2}) ([0-9A-Fa-f]{2}): (.+)"$')
+
+
+def read_values(path):
+    """{unit id: label} from the Values dump. Its ids are written little endian ("LL HH: label")."""
+    values = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            m = _VALUES_LINE.match(line.strip())
+            if m:
+                values.setdefault(int(m.group(2) + m.group(1), 16), m.group(3).strip())
+    return values
+
+
+def army_of(field_name):
+    for prefix, army in ARMY_PREFIXES:
+        if field_name.startswith(prefix):
+            return army
+    return None
+
+
+def _build_labels(options_dict):
+    """Same label scheme as the editor: duplicate names get their hex appended."""
+    labels = []
+    l2h = {}
+    seen_labels = {}
+    for k, label in options_dict.items():
+        hk = normalize_hex_key(k)
+        if label in seen_labels:
+            seen_labels[label] += 1
+            ui_label = f"{label} ({hk})"
+        else:
+            seen_labels[label] = 1
+            ui_label = label
+        labels.append(ui_label)
+        l2h[ui_label] = hk
+    return labels, l2h
+
+
+class Schema:
+    """fields.json compiled into flat field specs and enum lookup tables, no tkinter needed."""
+
+    def __init__(self, raw, values=None, byteorder="big"):
+        self.raw_fields = raw
+        # Wii U files are big endian, Switch (DE) files little endian with the same layout
+        self.byteorder = byteorder
+        self._order = ">" if byteorder == "big" else "<"
+        digest_source = raw if not values else [raw, sorted(values.items())]
+        if byteorder != "big":
+            digest_source = [digest_source, byteorder]
+        self.digest = hashlib.sha1(json.dumps(digest_source, sort_keys=True).encode("utf-8")).hexdigest()
+        self.shared_options = raw.get("shared_options", {})
+        self.fields = {k: v for k, v in raw.items() if k != "shared_options"}
+
+        self.option_list = {}
+        self.label_to_hex = {}
+        self.hex_to_label = {}
+        self._stripped_hex_to_label = {}
+        self._prepare_enum_mappings()
+        self._prepare_extra_units(values or {})
+        self._tables = {}
+        self._shared_tables = {}
+        self._label_arrays = {}
+        self.specs = list(self._iter_specs())
+        self._slot_layout = None
+        self._spec_index = None
+
+    @classmethod
+    def load(cls, path=None, values_path=DEFAULT_VALUES_PATH, byteorder="big"):
+        with open(path or DEFAULT_FIELDS_PATH, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+        values = read_values(values_path) if values_path and os.path.exists(values_path) else None
+        return cls(raw, values, byteorder)
+
+    def _add_mapping(self, key, options_dict):
+        labels, l2h = _build_labels(options_dict)
+        self.option_list[key] = labels
+        self.label_to_hex[key] = l2h
+        h2l = {}
+        stripped = {}
+        for label, hk in l2h.items():
+            h2l.setdefault(hk, label)
+            stripped.setdefault(hk.lstrip("0"), label)
+        self.hex_to_label[key] = h2l
+        self._stripped_hex_to_label[key] = stripped
+
+    def _prepare_enum_mappings(self):
+        for ref_name, mapping in self.shared_options.items():
+            self._add_mapping(ref_name, mapping)
+        # Inline options
+        for field_name, info in self.fields.items():
+            if info.get("type") != "enum":
+                continue
+            if "options" in info and isinstance(info["options"], dict):
+                self._add_mapping(field_name, info["options"])
+            elif "options_ref" in info and info["options_ref"] in self.option_list:
+                ref = info["options_ref"]
+                self.option_list[field_name] = self.option_list[ref]
+                self.label_to_hex[field_name] = self.label_to_hex[ref]
+                self.hex_to_label[field_name] = self.hex_to_label[ref]
+                self._stripped_hex_to_label[field_name] = self._stripped_hex_to_label[ref]
+            else:
+                self._add_mapping(field_name, {})
+
+    def _prepare_extra_units(self, values):
+        """
+        Names for unit ids only the Values dump knows. They decode and encode, but stay
+        out of the dropdowns and count as unknown for the validator, since they come
+        from DE and may not exist on Wii U.
+        """
+        self.extra_hex_to_label = {}
+        self.extra_label_to_hex = {}
+        known = self.label_to_hex.get(UNIT_REF, {})
+        known_ids = {int(hk, 16) for hk in known.values()}
+        for value, label in sorted(values.items()):
+            if value in known_ids or value > 0xFFFF:
+                continue
+            hk = f"{value:04X}"
+            if label in known or label in self.extra_label_to_hex:
+                label = f"{label} ({hk})"
+            self.extra_hex_to_label[hk] = label
+            self.extra_label_to_hex[label] = hk
+
+    def _uses_units(self, mapping_key):
+        units = self.hex_to_label.get(UNIT_REF)
+        return units is not None and self.hex_to_label.get(mapping_key) is units
+
+    def _iter_specs(self):
+        for field_name, info in self.fields.items():
+            ftype = info.get("type")
+            if ftype == "group":
+                base = info.get("offset", 0)
+                for mem in info.get("members", []):
+                    yield self._spec(field_name, mem.get("name", "member"), mem,
+                                     base + mem.get("offset_add", 0), mem.get("options_ref") or field_name)
+            else:
+                yield self._spec(field_name, None, info, info.get("offset", 0), info.get("options_ref", field_name))
+
+    def _spec(self, field, member, info, offset, mapping_key):
+        ftype = info.get("type", "enum" if member else None)
+        fmt = info.get("format", "float32")
+        size = info.get("size", 1)
+        if ftype == "position":
+            size = struct.calcsize(POSITION_FORMATS[fmt])
+        return FieldSpec(field, member, ftype, offset, size, mapping_key, info.get("encoding", "ascii"), fmt)
+
+    def slot_layout(self):
+        """
+        {army: [(slot spec, [squad member specs]), ...]} for every captain slot,
+        pairing "Slot 1" with the members of the "Slot 1 squad" group.
+        """
+        if self._slot_layout is None:
+            members = {}
+            for spec in self.specs:
+                if spec.member is not None and spec.type == "enum":
+                    members.setdefault(spec.field, []).append(spec)
+            layout = {army: [] for army in ARMIES}
+            for spec in self.specs:
+                army = army_of(spec.field)
+                if spec.member is None and spec.type == "enum" and army:
+                    layout[army].append((spec, members.get(f"{spec.field} squad", [])))
+            self._slot_layout = layout
+        return self._slot_layout
+
+    def spec(self, field, member=None):
+        """FieldSpec by field (and member) name, or None."""
+        if self._spec_index is None:
+            self._spec_index = {(s.field, s.member): s for s in self.specs}
+        return self._spec_index.get((field, member))
+
+    # ---------------- Decoding ----------------
+    def label_for_hex(self, mapping_key, hexval):
+        """UI label for an uppercase hex string, or None."""
+        label = self.hex_to_label.get(mapping_key, {}).get(hexval)
+        if label is None:
+            label = self._stripped_hex_to_label.get(mapping_key, {}).get(hexval.lstrip("0"))
+        return label
+
+    def lookup_table(self, mapping_key):
+        """
+        Label of every 16-bit id (None when unknown) as a list indexed by the id, so a
+        2-byte enum decodes with one index instead of hex formatting and dict lookups.
+        Fields that share an options_ref share the table.
+        """
+        table = self._tables.get(mapping_key)
+        if table is not None:
+            return table
+        h2l = self.hex_to_label.get(mapping_key)
+        table = self._shared_tables.get(id(h2l))
+        if table is None:
+            table = [None] * 0x10000
+            if h2l is not None:
+                # Same precedence as label_for_hex: exact 4-digit keys beat keys matched without leading zeros
+                for stripped, label in self._stripped_hex_to_label[mapping_key].items():
+                    value = int(stripped or "0", 16)
+                    if value <= 0xFFFF:
+                        table[value] = label
+                for hk, label in h2l.items():
+                    if len(hk) == 4:
+                        table[int(hk, 16)] = label
+                if self._uses_units(mapping_key):
+                    for hk, label in self.extra_hex_to_label.items():
+                        value = int(hk, 16)
+                        if table[value] is None:
+                            table[value] = label
+            self._shared_tables[id(h2l)] = table
+        self._tables[mapping_key] = table
+        return table
+
+    def label_array(self, mapping_key):
+        """lookup_table as a NumPy object array, for label_array(key).take(ids) over whole columns."""
+        import numpy as np
+
+        table = self.lookup_table(mapping_key)
+        arr = self._label_arrays.get(id(table))
+        if arr is None:
+            arr = np.empty(0x10000, dtype=object)
+            arr[:] = table
+            self._label_arrays[id(table)] = arr
+        return arr
+
+    def decode_ids(self, mapping_key, ids):
+        """Display values for an array of 16-bit ids, unknown ids as "(Unknown XXXX)"."""
+        import numpy as np
+
+        ids = np.asarray(ids, dtype=np.uint16)
+        labels = self.label_array(mapping_key).take(ids)
+        for i in np.flatnonzero(labels == None).tolist():  # noqa: E711 - elementwise on object arrays
+            labels[i] = f"(Unknown {int(ids.flat[i]):04X})"
+        return labels
+
+    def decode_raw(self, spec, raw):
+        """Turn the bytes of one field into its display value."""
+        if spec.type == "enum" and spec.size == 2 and len(raw) == 2:
+            table = self._tables.get(spec.mapping_key) or self.lookup_table(spec.mapping_key)
+            value = (raw[0] << 8) | raw[1] if self._order == ">" else (raw[1] << 8) | raw[0]
+            label = table[value]
+            return label if label is not None else f"(Unknown {value:04X})"
+        if spec.type == "enum":
+            hexval = (raw if self._order == ">" else raw[::-1]).hex().upper().zfill(spec.size * 2)
+            return self.label_for_hex(spec.mapping_key, hexval) or f"(Unknown {hexval})"
+        if spec.type == "string":
+            return raw.decode(spec.encoding, errors="ignore").rstrip("\x00")
+        if isinstance(spec.type, str) and spec.type.startswith("uint"):
+            return int.from_bytes(raw, byteorder=self.byteorder)
+        if spec.type == "position":
+            return list(struct.unpack(self._order + POSITION_FORMATS[spec.format][1:], raw))
+        return raw.hex().upper()
+
+    def decode(self, data, spec):
+        if spec.offset + spec.size > len(data):
+            return None
+        return self.decode_raw(spec, bytes(data[spec.offset:spec.offset + spec.size]))
+
+    # ---------------- Encoding ----------------
+    def encode_value(self, spec, value):
+        """Bytes for a display value, or None if the value can't be represented."""
+        size = spec.size
+        if spec.type == "enum":
+            hexval = self.label_to_hex.get(spec.mapping_key, {}).get(value)
+            if hexval is None and self._uses_units(spec.mapping_key):
+                hexval = self.extra_label_to_hex.get(value)
+            if hexval is None and isinstance(value, str) and value.startswith("(Unknown ") and value.endswith(")"):
+                hexval = value[len("(Unknown "):-1]
+            if hexval is None:
+                return None
+            b = bytes.fromhex(hexval.replace(" ", "").upper().zfill(size * 2))[-size:]
+            return b if self._order == ">" else b[::-1]
+        if spec.type == "string":
+            return str(value).encode(spec.encoding).ljust(size, b"\x00")[:size]
+        if isinstance(spec.type, str) and spec.type.startswith("uint"):
+            try:
+                val = int(value)
+            except (TypeError, ValueError):
+                return None
+            return val.to_bytes(size, self.byteorder, signed=False)
+        if spec.type == "position":
+            x, z = value
+            if spec.format != "float32":
+                x, z = int(round(x)), int(round(z))
+            return struct.pack(self._order + POSITION_FORMATS[spec.format][1:], x, z)
+        return bytes.fromhex(value)
+
+    def encode(self, data, spec, value):
+        """Write a display value into data. Returns True if any byte changed."""
+        b = self.encode_value(spec, value)
+        if b is None or spec.offset + spec.size > len(data):
+            return False
+        if data[spec.offset:spec.offset + spec.size] == b:
+            return False
+        data[spec.offset:spec.offset + spec.size] = b
+        return True
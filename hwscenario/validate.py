@@ -0,0 +1,92 @@
+import os
+from collections import namedtuple
+
+DEFAULT_DENY_TAGS = ("[Switch]",)
+
+OK = 0
+UNKNOWN = 1
+DENIED = 2
+
+Issue = namedtuple("Issue", "file spec value status label")
+
+
+class UnitValidator:
+    """
+    Checks every unit id column of a scenario against the known unit table.
+    Ids missing from the table are UNKNOWN, ids whose label carries a deny tag
+    (e.g. "[Switch]", which crash on Wii U) are DENIED.
+    """
+
+    def __init__(self, schema, ref="units", deny_tags=DEFAULT_DENY_TAGS, allow_unknown=False):
+        self.schema = schema
+        self.ref = ref
+        self.big_endian = schema.byteorder == "big"
+        self.specs = [s for s in schema.specs if s.type == "enum" and s.size == 2 and self._uses_ref(s)]
+        self.offsets = [s.offset for s in self.specs]
+        # Also names ids that only the Values dump knows, which still count as unknown
+        self.labels = schema.lookup_table(ref)
+
+        status = bytearray([OK if allow_unknown else UNKNOWN]) * 0x10000
+        for label, hk in schema.label_to_hex.get(ref, {}).items():
+            value = int(hk, 16)
+            status[value] = DENIED if any(tag in label for tag in deny_tags) else OK
+        self.status = status
+        # numpy is imported here, not at module level, so the editor starts without paying for it
+        try:
+            import numpy as np
+        except ImportError:
+            np = None
+        self.np = np
+        if np is not None:
+            self._status = np.frombuffer(bytes(status), dtype=np.uint8)
+            self._offsets = np.array(self.offsets, dtype=np.intp)
+
+    def _uses_ref(self, spec):
+        if spec.mapping_key == self.ref:
+            return True
+        return self.schema.fields.get(spec.mapping_key, {}).get("options_ref") == self.ref
+
+    def check(self, data, filename=""):
+        """List of Issue for one decompressed scenario buffer."""
+        np = self.np
+        if np is not None:
+            a = np.frombuffer(bytes(data), dtype=np.uint8)
+            in_range = self._offsets + 1 < len(a)
+            offs = self._offsets[in_range]
+            hi, lo = (offs, offs + 1) if self.big_endian else (offs + 1, offs)
+            words = (a[hi].astype(np.uint16) << 8) | a[lo]
+            status = self._status[words]
+            bad = np.flatnonzero(status)
+            specs = [s for s, ok in zip(self.specs, in_range.tolist()) if ok]
+            labels = self.schema.label_array(self.ref).take(words[bad])
+            return [Issue(filename, specs[i], int(words[i]), int(status[i]), label)
+                    for i, label in zip(bad.tolist(), labels.tolist())]
+
+        issues = []
+        for spec in self.specs:
+            if spec.offset + 2 > len(data):
+                continue
+            hi, lo = (spec.offset, spec.offset + 1) if self.big_endian else (spec.offset + 1, spec.offset)
+            value = (data[hi] << 8) | data[lo]
+            if self.status[value]:
+                issues.append(Issue(filename, spec, value, self.status[value], self.labels[value]))
+        return issues
+
+    def check_files(self, paths):
+        for path in paths:
+            with open(path, "rb") as f:
+                data = f.read()
+            yield os.path.basename(path), self.check(data, os.path.basename(path))
+
+
+def describe(issue):
+    spec = issue.spec
+    where = spec.field if spec.member is None else f"{spec.field} / {spec.member}"
+    if issue.status == DENIED:
+        what = f"{issue.label} is not allowed"
+    elif issue.label:
+        what = f"not in fields.json (Values calls it {issue.label})"
+    else:
+        what = "not a known unit id"
+    prefix = f"{issue.file}: " if issue.file else ""
+    return f"{prefix}{where} @ 0x{spec.offset:05X}: {issue.value:04X} {what}"
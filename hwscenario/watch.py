@@ -0,0 +1,169 @@
+"""
+Notices when another program (hex editor, script, Cemu tooling) rewrites the scenario
+file that is open, and works out which fields it touched.
+
+DiskSnapshot keeps the bytes last read from or written to disk plus a crc per block.
+Merging a new version of the file only looks at blocks whose crc changed, and only
+at the fields inside those blocks.
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+import zlib
+from collections import namedtuple
+
+BLOCK_SIZE = 256
+POLL_INTERVAL = 0.5
+
+# data: merged buffer, changed: specs the file changed that we now show,
+# conflicts: specs changed on disk and locally (the local value was kept)
+Merge = namedtuple("Merge", "data changed conflicts")
+
+
+def block_hashes(data, block_size=BLOCK_SIZE):
+    view = memoryview(data)
+    return [zlib.crc32(view[i:i + block_size]) for i in range(0, len(view), block_size)]
+
+
+class DiskSnapshot:
+    def __init__(self, schema, data, block_size=BLOCK_SIZE):
+        self.schema = schema
+        self.block_size = block_size
+        self.specs_by_block = {}
+        for spec in schema.specs:
+            for block in range(spec.offset // block_size, (spec.offset + spec.size - 1) // block_size + 1):
+                self.specs_by_block.setdefault(block, []).append(spec)
+        self.reset(data)
+
+    def reset(self, data):
+        """The file on disk now holds data (after opening, saving or merging)."""
+        self.base = bytes(data)
+        self.hashes = block_hashes(self.base, self.block_size)
+
+    def changed_blocks(self, new_hashes):
+        return [i for i, (a, b) in enumerate(zip(self.hashes, new_hashes)) if a != b]
+
+    def merge(self, local, new):
+        """
+        Merge a new version of the file into the local buffer. Bytes the file changed
+        are taken unless the field they belong to has an unsaved local edit. Returns
+        None when the size changed, since then offsets can't be compared.
+        """
+        if len(new) != len(self.base):
+            return None
+        blocks = self.changed_blocks(block_hashes(new, self.block_size))
+        merged = bytearray(local)
+        specs = {}
+        for block in blocks:
+            start = block * self.block_size
+            merged[start:start + self.block_size] = new[start:start + self.block_size]
+            for spec in self.specs_by_block.get(block, ()):
+                specs[spec] = None
+
+        changed, conflicts = [], []
+        base = self.base
+        for spec in specs:
+            start, end = spec.offset, spec.offset + spec.size
+            if end > len(base):
+                continue
+            before, mine, theirs = base[start:end], bytes(local[start:end]), new[start:end]
+            if mine != before:
+                merged[start:end] = mine
+                if theirs != before and theirs != mine:
+                    conflicts.append(spec)
+            elif theirs != before:
+                changed.append(spec)
+        self.reset(new)
+        return Merge(merged, changed, conflicts)
+
+
+# inotify(7)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def _libc_inotify():
+    if not hasattr(os, "O_NONBLOCK"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+    except OSError:
+        return None
+    if not (hasattr(libc, "inotify_init1") and hasattr(libc, "inotify_add_watch")):
+        return None
+    return libc
+
+
+class FileWatcher:
+    """
+    Calls callback(path) from a background thread whenever path is rewritten.
+    Uses inotify on Linux (watching the folder, so replace-by-rename is seen too)
+    and polls size and mtime everywhere else.
+    """
+
+    def __init__(self, path, callback, interval=POLL_INTERVAL, use_inotify=True):
+        self.path = os.path.abspath(path)
+        self.callback = callback
+        self.interval = interval
+        self.libc = _libc_inotify() if use_inotify else None
+        self.mode = "inotify" if self.libc else "poll"
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        target = self._run_inotify if self.libc else self._run_poll
+        self._thread = threading.Thread(target=target, name="watch", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_size, st.st_mtime_ns
+
+    def _run_poll(self):
+        last = self._stat()
+        while not self._stop.wait(self.interval):
+            current = self._stat()
+            if current != last and current is not None:
+                self.callback(self.path)
+            last = current
+
+    def _run_inotify(self):
+        libc = self.libc
+        fd = libc.inotify_init1(os.O_NONBLOCK | getattr(os, "O_CLOEXEC", 0))
+        if fd < 0:
+            return self._run_poll()
+        try:
+            folder, name = os.path.split(self.path)
+            if libc.inotify_add_watch(fd, os.fsencode(folder), IN_CLOSE_WRITE | IN_MOVED_TO) < 0:
+                return self._run_poll()
+            name = os.fsencode(name)
+            while not self._stop.is_set():
+                ready, _, _ = select.select([fd], [], [], self.interval)
+                if not ready:
+                    continue
+                try:
+                    buf = os.read(fd, 64 * 1024)
+                except BlockingIOError:
+                    continue
+                hit = False
+                pos = 0
+                while pos + _EVENT_HEADER.size <= len(buf):
+                    _, _, _, length = _EVENT_HEADER.unpack_from(buf, pos)
+                    start = pos + _EVENT_HEADER.size
+                    hit = hit or buf[start:start + length].rstrip(b"\x00") == name
+                    pos = start + length
+                if hit:
+                    self.callback(self.path)
+        finally:
+            os.close(fd)
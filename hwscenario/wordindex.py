@@ -0,0 +1,276 @@
+"""
+Where does a 2-byte value occur across a folder of scenario files, at any offset?
+
+The index is a folder of segments, each covering up to SEGMENT_FILES files. Within a
+segment every offset of every file (aligned or not) is a position, numbered across the
+segment's files one after the other. For each of the 65536 words the segment keeps the
+sorted positions the word is found at, delta encoded and zlib compressed on their own,
+plus a directory of where each word's list starts. A query reads one short list per
+segment, so it takes milliseconds however large the corpus is.
+
+Segments are built on a process pool and never changed afterwards. An update indexes
+new and changed files into new segments and marks their old entries dead; segments
+that end up mostly dead are rebuilt from their live files. One index can hold several
+folders (a game dump, DLC, Adventure Mode maps): updating one leaves the others alone.
+
+    index = WordIndex.load("word-index")
+    paths = list(iter_scenario_files(["dump"]))
+    index.update(paths, roots=["dump"])
+    hits = index.query(0x0072, paths=paths)
+"""
+import json
+import os
+import zlib
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .hwgz import HWGZFile, is_hwgz
+from .schema import DEFAULT_FIELDS_PATH, UNIT_REF
+
+INDEX_VERSION = 1
+DEFAULT_INDEX_PATH = os.path.join(os.path.dirname(DEFAULT_FIELDS_PATH), "word-index")
+MANIFEST_NAME = "manifest.json"
+SEGMENT_FILES = 32
+# A segment with at least this share of dead files is rebuilt on the next update
+MAX_DEAD = 0.5
+# Lists shorter than this are stored as is, zlib can't shrink them
+MIN_COMPRESS = 16
+
+Hit = namedtuple("Hit", "path offset")
+
+
+def file_words(path):
+    """The big endian word at every offset of a (decompressed or HWGZ) scenario file."""
+    if is_hwgz(path):
+        with HWGZFile(path) as f:
+            data = f.tobytes()
+    else:
+        with open(path, "rb") as f:
+            data = f.read()
+    a = np.frombuffer(data, dtype=np.uint8)
+    if len(a) < 2:
+        return np.empty(0, dtype=np.uint16)
+    return (a[:-1].astype(np.uint16) << 8) | a[1:]
+
+
+def parse_value(text, schema=None):
+    """
+    A word from "0x0072", "0072" or "72", or a unit name from the Values/units tables.
+    The value is as fields.json shows it; query() swaps it for little endian files.
+    """
+    text = text.strip()
+    digits = text[2:] if text.lower().startswith("0x") else text
+    try:
+        value = int(digits.replace(" ", ""), 16)
+    except ValueError:
+        value = None
+    if value is not None and 0 <= value <= 0xFFFF:
+        return value
+    if schema is not None:
+        hexval = schema.label_to_hex.get(UNIT_REF, {}).get(text) or schema.extra_label_to_hex.get(text)
+        if hexval:
+            return int(hexval.replace(" ", ""), 16)
+    raise ValueError(f"not a 2-byte hex value or unit name: {text!r}")
+
+
+def _encode_list(deltas):
+    raw = deltas.astype("<u4").tobytes()
+    if len(deltas) >= MIN_COMPRESS:
+        packed = zlib.compress(raw, 6)
+        if len(packed) < len(raw):
+            return b"\x01" + packed
+    return b"\x00" + raw
+
+
+def _decode_list(blob):
+    raw = zlib.decompress(blob[1:]) if blob[:1] == b"\x01" else blob[1:]
+    # Deltas wrap around in uint32, so the running sum does too
+    return np.cumsum(np.frombuffer(raw, dtype="<u4"), dtype=np.uint32)
+
+
+def build_segment(index_dir, name, entries):
+    """
+    Index files ([path, size, mtime_ns] each) into segment `name`. Runs in a worker
+    process. Returns the segment's manifest entry.
+    """
+    words, bases = [], [0]
+    for entry in entries:
+        w = file_words(entry[0])
+        words.append(w)
+        bases.append(bases[-1] + len(w))
+    words = np.concatenate(words) if words else np.empty(0, dtype=np.uint16)
+    if len(words) >= 1 << 32:
+        raise ValueError(f"segment {name} is too large ({len(words)} positions)")
+    # A stable sort keeps each word's positions in ascending order
+    positions = np.argsort(words, kind="stable").astype(np.uint32)
+    starts = np.concatenate(([0], np.cumsum(np.bincount(words, minlength=65536))))
+    deltas = positions.copy()
+    deltas[1:] -= positions[:-1]
+
+    lengths = np.zeros(65536, dtype=np.int64)
+    chunks = []
+    for word in np.flatnonzero(np.diff(starts)).tolist():
+        lo, hi = starts[word], starts[word + 1]
+        d = deltas[lo:hi].copy()
+        d[0] = positions[lo]
+        chunk = _encode_list(d)
+        lengths[word] = len(chunk)
+        chunks.append(chunk)
+    directory = np.concatenate(([0], np.cumsum(lengths)))
+
+    path = os.path.join(index_dir, name)
+    with open(path + ".dat", "wb") as f:
+        f.write(b"".join(chunks))
+    np.save(path + ".dir.npy", directory)
+    return {"name": name, "files": entries, "bases": bases, "dead": []}
+
+
+class WordIndex:
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self.path = path
+        self.segments = []
+        self.next_segment = 0
+        self._directories = {}
+
+    @classmethod
+    def load(cls, path=DEFAULT_INDEX_PATH):
+        """The index in folder `path`, or an empty one if there is none (or it's outdated)."""
+        index = cls(path)
+        try:
+            with open(os.path.join(path, MANIFEST_NAME), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return index
+        if manifest.get("version") == INDEX_VERSION:
+            index.segments = manifest["segments"]
+            index.next_segment = manifest["next_segment"]
+        return index
+
+    def save(self):
+        manifest = {"version": INDEX_VERSION, "next_segment": self.next_segment, "segments": self.segments}
+        tmp = os.path.join(self.path, MANIFEST_NAME + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp, os.path.join(self.path, MANIFEST_NAME))
+
+    def files(self):
+        """{path: [path, size, mtime_ns]} of every file the index covers."""
+        live = {}
+        for segment in self.segments:
+            dead = set(segment["dead"])
+            for i, entry in enumerate(segment["files"]):
+                if i not in dead:
+                    live[entry[0]] = entry
+        return live
+
+    def update(self, paths, roots=None, workers=None):
+        """
+        Index new or changed files among paths and drop files that are gone: deleted
+        from disk, or no longer listed under one of `roots` (the files and folders paths
+        was gathered from). Files elsewhere stay indexed, so one index can hold several
+        folders. Saves the index. Returns (indexed, removed) file counts.
+        """
+        current = {}
+        for path in paths:
+            path = os.path.abspath(path)
+            st = os.stat(path)
+            current[path] = [path, st.st_size, st.st_mtime_ns]
+        roots = [os.path.abspath(root) for root in roots or ()]
+
+        def is_retired(path):
+            if path in current:
+                return False
+            # iter_scenario_files doesn't recurse, so a folder only covers its own files
+            return not os.path.exists(path) or any(path == root or os.path.dirname(path) == root for root in roots)
+
+        live = self.files()
+        scan = [entry for path, entry in current.items() if live.get(path) != entry]
+        removed = 0
+        for segment in self.segments:
+            dead = set(segment["dead"])
+            for i, entry in enumerate(segment["files"]):
+                if i in dead:
+                    continue
+                if entry[0] in current:
+                    if current[entry[0]] != entry:
+                        dead.add(i)
+                elif is_retired(entry[0]):
+                    dead.add(i)
+                    removed += 1
+            segment["dead"] = sorted(dead)
+        if not scan and not removed:
+            return 0, 0
+
+        # Rebuild mostly dead segments from their live files along with the new ones
+        keep, retired_segments = [], []
+        for segment in self.segments:
+            if len(segment["dead"]) >= MAX_DEAD * len(segment["files"]):
+                dead = set(segment["dead"])
+                scan += [entry for i, entry in enumerate(segment["files"]) if i not in dead]
+                retired_segments.append(segment)
+            else:
+                keep.append(segment)
+
+        os.makedirs(self.path, exist_ok=True)
+        jobs = []
+        for start in range(0, len(scan), SEGMENT_FILES):
+            jobs.append((self.path, f"seg{self.next_segment:05d}", scan[start:start + SEGMENT_FILES]))
+            self.next_segment += 1
+        if jobs:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                keep += pool.map(build_segment, *zip(*jobs))
+        self.segments = keep
+        self.save()
+        for segment in retired_segments:
+            self._directories.pop(segment["name"], None)
+            for suffix in (".dat", ".dir.npy"):
+                try:
+                    os.remove(os.path.join(self.path, segment["name"] + suffix))
+                except OSError:
+                    pass
+        return len(scan) - sum(len(s["files"]) - len(s["dead"]) for s in retired_segments), removed
+
+    def _directory(self, name):
+        directory = self._directories.get(name)
+        if directory is None:
+            directory = np.load(os.path.join(self.path, name + ".dir.npy"), mmap_mode="r")
+            self._directories[name] = directory
+        return directory
+
+    def query(self, value, byteorder="big", aligned=False, paths=None):
+        """
+        Hit(path, offset) for every place the value occurs, sorted by path and offset.
+        paths limits the search to those files (as passed to update).
+        """
+        word = value if byteorder == "big" else ((value & 0xFF) << 8) | (value >> 8)
+        wanted = None if paths is None else {os.path.abspath(path) for path in paths}
+        hits = []
+        for segment in self.segments:
+            names = segment["files"]
+            if wanted is not None:
+                dead = set(segment["dead"])
+                ids = [i for i, entry in enumerate(names) if entry[0] in wanted and i not in dead]
+                if not ids:
+                    continue
+            directory = self._directory(segment["name"])
+            lo, hi = int(directory[word]), int(directory[word + 1])
+            if lo == hi:
+                continue
+            with open(os.path.join(self.path, segment["name"] + ".dat"), "rb") as f:
+                f.seek(lo)
+                positions = _decode_list(f.read(hi - lo))
+            bases = np.array(segment["bases"], dtype=np.int64)
+            files = np.searchsorted(bases, positions, side="right") - 1
+            offsets = positions - bases[files]
+            keep = np.ones(len(positions), dtype=bool)
+            if segment["dead"]:
+                keep &= ~np.isin(files, segment["dead"])
+            if wanted is not None:
+                keep &= np.isin(files, ids)
+            if aligned:
+                keep &= offsets % 2 == 0
+            hits += [Hit(names[f][0], o) for f, o in zip(files[keep].tolist(), offsets[keep].tolist())]
+        hits.sort()
+        return hits
@@ -0,0 +1,574 @@
+import argparse
+import json
+import os
+import sys
+
+from hwscenario import Schema, UnitValidator, export_records, import_records, read_jsonl, write_jsonl
+from hwscenario.jsonl import iter_scenario_files
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def cmd_export(args):
+    from hwscenario.hwgz import IndexCache
+
+    index_cache = IndexCache(args.index_cache)
+    if args.auto_layout:
+        records = _export_by_layout(args, index_cache)
+    else:
+        records = export_records(Schema.load(args.fields), args.paths, args.field, index_cache)
+    if args.output == "-":
+        count = write_jsonl(records, sys.stdout)
+    else:
+        with open(args.output, "w", encoding="utf-8", newline="\n") as f:
+            count = write_jsonl(records, f)
+    index_cache.save()
+    print(f"Exported {count} records", file=sys.stderr)
+
+
+def _export_by_layout(args, index_cache):
+    from hwscenario.layouts import LayoutRegistry
+
+    registry = LayoutRegistry.load()
+    for path in iter_scenario_files(args.paths):
+        layout, schema = registry.schema_for_file(path)
+        for record in export_records(schema, [path], args.field, index_cache):
+            record["layout"] = layout.name
+            yield record
+
+
+def cmd_import(args):
+    from hwscenario.layouts import LayoutRegistry
+
+    schema = Schema.load(args.fields)
+    fp = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8")
+    try:
+        total = 0
+        for filename, changed in import_records(schema, read_jsonl(fp), args.base, args.out, LayoutRegistry.load()):
+            if changed:
+                print(f"{filename}: {changed} field(s) changed", file=sys.stderr)
+            total += changed
+    finally:
+        if fp is not sys.stdin:
+            fp.close()
+    print(f"Patched {total} field(s)", file=sys.stderr)
+
+
+def cmd_scan(args):
+    # numpy is only needed for the analysis commands
+    from hwscenario import scanner
+
+    schema = Schema.load(args.fields)
+    known_ids = scanner.known_unit_ids(schema)
+    paths = list(iter_scenario_files(args.paths))
+    results = scanner.scan_corpus(paths, known_ids, args.min_stride, args.max_stride,
+                                  args.min_run, not args.unaligned, args.workers)
+    covered = scanner.mapped_offsets(schema)
+    candidates = [c for c in scanner.merge_candidates(results, covered) if len(c["files"]) >= args.min_files]
+
+    for c in candidates:
+        print(f"offset {c['start']:6d} (0x{c['start']:05X})  stride {c['stride']:4d}  "
+              f"x{c['count']:<3d} in {len(c['files'])}/{len(paths)} files", file=sys.stderr)
+    suggestions = scanner.suggest_fields(candidates)
+    text = json.dumps(suggestions, indent=2)
+    if args.output == "-":
+        print(text)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(f"{len(candidates)} candidate record array(s), {len(suggestions)} suggested field(s)", file=sys.stderr)
+
+
+def cmd_lint(args):
+    from hwscenario.validate import describe
+
+    deny_tags = args.deny_tag if args.deny_tag is not None else ["[Switch]"]
+    if args.auto_layout:
+        from hwscenario.layouts import LayoutRegistry
+
+        registry = LayoutRegistry.load()
+        validators = {}
+
+        def check_files(paths):
+            for path in paths:
+                layout, schema = registry.schema_for_file(path)
+                if layout.name not in validators:
+                    validators[layout.name] = UnitValidator(schema, deny_tags=deny_tags, allow_unknown=args.allow_unknown)
+                yield from validators[layout.name].check_files([path])
+    else:
+        validator = UnitValidator(Schema.load(args.fields), deny_tags=deny_tags, allow_unknown=args.allow_unknown)
+        check_files = validator.check_files
+    files = bad_files = 0
+    for filename, issues in check_files(iter_scenario_files(args.paths)):
+        files += 1
+        if issues:
+            bad_files += 1
+        for issue in issues:
+            print(describe(issue))
+    print(f"{bad_files}/{files} file(s) with invalid units", file=sys.stderr)
+    return 1 if bad_files else 0
+
+
+def cmd_serve(args):
+    from hwscenario.daemon import ScenarioServer, ScenarioService
+
+    try:
+        server = ScenarioServer(args.socket, ScenarioService(args.fields, args.cache_size))
+    except OSError as e:
+        print(f"Error: {e.strerror or e}", file=sys.stderr)
+        return 2
+    print(f"Listening on {args.socket}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def cmd_call(args):
+    import os
+    from hwscenario.daemon import RpcError, ScenarioClient
+
+    params = json.loads(args.params) if args.params else {}
+    # The daemon resolves paths against its own working directory
+    for key in ("path", "out"):
+        if isinstance(params.get(key), str):
+            params[key] = os.path.abspath(params[key])
+    if isinstance(params.get("paths"), list):
+        params["paths"] = [os.path.abspath(p) for p in params["paths"]]
+    with ScenarioClient(args.socket) as client:
+        try:
+            result = client.call(args.method, **params)
+        except RpcError as e:
+            print(f"Error {e.code}: {e.message}", file=sys.stderr)
+            return 1
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    return 0
+
+
+def cmd_verify(args):
+    import time
+    from hwscenario.roundtrip import verify_corpus
+
+    paths = list(iter_scenario_files(args.paths))
+    start = time.perf_counter()
+    checked = failed = 0
+    for name, mismatches in verify_corpus(paths, args.fields, args.fuzz, args.seed, args.workers):
+        checked += 1
+        if not mismatches:
+            continue
+        failed += 1
+        for m in mismatches[:args.max_report]:
+            where = m.spec.field if m.spec.member is None else f"{m.spec.field} / {m.spec.member}"
+            print(f"{name}: 0x{m.offset:05X} {m.before:02X} -> {m.after:02X}  {where} = {m.value!r}")
+        if len(mismatches) > args.max_report:
+            print(f"{name}: ... {len(mismatches) - args.max_report} more byte(s)")
+    elapsed = time.perf_counter() - start
+    rate = checked / elapsed if elapsed else 0.0
+    print(f"{failed}/{checked} buffer(s) did not round trip ({rate:.0f} files/s)", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def cmd_heatmap(args):
+    from hwscenario import heatmap
+
+    schema = Schema.load(args.fields)
+    paths = list(iter_scenario_files(args.paths))
+    matrix = heatmap.stack_files(paths)
+    stats = heatmap.offset_stats(schema, matrix)
+    heatmap.render_heatmap(stats, args.output, args.width, args.cell)
+    if args.stats:
+        with open(args.stats, "w", encoding="utf-8") as f:
+            heatmap.write_stats_csv(stats, f, args.uncovered_only)
+    variable = int((~stats["constant"]).sum())
+    print(f"{len(paths)} file(s), {matrix.shape[1]} offsets, {variable} vary between files, "
+          f"{int(stats['covered'].sum())} covered by fields.json", file=sys.stderr)
+
+
+def cmd_randomize(args):
+    import time
+    from hwscenario.randomizer import generate
+
+    rules = {}
+    if args.rules:
+        with open(args.rules, "r", encoding="utf-8") as f:
+            rules = json.load(f)
+    paths = list(iter_scenario_files(args.paths))
+    start = time.perf_counter()
+    count = 0
+    for path in generate(paths, args.output, args.seed, args.count, rules, args.fields, args.zip, args.workers):
+        count += 1
+        if args.verbose:
+            print(path, file=sys.stderr)
+    elapsed = time.perf_counter() - start
+    print(f"Wrote {count} variant(s) of {len(paths)} file(s) to {args.output} in {elapsed:.2f}s", file=sys.stderr)
+
+
+def cmd_build(args):
+    import time
+    from hwscenario.build import DEFAULT_AURACOMP, ReleaseBuilder
+
+    layouts = args.layout or ["cemu", "console"]
+    try:
+        builder = ReleaseBuilder(args.source, args.output, args.name, args.title_id or [], layouts,
+                                 args.content_dir, args.auracomp or DEFAULT_AURACOMP, args.level, workers=args.workers)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    if "cemu" in layouts and not args.title_id:
+        print("No --title-id given, the Cemu pack gets no rules.txt", file=sys.stderr)
+    start = time.perf_counter()
+    log = (lambda message: print(message, file=sys.stderr)) if args.verbose else None
+    try:
+        stats = builder.build(log)
+    except (OSError, RuntimeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - start
+    print(f"{stats['files']} file(s): {stats['compressed']} compressed, {stats['copied']} copied, "
+          f"{stats['removed']} removed in {elapsed:.2f}s", file=sys.stderr)
+    return 0
+
+
+def cmd_diff(args):
+    from hwscenario.patch import PatchError, diff_dirs, write_patch_file
+
+    schema = Schema.load(args.fields)
+    try:
+        patches = list(diff_dirs(schema, args.base, iter_scenario_files(args.paths)))
+    except (OSError, PatchError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    write_patch_file(args.output, patches)
+    for patch in patches:
+        print(f"{patch.filename}: {len(patch.records)} range(s), "
+              f"{sum(len(r.data) for r in patch.records)} byte(s)", file=sys.stderr)
+    print(f"Wrote {len(patches)} file patch(es) to {args.output}", file=sys.stderr)
+    return 0
+
+
+def cmd_patch(args):
+    import os
+    import time
+    from hwscenario.patch import PatchError, read_patch_file, apply_patch_set
+
+    patches = []
+    try:
+        for path in iter_scenario_files(args.patches, ".hwsp"):
+            patches.extend(read_patch_file(path))
+    except (OSError, PatchError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    if args.list:
+        for patch in patches:
+            for record in patch.records:
+                print(f"{patch.filename}: 0x{record.offset:05X} +{len(record.data):<4d} {record.label or '(unmapped)'}")
+        return 0
+    start = time.perf_counter()
+    failed = 0
+    for filename, status, message in apply_patch_set(patches, args.base, args.out, args.workers):
+        if status == "failed":
+            failed += 1
+        if status != "applied" or args.verbose:
+            print(f"{filename}: {status}, {message}", file=sys.stderr)
+    elapsed = time.perf_counter() - start
+    print(f"Patched {len(patches) - failed}/{len(patches)} file(s) into {args.out or args.base} "
+          f"in {elapsed * 1000:.0f} ms", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def cmd_pipeline(args):
+    import time
+    from hwscenario.build import DEFAULT_AURACOMP
+    from hwscenario.pipeline import Pipeline, auracomp_available
+
+    auracomp = args.auracomp or DEFAULT_AURACOMP
+    if not args.no_compress and not auracomp_available(auracomp):
+        print(f"Error: {auracomp} not found (use --auracomp, or --no-compress to write decompressed files)",
+              file=sys.stderr)
+        return 2
+    edits = []
+    if args.edits:
+        with open(args.edits, "r", encoding="utf-8") as f:
+            edits = list(read_jsonl(f))
+    log = (lambda message: print(message, file=sys.stderr)) if args.verbose else None
+    pipeline = Pipeline(args.output, edits, args.fields, not args.no_compress, auracomp, args.level,
+                        args.strict, args.depth, args.workers, log)
+    paths = list(iter_scenario_files(args.paths))
+    start = time.perf_counter()
+    results = pipeline.run(paths)
+    elapsed = time.perf_counter() - start
+    failed = [item for item in results if item.error]
+    for item in results:
+        for issue in item.issues:
+            print(issue)
+        if item.error and not args.verbose:
+            print(f"{item.filename}: failed, {item.error}", file=sys.stderr)
+    print(f"Wrote {len(results) - len(failed)}/{len(paths)} file(s) to {args.output} in {elapsed:.2f}s",
+          file=sys.stderr)
+    return 1 if failed else 0
+
+
+def cmd_fingerprint(args):
+    from hwscenario.layouts import LayoutRegistry
+
+    registry = LayoutRegistry.load(args.layouts, args.index)
+    samples = {}
+    for sample in args.sample:
+        name, _, folder = sample.partition("=")
+        samples.setdefault(name, []).extend(iter_scenario_files([folder]))
+    try:
+        windows = registry.build_index(samples)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    registry.save_index()
+    if not windows:
+        print("No region tells these layouts apart, only file sizes will be used", file=sys.stderr)
+    print(f"Indexed {sum(len(p) for p in samples.values())} file(s) of {len(samples)} layout(s) "
+          f"into {registry.index_path} using {len(windows)} region(s)", file=sys.stderr)
+    return 0
+
+
+def cmd_identify(args):
+    from hwscenario.layouts import LayoutRegistry
+
+    registry = LayoutRegistry.load(args.layouts, args.index)
+    unknown = 0
+    for path in iter_scenario_files(args.paths):
+        layout = registry.identify(path)
+        unknown += layout is None
+        print(f"{path}\t{layout.name if layout else '?'}\t{layout.byteorder if layout else ''}")
+    return 1 if unknown else 0
+
+
+def cmd_preview(args):
+    import time
+    from hwscenario import preview
+
+    paths = list(iter_scenario_files(args.paths))
+    start = time.perf_counter()
+    outputs, rendered = [], 0
+    try:
+        for path, out_path, fresh in preview.render_all(paths, args.output, args.img, args.scenarios, args.fields,
+                                                        args.workers, args.force):
+            outputs.append(out_path)
+            rendered += fresh
+            if args.verbose:
+                print(f"{out_path}: {'rendered' if fresh else 'cached'}", file=sys.stderr)
+    except ImportError:
+        print("Error: previews need Pillow (pip install pillow)", file=sys.stderr)
+        return 2
+    if args.sheet:
+        outputs.sort()
+        preview.contact_sheet(outputs, os.path.join(args.output, args.sheet), args.columns)
+    print(f"{rendered} preview(s) rendered, {len(outputs) - rendered} cached, in {args.output} "
+          f"({time.perf_counter() - start:.2f}s)", file=sys.stderr)
+    return 0
+
+
+def cmd_find(args):
+    import time
+    from hwscenario.patch import FieldLabeler
+    from hwscenario.wordindex import DEFAULT_INDEX_PATH, WordIndex, parse_value
+
+    schema = Schema.load(args.fields)
+    try:
+        value = parse_value(args.value, schema)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    index = WordIndex.load(args.word_index or DEFAULT_INDEX_PATH)
+    start = time.perf_counter()
+    paths = list(iter_scenario_files(args.paths))
+    indexed, removed = index.update(paths, args.paths, args.workers)
+    if indexed or removed:
+        print(f"Indexed {indexed} file(s), dropped {removed} in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+    start = time.perf_counter()
+    hits = index.query(value, args.byteorder or schema.byteorder, args.aligned, paths)
+    elapsed = time.perf_counter() - start
+    labeler = FieldLabeler(schema)
+    shown, files = 0, set()
+    for path, offset in hits:
+        label = labeler.label(offset, offset + 2)
+        if args.uncovered and label is not None:
+            continue
+        shown += 1
+        files.add(path)
+        print(f"{path}\t0x{offset:X}\t{label or '(not in fields.json)'}")
+    print(f"{value:04X}: {shown} hit(s){' outside fields.json' if args.uncovered else ''} in {len(files)} file(s) "
+          f"({elapsed * 1000:.1f} ms)", file=sys.stderr)
+    return 0 if shown else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless tools for Hyrule Warriors scenario files")
+    parser.add_argument("--fields", help="fields.json to use (default: the one next to this script)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("export", help="dump decoded fields of scenario files to JSON Lines")
+    p.add_argument("paths", nargs="+", help="scenario files (decompressed or HWGZ) or folders of them")
+    p.add_argument("-o", "--output", default="-", help="output .jsonl file (default: stdout)")
+    p.add_argument("--field", action="append", help="only export this field (repeatable, e.g. --field \"Enemy Slot 0\")")
+    p.add_argument("--index-cache", help="json file to keep HWGZ chunk indexes in between runs")
+    p.add_argument("--auto-layout", action="store_true",
+                   help="pick the layout (Wii U / Switch) per file from fingerprints.json instead of --fields")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("import", help="rebuild scenario files from JSON Lines")
+    p.add_argument("input", help=".jsonl file produced by export (- for stdin)")
+    p.add_argument("--base", required=True, help="folder with the decompressed scenario files to patch")
+    p.add_argument("--out", help="folder to write the patched files to (default: patch --base in place)")
+    p.set_defaults(func=cmd_import)
+
+    p = sub.add_parser("scan", help="look for unmapped arrays of unit ids and suggest fields.json entries")
+    p.add_argument("paths", nargs="+", help="decompressed scenario files or folders of them")
+    p.add_argument("-o", "--output", default="-", help="write suggested fields to this file (default: stdout)")
+    p.add_argument("--min-run", type=int, default=4, help="ids in a row needed to count as an array (default: 4)")
+    p.add_argument("--min-stride", type=int, default=2)
+    p.add_argument("--max-stride", type=int, default=512)
+    p.add_argument("--min-files", type=int, default=1, help="only report arrays found in at least this many files")
+    p.add_argument("--unaligned", action="store_true", help="also look at odd offsets")
+    p.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    p.set_defaults(func=cmd_scan)
+
+    p = sub.add_parser("lint", help="report unknown or platform-unsafe unit ids")
+    p.add_argument("paths", nargs="+", help="decompressed scenario files or folders of them")
+    p.add_argument("--deny-tag", action="append",
+                   help="reject units whose name contains this tag (repeatable, default: [Switch])")
+    p.add_argument("--allow-unknown", action="store_true", help="don't report ids missing from fields.json")
+    p.add_argument("--auto-layout", action="store_true",
+                   help="pick the layout (Wii U / Switch) per file from fingerprints.json instead of --fields")
+    p.set_defaults(func=cmd_lint)
+
+    p = sub.add_parser("serve", help="keep the schema and recent files loaded and answer JSON-RPC on a Unix socket")
+    p.add_argument("--socket", default=None, help="socket path (default: hwscenario.sock in the temp folder)")
+    p.add_argument("--cache-size", type=int, default=64, help="scenario buffers to keep in memory (default: 64)")
+    p.set_defaults(func=cmd_serve)
+
+    p = sub.add_parser("call", help="send one request to a running serve")
+    p.add_argument("method", help="ping, decode, query, encode, patch or lint")
+    p.add_argument("params", nargs="?", help='JSON object of parameters, e.g. \'{"path": "sn001.bin"}\'')
+    p.add_argument("--socket", default=None, help="socket path (default: hwscenario.sock in the temp folder)")
+    p.set_defaults(func=cmd_call)
+
+    p = sub.add_parser("verify", help="check that opening and saving without edits keeps every byte")
+    p.add_argument("paths", nargs="*", help="decompressed scenario files or folders of them")
+    p.add_argument("--fuzz", type=int, default=0, help="also check this many generated buffers")
+    p.add_argument("--seed", type=int, default=0, help="seed for --fuzz")
+    p.add_argument("--max-report", type=int, default=10, help="mismatching bytes to print per buffer")
+    p.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    p.set_defaults(func=cmd_verify)
+
+    p = sub.add_parser("heatmap", help="per-offset variance across scenario files, drawn next to fields.json coverage")
+    p.add_argument("paths", nargs="+", help="decompressed scenario files or folders of them")
+    p.add_argument("-o", "--output", default="heatmap.png", help="PNG to write (default: heatmap.png)")
+    p.add_argument("--stats", help="also write per-offset statistics to this CSV file")
+    p.add_argument("--uncovered-only", action="store_true", help="leave offsets fields.json covers out of the CSV")
+    p.add_argument("--width", type=int, default=512, help="offsets per line of the image (default: 512)")
+    p.add_argument("--cell", type=int, default=2, help="pixels per offset (default: 2)")
+    p.set_defaults(func=cmd_heatmap)
+
+    p = sub.add_parser("randomize", help="write seeded randomized copies of a set of scenarios")
+    p.add_argument("paths", nargs="+", help="decompressed scenario files or folders of them")
+    p.add_argument("-o", "--output", required=True, help="folder for the variants")
+    p.add_argument("-n", "--count", type=int, default=1, help="number of variants (default: 1)")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--rules", help="json file with unit pools, ban list and captains to keep")
+    p.add_argument("--zip", action="store_true", help="write each variant as a compressed .zip")
+    p.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    p.add_argument("-v", "--verbose", action="store_true")
+    p.set_defaults(func=cmd_randomize)
+
+    p = sub.add_parser("build", help="compress changed scenarios and lay them out for Cemu and the console")
+    p.add_argument("source", help="folder of edited, decompressed scenario files")
+    p.add_argument("-o", "--output", required=True, help="release folder; keeps build-manifest.json between builds")
+    p.add_argument("--name", default="HWScenarioMod", help="mod folder name (default: HWScenarioMod)")
+    p.add_argument("--title-id", action="append", help="game title id, e.g. 00050000xxxxxxxx (repeatable)")
+    p.add_argument("--layout", action="append", choices=["cemu", "console"],
+                   help="output layouts to build (repeatable, default: both)")
+    p.add_argument("--content-dir", default="", help="folder under content/ the files go in (default: same as in source)")
+    p.add_argument("--auracomp", default=None, help="Auracomp executable (default: $AURACOMP or auracomp.exe)")
+    p.add_argument("--level", default="optimal", help="Auracomp compression level (default: optimal)")
+    p.add_argument("--workers", type=int, help="files compressed at once (default: one per CPU)")
+    p.add_argument("-v", "--verbose", action="store_true")
+    p.set_defaults(func=cmd_build)
+
+    p = sub.add_parser("diff", help="write a compact .hwsp patch of edited scenarios against vanilla ones")
+    p.add_argument("paths", nargs="+", help="edited, decompressed scenario files or folders of them")
+    p.add_argument("--base", required=True, help="folder with the vanilla decompressed scenario files")
+    p.add_argument("-o", "--output", required=True, help=".hwsp file to write")
+    p.set_defaults(func=cmd_diff)
+
+    p = sub.add_parser("patch", help="apply .hwsp patches to vanilla scenarios, checking checksums")
+    p.add_argument("patches", nargs="+", help=".hwsp files or folders of them")
+    p.add_argument("--base", required=True, help="folder with the vanilla decompressed scenario files")
+    p.add_argument("--out", help="folder to write the patched files to (default: patch --base in place)")
+    p.add_argument("--list", action="store_true", help="only print what the patches change")
+    p.add_argument("--workers", type=int, help="files patched at once")
+    p.add_argument("-v", "--verbose", action="store_true")
+    p.set_defaults(func=cmd_patch)
+
+    p = sub.add_parser("pipeline", help="decompress, edit, validate and compress many scenarios in one pass")
+    p.add_argument("paths", nargs="+", help="scenario files (HWGZ or decompressed) or folders of them")
+    p.add_argument("-o", "--output", required=True, help="folder for the finished files")
+    p.add_argument("--edits", help=".jsonl records (as written by export) to apply on the way")
+    p.add_argument("--strict", action="store_true", help="don't write files with unknown or [Switch] units")
+    p.add_argument("--no-compress", action="store_true", help="write decompressed files instead of HWGZ")
+    p.add_argument("--auracomp", default=None, help="Auracomp executable (default: $AURACOMP or auracomp.exe)")
+    p.add_argument("--level", default="optimal", help="Auracomp compression level (default: optimal)")
+    p.add_argument("--depth", type=int, default=4, help="files waiting between two stages (default: 4)")
+    p.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    p.add_argument("-v", "--verbose", action="store_true")
+    p.set_defaults(func=cmd_pipeline)
+
+    p = sub.add_parser("fingerprint", help="build fingerprints.json from reference files of each layout")
+    p.add_argument("--sample", action="append", required=True, metavar="LAYOUT=FOLDER",
+                   help='vanilla files of one layout, e.g. "Wii U=dump/wiiu" (repeatable)')
+    p.add_argument("--layouts", default=None, help="layouts.json to use (default: the one next to this script)")
+    p.add_argument("--index", default=None, help="index file to write (default: fingerprints.json next to this script)")
+    p.set_defaults(func=cmd_fingerprint)
+
+    p = sub.add_parser("identify", help="print the layout of each scenario file")
+    p.add_argument("paths", nargs="+", help="scenario files or folders of them")
+    p.add_argument("--layouts", default=None, help="layouts.json to use (default: the one next to this script)")
+    p.add_argument("--index", default=None, help="fingerprint index (default: fingerprints.json next to this script)")
+    p.set_defaults(func=cmd_identify)
+
+    p = sub.add_parser("preview", help="render map previews with each scenario's captains and squads drawn on")
+    p.add_argument("paths", nargs="+", help="decompressed scenario files or folders of them")
+    p.add_argument("-o", "--output", required=True, help="folder for the preview PNGs")
+    p.add_argument("--img", default=os.path.join(ROOT_DIR, "img"), help="folder with the map images (default: img)")
+    p.add_argument("--scenarios", default=os.path.join(ROOT_DIR, "scenarios.json"),
+                   help="scenarios.json for titles and map bounds")
+    p.add_argument("--sheet", default="sheet.png", help="contact sheet file name in the output folder ('' for none)")
+    p.add_argument("--columns", type=int, default=4, help="previews per contact sheet row (default: 4)")
+    p.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    p.add_argument("--force", action="store_true", help="re-render even if cached")
+    p.add_argument("-v", "--verbose", action="store_true")
+    p.set_defaults(func=cmd_preview)
+
+    p = sub.add_parser("find", help="list every offset in a set of scenarios where a 2-byte value occurs")
+    p.add_argument("value", help='hex value ("0072", "0x72") or unit name')
+    p.add_argument("paths", nargs="+", help="scenario files (decompressed or HWGZ) or folders of them")
+    p.add_argument("--word-index", default=None, help="index folder (default: word-index next to this script)")
+    p.add_argument("--aligned", action="store_true", help="only even offsets")
+    p.add_argument("--uncovered", action="store_true", help="only offsets no fields.json field covers")
+    p.add_argument("--byteorder", choices=("big", "little"), help="byte order of the files (default: the schema's)")
+    p.add_argument("--workers", type=int, help="worker processes for indexing (default: one per CPU)")
+    p.set_defaults(func=cmd_find)
+
+    args = parser.parse_args(argv)
+    if getattr(args, "layouts", False) is None or getattr(args, "index", False) is None:
+        from hwscenario.layouts import DEFAULT_INDEX_PATH, DEFAULT_LAYOUTS_PATH
+        args.layouts = args.layouts or DEFAULT_LAYOUTS_PATH
+        args.index = args.index or DEFAULT_INDEX_PATH
+    if getattr(args, "socket", False) is None:
+        from hwscenario.daemon import DEFAULT_SOCKET
+        args.socket = DEFAULT_SOCKET
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+import io
+
+from hwscenario import Schema, export_records, import_records, read_jsonl, write_jsonl
+from hwscenario.schema import UNIT_REF
+
+
+def make_scenario(schema, path):
+    data = bytearray(max(spec.offset + spec.size for spec in schema.specs))
+    path.write_bytes(bytes(data))
+    return data
+
+
+def test_export_import_round_trip(tmp_path):
+    schema = Schema.load()
+    src = tmp_path / "src"
+    src.mkdir()
+    data = make_scenario(schema, src / "sn000.bin")
+
+    out = io.StringIO()
+    count = write_jsonl(export_records(schema, [str(src)]), out)
+    records = list(read_jsonl(io.StringIO(out.getvalue())))
+    assert count == len(records) == len(schema.specs)
+
+    spec = next(spec for spec in schema.specs if spec.mapping_key == UNIT_REF)
+    label = next(label for label, hexval in schema.label_to_hex[UNIT_REF].items() if hexval not in ("0000", "EEEE", "FFFF"))
+    for record in records:
+        if record["field"] == spec.field and record.get("member") == spec.member:
+            record["value"] = label
+
+    results = dict(import_records(schema, records, str(src), str(tmp_path / "out")))
+    assert results == {"sn000.bin": 1}
+    schema.encode(data, spec, label)
+    assert (tmp_path / "out" / "sn000.bin").read_bytes() == bytes(data)
+
+
+def test_unchanged_records_keep_exact_bytes(tmp_path):
+    schema = Schema.load()
+    data = make_scenario(schema, tmp_path / "sn000.bin")
+    # An id fields.json doesn't know has to come back as the same bytes
+    spec = schema.specs[0]
+    data[spec.offset:spec.offset + 2] = b"\x7F\xF1"
+    (tmp_path / "sn000.bin").write_bytes(bytes(data))
+
+    records = list(export_records(schema, [str(tmp_path / "sn000.bin")]))
+    assert list(import_records(schema, records, str(tmp_path))) == [("sn000.bin", 0)]
+    assert (tmp_path / "sn000.bin").read_bytes() == bytes(data)
@@ -0,0 +1,32 @@
+import pytest
+
+from hwscenario import Schema
+from hwscenario.patch import FieldLabeler, PatchError, apply, diff, dumps, loads
+
+
+def test_dumps_loads_round_trip():
+    source = bytes(range(256)) * 64
+    target = bytearray(source)
+    target[10:14] = b"\xAA\xBB\xCC\xDD"
+    target[9000] ^= 0xFF
+    patch = diff("sn000.bin", source, target, FieldLabeler(Schema.load()))
+
+    (loaded,) = loads(dumps([patch]))
+    assert loaded == patch
+    assert apply(loaded, source) == target
+
+
+def test_apply_refuses_other_source():
+    source = bytes(1024)
+    target = bytearray(source)
+    target[0] = 1
+    patch = diff("sn000.bin", source, target)
+    with pytest.raises(PatchError):
+        apply(patch, b"\x01" + source[1:])
+
+
+def test_size_change_and_bad_blob():
+    with pytest.raises(PatchError):
+        diff("sn000.bin", bytes(10), bytes(11))
+    with pytest.raises(PatchError):
+        loads(b"NOPE\x01")
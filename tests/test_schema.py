@@ -0,0 +1,43 @@
+from hwscenario import Schema
+from hwscenario.schema import UNIT_REF
+
+
+def unit_spec(schema):
+    return next(spec for spec in schema.specs if spec.type == "enum" and spec.mapping_key == UNIT_REF)
+
+
+def some_label(schema, spec):
+    return next(label for label, hexval in schema.label_to_hex[spec.mapping_key].items() if hexval not in ("EEEE", "FFFF"))
+
+
+def test_encode_decode_round_trip():
+    schema = Schema.load()
+    data = bytearray(max(spec.offset + spec.size for spec in schema.specs))
+    for spec in schema.specs:
+        for label in schema.label_to_hex[spec.mapping_key]:
+            raw = schema.encode_value(spec, label)
+            # Several ids can share a label, the bytes are what has to survive
+            assert schema.encode_value(spec, schema.decode_raw(spec, raw)) == raw
+        schema.encode(data, spec, label)
+        assert bytes(data[spec.offset:spec.offset + spec.size]) == schema.encode_value(spec, label)
+
+
+def test_little_endian_swaps_bytes():
+    big = Schema.load()
+    little = Schema.load(byteorder="little")
+    spec = unit_spec(big)
+    label = some_label(big, spec)
+    raw = big.encode_value(spec, label)
+    assert little.encode_value(spec, label) == raw[::-1]
+    assert little.decode_raw(spec, raw[::-1]) == label
+
+
+def test_unknown_ids_survive():
+    schema = Schema.load()
+    spec = unit_spec(schema)
+    known = {hexval.replace(" ", "").upper() for hexval in schema.label_to_hex[spec.mapping_key].values()}
+    known |= {hexval.replace(" ", "").upper() for hexval in schema.extra_label_to_hex.values()}
+    value = next(v for v in range(0xFFFF) if f"{v:04X}" not in known)
+    label = schema.decode_raw(spec, value.to_bytes(2, "big"))
+    assert label == f"(Unknown {value:04X})"
+    assert schema.encode_value(spec, label) == value.to_bytes(2, "big")
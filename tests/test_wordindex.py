@@ -0,0 +1,42 @@
+import numpy as np
+
+from hwscenario.wordindex import MIN_COMPRESS, Hit, WordIndex, _decode_list, _encode_list
+
+
+def encode_positions(positions):
+    positions = np.array(positions, dtype=np.uint32)
+    deltas = positions.copy()
+    deltas[1:] -= positions[:-1]
+    return _encode_list(deltas)
+
+
+def test_delta_list_round_trip():
+    short = [3, 7, 8]
+    assert _decode_list(encode_positions(short)).tolist() == short
+    long = list(range(5, 5 + 40 * MIN_COMPRESS, 3))
+    blob = encode_positions(long)
+    assert blob[:1] == b"\x01"
+    assert _decode_list(blob).tolist() == long
+
+
+def test_delta_list_near_uint32_limit():
+    positions = [0, 1 << 31, (1 << 32) - 1]
+    assert _decode_list(encode_positions(positions)).tolist() == positions
+
+
+def test_query_and_update(tmp_path):
+    a = tmp_path / "a.bin"
+    b = tmp_path / "b.bin"
+    a.write_bytes(b"\x00\x72\x00\x00\x72")
+    b.write_bytes(b"\x72\x00")
+    index = WordIndex(str(tmp_path / "index"))
+    paths = [str(a), str(b)]
+    assert index.update(paths, [str(tmp_path)], workers=1) == (2, 0)
+
+    assert index.query(0x0072) == [Hit(str(a), 0), Hit(str(a), 3)]
+    assert index.query(0x0072, aligned=True) == [Hit(str(a), 0)]
+    assert index.query(0x0072, byteorder="little") == [Hit(str(a), 1), Hit(str(b), 0)]
+
+    b.unlink()
+    assert WordIndex.load(index.path).update([str(a)], [str(tmp_path)], workers=1) == (0, 1)
+    assert WordIndex.load(index.path).query(0x7200) == [Hit(str(a), 1)]